@@ -1,7 +1,5 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import re
 import sys
 import os
 import time 
@@ -9,93 +7,16 @@ import time
 # เพิ่ม path ให้หา utils เจอ
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 import utils 
+import data_loader
+import figures
+import news_cards
 
 st.set_page_config(page_title="Market Heatmap", page_icon="🏠", layout="wide", initial_sidebar_state="collapsed")
 utils.navbar()
 
-# --- HELPER FUNCTIONS ---
-def clean_news_content(text):
-    if not isinstance(text, str): return ""
-    pattern = r"(?s)^.*?(?:\([^\)]+\)\s*-\s*|\s+--\s+)"
-    cleaned_text = re.sub(pattern, "", text).strip()
-    cleaned_text = cleaned_text.replace("\n", " ")
-    cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-    return cleaned_text if cleaned_text else text
-
-@st.cache_data
-def load_data():
-    df_sector = pd.DataFrame()
-    df_news = pd.DataFrame()
-
-    # --- 1. LOAD SECTOR DATA ---
-    try:
-        # โหลดไฟล์ Daily History
-        df_sector = pd.read_csv('csv_checkpoint/sector_daily_history_7days.csv', encoding='utf-8')
-        
-        # ✅ FIX 1: กรองเอาเฉพาะ "วันล่าสุด" มาแสดงใน Heatmap (Snapshot)
-        if 'Report_Date' in df_sector.columns:
-            df_sector['Report_Date'] = pd.to_datetime(df_sector['Report_Date'])
-            latest_date = df_sector['Report_Date'].max()
-            df_sector = df_sector[df_sector['Report_Date'] == latest_date]
-
-        # ✅ FIX 2: Map ชื่อคอลัมน์ให้ตรงกับที่กราฟ Treemap ต้องการ
-        # CSV มี 'Final_Daily_Score' แต่กราฟเรียกใช้ 'Final_AI_Score'
-        if 'Final_Daily_Score' in df_sector.columns:
-            df_sector['Final_AI_Score'] = pd.to_numeric(df_sector['Final_Daily_Score'], errors='coerce').fillna(0.0)
-        else:
-            df_sector['Final_AI_Score'] = 0.0
-
-        # เช็ค News_Volume (เผื่อไฟล์ไม่มี)
-        if 'News_Volume' not in df_sector.columns:
-            df_sector['News_Volume'] = 10  # Default value
-
-        if 'Final_Outlook' not in df_sector.columns:
-            df_sector['Final_Outlook'] = 'Neutral'
-
-    except Exception as e: 
-        # print(f"Sector load error: {e}")
-        pass
-    
-    # --- 2. LOAD NEWS DATA ---
-    try:
-        # พยายามโหลดไฟล์ข่าว (รองรับหลายชื่อ)
-        if os.path.exists('csv_checkpoint/sentiment_final.csv'):
-            df_news = pd.read_csv('csv_checkpoint/sentiment_final.csv', encoding='utf-8')
-        # elif os.path.exists('result.csv'):
-        #     df_news = pd.read_csv('result.csv', encoding='utf-8')
-        
-        if not df_news.empty:
-            if 'Date' in df_news.columns: 
-                df_news['Date'] = pd.to_datetime(df_news['Date'], errors='coerce')
-            
-            # จัดการ Score (รองรับหลายโมเดล)
-            if 'Score_Qwen2.5-14B-Instruct' in df_news.columns: 
-                df_news['Sentiment_Score'] = df_news['Score_Qwen2.5-14B-Instruct'] * 10 
-            elif 'Score_finma-7b-full' in df_news.columns: 
-                df_news['Sentiment_Score'] = df_news['Score_finma-7b-full'] * 10
-            elif 'Sentiment_Score' not in df_news.columns:
-                df_news['Sentiment_Score'] = 5.0
-                
-            # Clean Data
-            if 'Combined_Sector' in df_news.columns:
-                df_news['Combined_Sector'] = df_news['Combined_Sector'].fillna('General')
-            else:
-                df_news['Combined_Sector'] = 'General'
-
-            if 'Content' in df_news.columns:
-                df_news['Content'] = df_news['Content'].fillna('').apply(lambda x: clean_news_content(str(x)))
-            
-            if 'Short_Ans' in df_news.columns:
-                df_news['Short_Ans'] = df_news['Short_Ans'].fillna('')
-            else:
-                df_news['Short_Ans'] = ''     
-    except Exception as e: 
-        # print(f"News load error: {e}")
-        pass
-        
-    return df_sector, df_news
-
-df_sector, df_news = load_data()
+# --- LOAD DATA (shared, mtime-aware cache) ---
+df_sector = data_loader.load_sector_snapshot()
+df_news = data_loader.load_news()
 
 # --- 🟢🔴 CUSTOM NON-BLOCKING POPUP ---
 def show_floating_status(count):
@@ -151,53 +72,15 @@ with col_map:
             st.caption(f"Data as of: {latest_str}")
 
 
-        MAIN_SECTORS = [
-            "Energy", 
-            "Basic Materials",           # GICS: Materials
-            "Industrials", 
-            "Consumer Cyclical",         # GICS: Consumer Discretionary
-            "Consumer Defensive",        # GICS: Consumer Staples
-            "Healthcare",                # GICS: Health Care
-            "Financials", 
-            "Technology",                # GICS: Information Technology
-            "Communication Services", 
-            "Utilities", 
-            "Real Estate"
-        ]
-
- 
-        df_chart = df_sector[df_sector['Sector'].isin(MAIN_SECTORS)]
+        df_chart = df_sector[df_sector['Sector'].isin(data_loader.MAIN_SECTORS)]
         if df_chart.empty:
             st.warning("No data found for the 11 main sectors. Please check sector spelling in your CSV.")
             df_chart = df_sector
 
-        fig = px.treemap(
-            df_chart, 
-            path=['Sector'], 
-            values='News_Volume', 
-            color='Final_AI_Score',
-            color_continuous_scale=['#FF4B4B', '#FACA2B', '#09AB3B'], 
-            range_color=[0, 10],
-            custom_data=['Final_Outlook', 'News_Volume', 'Final_AI_Score'] 
-        )
-        
-        fig.update_traces(
-            textinfo="label+value", 
-            texttemplate="<span style='color:white; font-weight:bold;'>%{label}</span><br><span style='color:white; font-size:18px;'>%{customdata[2]:.2f}</span>",
-            textposition="middle center",
-            hovertemplate="<b>%{label}</b><br>Score: %{customdata[2]:.2f}/10<br>Vol: %{value}<br>Outlook: %{customdata[0]}<extra></extra>",
-            marker=dict(cornerradius=5)
-        )
-        
-        fig.update_layout(
-            height=780, 
-            margin=dict(t=0, l=0, r=0, b=0), 
-            paper_bgcolor='rgba(0,0,0,0)', 
-            plot_bgcolor='rgba(0,0,0,0)', 
-            font=dict(family="Inter, sans-serif", size=14),
-            coloraxis_showscale=False
-        )
-        
+        # figure สร้างครั้งเดียวต่อ data version (คลิก treemap -> rerun ไม่ต้องสร้างใหม่)
+        fig = figures.figure('treemap', data_loader.data_version('sector_history'), 'all',
+                             lambda: figures.sector_treemap(df_chart))
+
         event = st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points", key="treemap_chart")
         
         if len(event["selection"]["points"]) > 0:
@@ -231,21 +114,20 @@ with col_news:
                 selected_sectors = st.multiselect("Sector", options=all_sectors, placeholder="All Sectors", label_visibility="collapsed")
             with c3: search_submitted = st.form_submit_button("🔍")
         
-        filtered_df = df_news.copy()
-        if search_query: 
-            filtered_df = filtered_df[
-                filtered_df['Title'].str.contains(search_query, case=False, na=False) | 
-                filtered_df['Content'].str.contains(search_query, case=False, na=False)
-            ]
+        # inverted index (สร้างครั้งเดียวต่อ data version) แทนการ scan ทุกข่าวทุก rerun
+        filtered_df = data_loader.search_news(df_news, search_query)
         if selected_sectors: 
-            filtered_df = filtered_df[filtered_df['Combined_Sector'].str.contains('|'.join(selected_sectors), case=False, na=False)]
+            filtered_df = data_loader.filter_sectors(filtered_df, selected_sectors, df_news.attrs.get('sector_labels', []))
 
         if search_submitted:
             show_floating_status(len(filtered_df))
 
         if 'Sentiment_Score' in filtered_df.columns:
-            bull_news = filtered_df[filtered_df['Sentiment_Score'] >= 6].sort_values(by=['Date'], ascending=False)
-            bear_news = filtered_df[filtered_df['Sentiment_Score'] <= 4].sort_values(by=['Date'], ascending=False)
+            # มี query -> คงลำดับจาก search (BM25 + ความใหม่), ไม่มี -> ล่าสุดก่อน
+            if not search_query:
+                filtered_df = filtered_df.sort_values(by=['Date'], ascending=False)
+            bull_news = filtered_df[filtered_df['Sentiment_Score'] >= 6]
+            bear_news = filtered_df[filtered_df['Sentiment_Score'] <= 4]
         else:
             bull_news = pd.DataFrame(); bear_news = pd.DataFrame()
 
@@ -262,27 +144,8 @@ with col_news:
         def display_cards(news_df):
             if news_df.empty:
                 st.info("No news in this category."); return
-
-            for _, row in news_df.head(3).iterrows(): 
-                sectors = str(row.get('Combined_Sector', '')).split(',')
-                tags_html = "".join([f'<span class="sector-tag">🏷️ {s.strip()}</span>' for s in sectors if s.strip()])
-                summary = row.get('Content', '')
-                if len(summary) > 120: summary = summary[:120] + "..."
-                date_str = row['Date'].strftime('%d %b %H:%M') if pd.notnull(row.get('Date')) else ""
-                score = row.get('Sentiment_Score', 5.0)
-                color = utils.get_sentiment_color(score)
-                ai_summary_html = ""
-                if row.get('Short_Ans'): ai_summary_html = f'<div class="ai-summary-home">🤖 {str(row["Short_Ans"])[:150]}...</div>'
-
-                st.markdown(f"""
-                <div class="news-card" style="border-left: 6px solid {color};">
-                    <div class="news-meta">{row.get('Source', 'Unknown')} • {date_str}</b></div>
-                    <a href="{row.get('Link', '#')}" target="_blank" class="news-title">{row.get('Title', 'No Title')}</a>
-                    <div style="margin-bottom:8px;">{tags_html}</div>
-                    <div style="font-size:13px; color:#444;">{summary}</div>
-                    {ai_summary_html}
-                </div>
-                """, unsafe_allow_html=True)
+            # การ์ดทั้งชุดสร้างแบบ vectorized แล้วส่งเป็น payload เดียว
+            news_cards.render_cards(news_df.head(3), news_cards.HOME_CARD)
 
         with tab_bull: display_cards(bull_news)
         with tab_bear: display_cards(bear_news)
@@ -0,0 +1,90 @@
+"""
+CPU inference backends (pipeline.backend): fp32 vs dynamic int8 quantization, per torch thread count.
+
+Each backend loads the model (memory-mapped safetensors) and runs the ModelTaskRunner sector +
+sentiment tasks (schema-constrained, greedy) over the same synthetic news. Reported: load time,
+serialized weight size, generation wall time, rows/s and new tokens/s, and how many parsed answers
+match the fp32 run. Int8 only quantizes nn.Linear, so the speedup grows with hidden size; the
+random stand-in's logits are nearly flat, so its answer agreement is a lower bound of what a
+trained model keeps after quantization.
+
+    python -m benchmarks.bench_backend --rows 32
+    python -m benchmarks.bench_backend --hidden-size 1024 --threads 1,4
+    python -m benchmarks.bench_backend --model Qwen/Qwen2.5-0.5B-Instruct
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.backend import get_backend
+from pipeline.inference import ModelTaskRunner, load_model, release_memory
+from pipeline.tasks import sector_task, sentiment_task
+from benchmarks.synthetic import make_news_frame
+from benchmarks.standin import save_standin
+
+
+def weight_mb(model):
+    """ขนาด state_dict ที่ serialize แล้ว (int8 packed weights ไม่อยู่ใน parameters())"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2**20
+
+
+def run_backend(model_path, backend, df, batch_size):
+    start = time.perf_counter()
+    model, tokenizer = load_model(model_path, backend=backend)
+    load_seconds = time.perf_counter() - start
+    size = weight_mb(model)
+
+    runner = ModelTaskRunner(model_path, [sector_task(), sentiment_task()], model=model, tokenizer=tokenizer,
+                             batch_size=batch_size, backend=backend)
+    results = runner.run(df)
+    stats = [s for s in runner.stats.values() if isinstance(s, dict)]
+    seconds = sum(s['seconds'] for s in stats)
+    rows = sum(s['rows'] for s in stats)
+    new_tokens = sum(s['new_tokens'] for s in stats)
+    del runner, model, tokenizer
+    release_memory()
+    return {'Load_s': load_seconds, 'Weights_MB': size, 'Rows': rows, 'New_Tokens': new_tokens,
+            'Seconds': seconds, 'Rows_per_s': rows / seconds, 'Tokens_per_s': new_tokens / seconds}, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=32)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--threads', default=str(torch.get_num_threads()), help='comma-separated torch thread counts')
+    parser.add_argument('--model', default=None, help='HF model id/path (default: offline stand-in)')
+    parser.add_argument('--hidden-size', type=int, default=1024)
+    parser.add_argument('--layers', type=int, default=4)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model_path = args.model or save_standin(hidden_size=args.hidden_size, num_layers=args.layers)
+    df = make_news_frame(args.rows, content_words=150)
+    df['Sector'] = 'Other'
+
+    report = []
+    for threads in [int(t) for t in args.threads.split(',')]:
+        baseline = None
+        for name in ('cpu', 'cpu-int8'):
+            row, results = run_backend(model_path, get_backend(name, num_threads=threads), df, args.batch_size)
+            baseline = baseline or results
+            same = sum((results[task] == baseline[task]).sum() for task in results)
+            total = sum(len(values) for values in results.values())
+            report.append({'Backend': name, 'Threads': threads, **row, 'Same_As_fp32': f"{same}/{total}"})
+
+    report = pd.DataFrame(report)
+    fp32 = report[report['Backend'] == 'cpu'].set_index('Threads')['Seconds']
+    report['Speedup'] = report['Threads'].map(fp32) / report['Seconds']
+    print(report.round(3).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
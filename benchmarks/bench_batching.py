@@ -0,0 +1,96 @@
+"""
+Fixed-size arrival-order batches vs length-bucketed batches under a token budget.
+
+Rows mix headline-only items with full 3,000-char articles, like the real Full_Text column.
+Reports padding ratio, wall time and throughput of greedy generation on CPU.
+
+    python -m benchmarks.bench_batching --rows 128 --batch-tokens 4096
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.batching import fixed_batches, padding_stats, plan_batches
+from pipeline.inference import count_new_tokens, left_pad, load_model
+from benchmarks.bench_multitask import legacy_prompt
+from benchmarks.synthetic import make_news_frame
+from benchmarks.standin import save_standin
+
+
+def mixed_length_frame(n, seed=0):
+    """~half headline-only / short items, the rest long articles."""
+    df = make_news_frame(n, seed=seed, content_words=500)
+    rng = np.random.default_rng(seed)
+    keep_words = np.where(rng.random(n) < 0.5, rng.integers(0, 30, n), rng.integers(200, 500, n))
+    df['Content'] = [" ".join(c.split()[:k]) for c, k in zip(df['Content'], keep_words)]
+    return df
+
+
+def run_plan(model, tokenizer, sequences, batches, max_new_tokens):
+    new_tokens = 0
+    start = time.perf_counter()
+    for positions in batches:
+        input_ids, attention_mask = left_pad([sequences[p] for p in positions], tokenizer.pad_token_id, model.device)
+        with torch.no_grad():
+            outputs = model.generate(input_ids=input_ids, attention_mask=attention_mask,
+                                     max_new_tokens=max_new_tokens, do_sample=False,
+                                     pad_token_id=tokenizer.pad_token_id)
+        new_tokens += count_new_tokens(outputs[:, input_ids.shape[1]:], tokenizer.eos_token_id, tokenizer.pad_token_id)
+    return time.perf_counter() - start, new_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=128)
+    parser.add_argument('--batch-size', type=int, default=16, help='fixed batch size (current notebook)')
+    parser.add_argument('--batch-tokens', type=int, default=8192, help='padded-token budget per batch')
+    parser.add_argument('--max-new-tokens', type=int, default=20)
+    parser.add_argument('--model', default=None, help='HF model id/path (default: offline stand-in)')
+    parser.add_argument('--hidden-size', type=int, default=128)
+    parser.add_argument('--layers', type=int, default=2)
+    args = parser.parse_args()
+
+    model_path = args.model or save_standin(hidden_size=args.hidden_size, num_layers=args.layers)
+    model, tokenizer = load_model(model_path, device='cpu')
+
+    df = mixed_length_frame(args.rows)
+    prompts = [
+        tokenizer.apply_chat_template([{"role": "user", "content": legacy_prompt('sentiment', t, c)}],
+                                      tokenize=False, add_generation_prompt=True)
+        for t, c in zip(df['Title'], df['Content'])
+    ]
+    sequences = [ids[:2048] for ids in tokenizer(prompts, add_special_tokens=False)['input_ids']]
+    lengths = [len(s) for s in sequences]
+    print(f"Prompt tokens: min {min(lengths)} / median {int(np.median(lengths))} / max {max(lengths)}")
+
+    plans = {
+        f'fixed x{args.batch_size}': fixed_batches(len(sequences), args.batch_size),
+        f'bucketed <= {args.batch_tokens} tok': plan_batches(lengths, args.batch_tokens, new_tokens=args.max_new_tokens),
+    }
+    run_plan(model, tokenizer, sequences, [[0]], 2)   # warm-up
+
+    rows = []
+    for name, batches in plans.items():
+        seconds, new_tokens = run_plan(model, tokenizer, sequences, batches, args.max_new_tokens)
+        stats = padding_stats(lengths, batches)
+        rows.append({
+            'Plan': name,
+            'Batches': stats['batches'],
+            'Padded_Tokens': stats['padded_tokens'],
+            'Padding_Ratio': stats['padding_ratio'],
+            'Seconds': seconds,
+            'Rows_per_s': len(sequences) / seconds,
+            'Prompt_Tokens_per_s': stats['real_tokens'] / seconds,
+            'New_Tokens_per_s': new_tokens / seconds,
+        })
+    print(pd.DataFrame(rows).round(3).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+News card rendering: per-article st.markdown in an iterrows() loop (old Home / News Center) vs
+vectorized fragments sent as one payload per page (news_cards.py).
+
+Each variant runs as a real Streamlit script through streamlit.testing (AppTest) and is rerun a few
+times (first run = warm-up). Reports the script-side time to build and emit the cards, how many
+deltas the page sends, and the websocket payload (serialized ForwardMsg bytes) for those deltas.
+
+    python -m benchmarks.bench_cards --rows 20000 --cards 50,200
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+
+def card_script(root, rows, cards, mode):
+    """AppTest script (ต้อง self-contained: AppTest รันจาก source ของฟังก์ชันนี้)"""
+    import sys
+    import time
+
+    import numpy as np
+    import pandas as pd
+    import streamlit as st
+    sys.path.insert(0, root)
+    import news_cards
+    import utils
+    from benchmarks.synthetic import make_news_frame
+
+    df = make_news_frame(rows, content_words=120)
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['Sentiment_Score'] = df['Score_Qwen2.5-14B-Instruct'] * 10
+    df['Short_Ans'] = np.where(np.arange(rows) % 4 == 0, '', df['Short_Ans'])
+    df = df.sort_values('Date', ascending=False)
+
+    def legacy():
+        # ลูปเดิมของ pages/3_News_Center.py
+        cols = st.columns(2)
+        for i, (index, row) in enumerate(df.head(cards).iterrows()):
+            with cols[i % 2]:
+                sectors = str(row['Combined_Sector']).split(',')
+                tags_html = "".join([f'<span class="sector-tag">🏷️ {s.strip()}</span>' for s in sectors if s.strip()])
+                date_str = row['Date'].strftime('%d %b %Y %H:%M') if pd.notnull(row['Date']) else ""
+                color = utils.get_sentiment_color(row['Sentiment_Score'])
+                ai_summary_html = ""
+                if row['Short_Ans'] and str(row['Short_Ans']).strip() != "":
+                    ai_summary_html = f'<div class="ai-summary-box"><strong>🤖 AI Summary :</strong> {row["Short_Ans"]}</div>'
+                original_text = row['Content']
+                if len(original_text) > 200:
+                    original_text = original_text[:200] + "..."
+                st.markdown(f"""
+<div class="news-card" style="border-left: 6px solid {color};">
+<div class="news-meta">{row['Source']} • {date_str} </b></div>
+<a href="{row['Link']}" target="_blank" class="news-title">{row['Title']}</a>
+<div style="margin-bottom:5px;">{tags_html}</div>
+<div class="original-content">{original_text}</div>
+{ai_summary_html}
+</div>
+""", unsafe_allow_html=True)
+
+    def batched():
+        page_df, _, _ = news_cards.paginate(df, page_size=cards, key='bench_page')
+        news_cards.render_cards(page_df, news_cards.NEWS_CENTER_CARD, columns=2)
+
+    start = time.perf_counter()
+    if mode == 'legacy':
+        legacy()
+    else:
+        batched()
+    st.session_state.setdefault('render_ms', []).append((time.perf_counter() - start) * 1000)
+
+
+def payload(at):
+    """ForwardMsg ที่ browser ได้รับ: 1 delta ต่อ element (st.markdown) หรือ block (columns/column)"""
+    sizes = []
+
+    def walk(node, path):
+        for i, child in sorted(node.children.items()):
+            msg = ForwardMsg()
+            msg.metadata.delta_path[:] = path + [i]
+            if child.type == 'markdown':
+                msg.delta.new_element.markdown.CopyFrom(child.proto)
+            block = child.proto.ByteSize() if child.type != 'markdown' and child.proto is not None else 0
+            sizes.append(msg.ByteSize() + block)
+            if hasattr(child, 'children'):
+                walk(child, path + [i])
+
+    walk(at.main, [0])
+    return len(sizes), sum(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20_000, help='articles in the (already filtered) frame')
+    parser.add_argument('--cards', default='3,50,200', help='cards per page')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for cards in [int(c) for c in args.cards.split(',')]:
+        for mode in ('legacy', 'batched'):
+            at = AppTest.from_function(card_script, default_timeout=300, args=(ROOT, args.rows, cards, mode))
+            for _ in range(args.repeats):
+                at.run()
+                if at.exception:
+                    raise RuntimeError(at.exception[0].value)
+            messages, size = payload(at)
+            render_ms = at.session_state['render_ms']
+            rows.append({'Cards': cards, 'Renderer': mode, 'Render_ms': float(np.median(render_ms[1:] or render_ms)),
+                         'Deltas': messages, 'Payload_KB': size / 1024})
+
+    report = pd.DataFrame(rows)
+    print(report.round(2).to_string(index=False))
+    for cards, group in report.groupby('Cards'):
+        legacy, batched = group.set_index('Renderer').loc[['legacy', 'batched']].to_dict('records')
+        print(f"{cards:>4} cards: {legacy['Render_ms'] / batched['Render_ms']:.1f}x faster, "
+              f"{legacy['Deltas']} -> {batched['Deltas']} deltas, "
+              f"payload {legacy['Payload_KB']:.1f} KB -> {batched['Payload_KB']:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Confidence-gated cascade for the news sentiment consensus (pipeline.cascade), replayed on news that
+already holds every model's Score_*: the cheapest model (MODELS_CONFIG 'cost') scores every article,
+the next one only where the scores so far disagree by more than --disagreement or the consensus is
+within --min-confidence of neutral.
+
+Per threshold: (article, model) calls saved, cost-weighted saving (cost = params in B), mean
+|consensus drift| per article and per (date, sector) q_score - the sentiment signal the sector-history
+prompt is built from. How much Final_Daily_Score moves in turn depends on how a trained sector model
+reacts to that q_score; a stand-in model cannot show it, so that accuracy comparison is out of scope.
+
+Sources (fixtures are written to a temp dir through CheckpointStore, never to csv_checkpoint/):
+    synthetic  correlated scores: shared latent sentiment + per-model noise --noise, close to what three
+               instruct models give on real news (default)
+    random     independent uniform scores per model: the models almost never agree -> little is saved
+    checkpoint a real pipeline checkpoint with Score_* columns (--checkpoint in --checkpoint-dir)
+
+    python -m benchmarks.bench_cascade
+    python -m benchmarks.bench_cascade --rows 2000 --disagreement 0.3,0.5,0.8
+    python -m benchmarks.bench_cascade --source checkpoint --checkpoint sentiment_final
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.cascade import (CONSENSUS_COLUMN, CascadePolicy, cascade_order, cascade_summary, replay, score_column,
+                              weighted_consensus)
+from pipeline.checkpoint import CheckpointStore
+from pipeline.sector_history import prepare_news, sector_signals
+from benchmarks.synthetic import make_news_frame
+
+MODELS_CONFIG = [
+    {"name": "Qwen/Qwen2.5-14B-Instruct", "weight": 0.2, "cost": 14},
+    {"name": "meta-llama/Meta-Llama-3.1-8B-Instruct", "weight": 0.2, "cost": 8},
+    {"name": "google/gemma-3-12b-it", "weight": 0.2, "cost": 12},
+]
+
+
+def load_scores(args):
+    if args.source == 'checkpoint':
+        store = CheckpointStore(args.checkpoint_dir)
+        return store.read(args.checkpoint), str(store.find(args.checkpoint))
+    df = make_news_frame(args.rows, content_words=20)   # random: Score_* สุ่มอิสระต่อโมเดล
+    if args.source == 'synthetic':
+        rng = np.random.default_rng(2)
+        latent = rng.uniform(-1, 1, len(df))
+        for config in MODELS_CONFIG:
+            df[score_column(config['name'])] = np.clip(latent + rng.normal(0, args.noise, len(df)), -1, 1).round(2)
+    # อ่านกลับผ่าน CheckpointStore เหมือน checkpoint จริง แต่ใน temp dir
+    with tempfile.TemporaryDirectory(prefix='marketmind-cascade-') as tmp_dir:
+        store = CheckpointStore(tmp_dir)
+        store.write('news_scores', df)
+        df = store.read('news_scores')
+    return df, f"{args.source} ({len(df)} rows{f', noise {args.noise}' if args.source == 'synthetic' else ''})"
+
+
+def q_scores(df):
+    expanded_df, target_dates = prepare_news(df)
+    return sector_signals(expanded_df, target_dates, context_tokens=None)['q_score'].to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', choices=['synthetic', 'random', 'checkpoint'], default='synthetic')
+    parser.add_argument('--checkpoint-dir', default='csv_checkpoint')
+    parser.add_argument('--checkpoint', default='sentiment_final')
+    parser.add_argument('--rows', type=int, default=1000, help='synthetic / random rows')
+    parser.add_argument('--noise', type=float, default=0.15, help='synthetic per-model score noise (std)')
+    parser.add_argument('--disagreement', default='0.5,0.3,0.8,1.2')
+    parser.add_argument('--min-confidence', type=float, default=0.2)
+    args = parser.parse_args()
+
+    df, source = load_scores(args)
+    order = cascade_order(MODELS_CONFIG)
+    full = df.copy()
+    full[CONSENSUS_COLUMN] = weighted_consensus(full, order)
+    full_q = q_scores(full)
+    print(f"Source: {source}")
+    print("Cascade order: " + " -> ".join(f"{c['name'].split('/')[-1]} ({c['cost']}B)" for c in order))
+
+    report = []
+    for threshold in [float(t) for t in args.disagreement.split(',')]:
+        policy = CascadePolicy(disagreement=threshold, min_confidence=args.min_confidence)
+        start = time.perf_counter()
+        cascaded = replay(df, MODELS_CONFIG, policy)
+        replay_ms = (time.perf_counter() - start) * 1000
+        summary = cascade_summary(cascaded, order)
+        drift = (cascaded[CONSENSUS_COLUMN] - full[CONSENSUS_COLUMN]).abs()
+        report.append({
+            'Disagreement': threshold, 'Min_Conf': args.min_confidence,
+            **{f"Calls_{name}": calls for name, calls in summary['per_model'].items()},
+            'Calls_Saved': summary['calls_saved'], 'Cost_Saved': summary['cost_saved'],
+            'Consensus_Drift': drift.mean(), 'Drift_p95': drift.quantile(0.95),
+            'Q_Score_Drift': float(np.abs(q_scores(cascaded) - full_q).mean()), 'Replay_ms': replay_ms,
+        })
+    print(pd.DataFrame(report).round(3).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Compares today's CSV checkpoints with the Parquet backend of CheckpointStore:
+on-disk size, full load time, and the projected load the dashboard actually does.
+
+    python -m benchmarks.bench_checkpoint_format --rows 20000
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.checkpoint import CheckpointStore, CHECKPOINT_DIR
+from benchmarks.synthetic import make_news_frame
+
+NEWS_PROJECTION = ['Date', 'Source', 'Title', 'Link', 'Content', 'Combined_Sector', 'Short_Ans',
+                   'Score_Qwen2.5-14B-Instruct']
+SECTOR_PROJECTION = ['Report_Date', 'Sector', 'News_Volume', 'Final_Daily_Score', 'Final_Outlook']
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_one(name, df_csv_source, csv_path, projection, tmp_dir):
+    csv_store = CheckpointStore(os.path.dirname(csv_path), fmt='csv')
+    pq_store = CheckpointStore(tmp_dir, fmt='parquet')
+    pq_path = pq_store.write(name, csv_store.read_path(csv_path))
+
+    csv_full = timed(lambda: pd.read_csv(csv_path))
+    pq_full = timed(lambda: pq_store.read(name))
+    csv_proj = timed(lambda: csv_store.read_path(csv_path, columns=projection))
+    pq_proj = timed(lambda: pq_store.read(name, columns=projection))
+
+    return {
+        'Checkpoint': name,
+        'Rows': len(df_csv_source),
+        'CSV_MB': os.path.getsize(csv_path) / 1e6,
+        'Parquet_MB': os.path.getsize(pq_path) / 1e6,
+        'CSV_Load_ms': csv_full * 1e3,
+        'Parquet_Load_ms': pq_full * 1e3,
+        'CSV_Projected_ms': csv_proj * 1e3,
+        'Parquet_Projected_ms': pq_proj * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000, help='rows of the synthetic news checkpoint')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 1. Checkpoints ที่มีอยู่จริงใน csv_checkpoint/
+        for csv_path in sorted(glob.glob(os.path.join(CHECKPOINT_DIR, '*.csv'))):
+            name = os.path.splitext(os.path.basename(csv_path))[0]
+            df = pd.read_csv(csv_path)
+            projection = SECTOR_PROJECTION if 'Report_Date' in df.columns else NEWS_PROJECTION
+            results.append(bench_one(name, df, csv_path, projection, tmp_dir))
+
+        # 2. Synthetic news archive (ขนาดเท่าที่ต้องการ)
+        df = make_news_frame(args.rows)
+        csv_path = os.path.join(tmp_dir, 'synthetic_news.csv')
+        df.to_csv(csv_path, index=False)
+        results.append(bench_one('synthetic_news', df, csv_path, NEWS_PROJECTION, tmp_dir))
+
+    report = pd.DataFrame(results)
+    report['Size_Ratio'] = report['CSV_MB'] / report['Parquet_MB']
+    report['Projected_Speedup'] = report['CSV_Projected_ms'] / report['Parquet_Projected_ms']
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(report.round(2).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
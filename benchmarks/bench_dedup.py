@@ -0,0 +1,135 @@
+"""
+MinHash/LSH near-duplicate stage on a synthetic corpus with injected syndicated copies.
+
+Copies keep the story but change a few words, the headline suffix and the tail, like
+Reuters/AP pieces re-published by different outlets. Reports build time, incremental add
+time against a persisted index, precision/recall against the injected clusters, and the
+all-pairs TF-IDF cosine baseline (quadratic) for comparison at smaller sizes.
+
+    python -m benchmarks.bench_dedup --rows 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.dedup import NearDupIndex
+from benchmarks.synthetic import SOURCES, WORDS, make_news_frame
+
+
+def make_corpus(n, dup_fraction=0.2, edit_rate=0.03, content_words=200, seed=0):
+    """-> DataFrame[Title, Content, Cluster, Is_Copy, Link]; Cluster = id ของข่าวต้นฉบับ"""
+    rng = np.random.default_rng(seed)
+    n_dup = int(n * dup_fraction)
+    base = make_news_frame(n - n_dup, seed=seed, content_words=content_words)
+    titles, contents = base['Title'].tolist(), base['Content'].tolist()
+    cluster = list(range(len(base)))
+    words = np.array(WORDS)
+
+    for src in np.sort(rng.integers(0, len(base), n_dup)):
+        tokens = contents[src].split()
+        edits = rng.random(len(tokens)) < edit_rate
+        tokens = [str(words[rng.integers(len(words))]) if e else t for t, e in zip(tokens, edits)]
+        tail = int(rng.integers(0, 15))
+        titles.append(f"{titles[src]} - {SOURCES[rng.integers(len(SOURCES))]}")
+        contents.append(" ".join(tokens[:len(tokens) - tail]))
+        cluster.append(src)
+
+    df = pd.DataFrame({'Title': titles, 'Content': contents, 'Cluster': cluster})
+    df = df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+    # ตัวแรกของแต่ละ cluster ตามลำดับที่เห็น = ตัวแทน, ที่เหลือคือ copy ที่ควรถูก flag
+    df['Is_Copy'] = df.groupby('Cluster').cumcount() > 0
+    df['Link'] = [f"https://www.investing.com/news/stock-market-news/article-{i}" for i in range(len(df))]
+    return df
+
+
+def score(df, result, cluster_of=None):
+    flagged = result['Is_Duplicate'].to_numpy()
+    cluster_of = cluster_of or dict(zip(df["Link"], df["Cluster"]))
+    correct = flagged & (result['Dup_Of'].map(cluster_of).to_numpy() == df['Cluster'].to_numpy())
+    truth = df['Is_Copy'].to_numpy()
+    return {
+        'Precision': correct.sum() / max(flagged.sum(), 1),
+        'Recall': (correct & truth).sum() / max(truth.sum(), 1),
+        'Flagged': int(flagged.sum()),
+        'True_copies': int(truth.sum()),
+    }
+
+
+def texts_of(df):
+    return (df['Title'] + " " + df['Content']).tolist()
+
+
+def brute_force_tfidf(texts, threshold=0.8, chunk=2000):
+    """README's TF-IDF + cosine approach: all pairs, O(n^2)"""
+    matrix = TfidfVectorizer().fit_transform(texts)
+    pairs = 0
+    for start in range(0, matrix.shape[0], chunk):
+        sim = (matrix[start:start + chunk] @ matrix.T).toarray()
+        pairs += int((sim > threshold).sum())
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--new-rows', type=int, default=1000, help='articles added in the incremental run')
+    parser.add_argument('--content-words', type=int, default=200)
+    parser.add_argument('--brute-sizes', default='2000,5000,10000')
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} articles (20% near-duplicate copies)...")
+    df = make_corpus(args.rows, content_words=args.content_words)
+    rows = []
+
+    # 1. Full build at increasing sizes (sub-quadratic growth)
+    for n in sorted({args.rows // 10, args.rows // 2, args.rows}):
+        part = df.iloc[:n]
+        index = NearDupIndex()
+        start = time.perf_counter()
+        result = index.add(part['Link'], texts_of(part))
+        seconds = time.perf_counter() - start
+        rows.append({'Run': 'LSH build', 'Rows': n, 'Seconds': seconds, 'Representatives': len(index),
+                     **score(part, result)})
+
+    # 2. Incremental: persisted index of the first rows, then only the new articles
+    old, new = df.iloc[:-args.new_rows], df.iloc[-args.new_rows:]
+    index = NearDupIndex()
+    old_result = index.add(old['Link'], texts_of(old))
+    path = index.save(os.path.join(tempfile.mkdtemp(), 'near_dup_lsh.npz'))
+    start = time.perf_counter()
+    index = NearDupIndex.load(path)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    new_result = index.add(new['Link'], texts_of(new))
+    seconds = time.perf_counter() - start
+    full = pd.concat([old_result, new_result], ignore_index=True)
+    rows.append({'Run': f'LSH load ({load_seconds:.2f}s) + add', 'Rows': len(new), 'Seconds': seconds,
+                 'Representatives': len(index), **score(new, new_result, dict(zip(df['Link'], df['Cluster'])))})
+    rows.append({'Run': 'LSH build + incremental (all rows)', 'Rows': len(df), 'Seconds': np.nan,
+                 'Representatives': len(index), **score(df, full)})
+
+    # 3. All-pairs TF-IDF cosine (README approach)
+    for n in [int(s) for s in args.brute_sizes.split(',') if s]:
+        start = time.perf_counter()
+        brute_force_tfidf(texts_of(df.iloc[:n]))
+        rows.append({'Run': 'TF-IDF all pairs', 'Rows': n, 'Seconds': time.perf_counter() - start})
+
+    report = pd.DataFrame(rows)
+    print(report.round(3).to_string(index=False))
+
+    brute = report[report['Run'] == 'TF-IDF all pairs']
+    if len(brute):
+        last = brute.iloc[-1]
+        est = last['Seconds'] * (args.rows / last['Rows']) ** 2
+        print(f"\nTF-IDF all pairs extrapolated to {args.rows:,} rows: ~{est:,.0f}s (quadratic)")
+
+
+if __name__ == '__main__':
+    main()
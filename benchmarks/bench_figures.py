@@ -0,0 +1,108 @@
+"""
+Plotly figure construction on every rerun vs the figure cache (figures.py), on the checkpoints
+in csv_checkpoint/ and benchmark_results/.
+
+Per figure kind: cold = build + the serialization st.plotly_chart does (to_dict + to_json),
+hot = cache hit + the same serialization. Then the Sector Detail page is run through every
+sector twice with streamlit.testing (AppTest): first pass builds, second pass is all hits.
+
+    python -m benchmarks.bench_figures
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+import data_loader
+import figures
+
+
+def serialize(fig):
+    """สิ่งที่ st.plotly_chart ทำกับ Figure ทุก rerun"""
+    return pio.to_json(fig.to_dict(), validate=False)
+
+
+def median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def main_sectors(df):
+    """Sector Detail แสดงเฉพาะ 11 sector หลัก"""
+    return df[df['Sector'].isin(data_loader.MAIN_SECTORS)] if not df.empty else df
+
+
+def figure_cases():
+    """(kind, version, key, build) ของทุก figure บน dashboard"""
+    snapshot = data_loader.load_sector_snapshot()
+    enriched = main_sectors(data_loader.load_sector_enriched())
+    benchmark = data_loader.load_benchmark()
+    cases = []
+    if not snapshot.empty:
+        chart = snapshot[snapshot['Sector'].isin(data_loader.MAIN_SECTORS)]
+        cases.append(('treemap', data_loader.data_version('sector_history'), 'all',
+                      lambda: figures.sector_treemap(chart)))
+    version = data_loader.data_version('sector_enriched')
+    for sector in sorted(enriched['Sector'].unique()) if not enriched.empty else []:
+        data = enriched[enriched['Sector'] == sector].sort_values(by='Report_Date')
+        score = data.iloc[-1]['Final_Daily_Score']
+        cases.append(('gauge', version, sector, lambda score=score: figures.gauge_chart(score)))
+        cases.append(('trend', version, sector, lambda data=data: figures.sector_trend(data)))
+    if not benchmark.empty:
+        cases.append(('benchmark_bars', data_loader.data_version('benchmark'), 'all',
+                      lambda: figures.benchmark_bars(benchmark)))
+    return cases
+
+
+def page_pass(at, sectors):
+    start = time.perf_counter()
+    for sector in sectors:
+        at.selectbox(key='selected_sector').select(sector).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return (time.perf_counter() - start) * 1000 / len(sectors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for kind, version, key, build in figure_cases():
+        cold = median_ms(lambda: serialize(build()), args.repeats)
+        figures.figure(kind, version, key, build)                    # warm
+        hot = median_ms(lambda: serialize(figures.figure(kind, version, key, build)), args.repeats)
+        rows.append({'Figure': kind, 'Key': key, 'Cold_ms': cold, 'Hot_ms': hot})
+
+    report = pd.DataFrame(rows)
+    summary = report.groupby('Figure', sort=False).agg(Figures=('Key', 'size'), Cold_ms=('Cold_ms', 'median'),
+                                                       Hot_ms=('Hot_ms', 'median'))
+    summary['Speedup'] = summary['Cold_ms'] / summary['Hot_ms']
+    print(summary.round(2).to_string())
+    print("\nfigures.stats():")
+    print(figures.stats().round(2).to_string(index=False))
+
+    # Sector Detail: เปลี่ยน sector ครบทุกตัว 2 รอบ (รอบแรก cache ว่าง)
+    figures._cached_figure.clear()
+    sectors = sorted(main_sectors(data_loader.load_sector_enriched())['Sector'].unique())
+    at = AppTest.from_file(os.path.join(ROOT, 'pages', '2_Sector_Detail.py'), default_timeout=120).run()
+    cold = page_pass(at, sectors)
+    hot = page_pass(at, sectors)
+    print(f"\nSector Detail rerun per sector change: {cold:.1f} ms (building) -> {hot:.1f} ms (cached), "
+          f"{cold / hot:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
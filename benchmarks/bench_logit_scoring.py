@@ -0,0 +1,97 @@
+"""
+News sentiment scoring: generate the JSON answer and parse the float (today's MODELS_CONFIG loop,
+max_new_tokens=80), schema-constrained generation (pipeline.structured), and one prefill that reads
+the Positive / Negative / Neutral label logits (pipeline.logit_scoring).
+
+Reports throughput and how well each generative path agrees with the logit scores: same category
+(argmax label) and Pearson correlation of the scores. On the offline stand-in the generated floats
+are noise, so agreement is only meaningful with a real instruct model (--model); category agreement
+with the schema path is exact by construction (both pick the best label token after the same prefix).
+
+    python -m benchmarks.bench_logit_scoring --rows 64
+    python -m benchmarks.bench_logit_scoring --model Qwen/Qwen2.5-0.5B-Instruct
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.batching import plan_batches
+from pipeline.inference import generate_batch, load_model
+from pipeline.logit_scoring import label_responses
+from pipeline.sector_history import encode_prompts
+from pipeline.structured import generate_json
+from pipeline.tasks import SENTIMENT_FORMAT, _extract_json, parse_sentiment_score, sentiment_task, task_prompt
+from benchmarks.synthetic import make_news_frame
+from benchmarks.standin import save_standin
+
+
+def category(text):
+    data = _extract_json(text)
+    return data.get('category') if isinstance(data, dict) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=64)
+    parser.add_argument('--batch-tokens', type=int, default=16384)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--model', default=None, help='HF model id/path (default: offline stand-in)')
+    parser.add_argument('--hidden-size', type=int, default=256)
+    parser.add_argument('--layers', type=int, default=4)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model_path = args.model or save_standin(hidden_size=args.hidden_size, num_layers=args.layers)
+    model, tokenizer = load_model(model_path, device='cpu')
+    df = make_news_frame(args.rows, content_words=300)
+    task = sentiment_task()
+    sequences = encode_prompts(tokenizer, [task_prompt(t, c, task) for t, c in zip(df['Title'], df['Content'])])
+    max_new = task.max_new_tokens
+
+    engines = {
+        'generate': (lambda seqs: generate_batch(model, tokenizer, seqs, max_new), max_new),
+        'schema': (lambda seqs: generate_json(model, tokenizer, seqs, max_new, SENTIMENT_FORMAT), max_new),
+        'logits': (lambda seqs: label_responses(model, tokenizer, seqs), 0),
+    }
+    lengths = [len(s) for s in sequences]
+    responses, rows = {}, []
+    for name, (engine, new_tokens) in engines.items():
+        batches = plan_batches(lengths, args.batch_tokens, args.batch_size, new_tokens)
+        texts, generated = [None] * len(sequences), 0
+        start = time.perf_counter()
+        for batch in batches:
+            decoded, n_new = engine([sequences[b] for b in batch])
+            generated += n_new
+            for b, text in zip(batch, decoded):
+                texts[b] = text
+        seconds = time.perf_counter() - start
+        responses[name] = texts
+        rows.append({'Engine': name, 'Batches': len(batches), 'Seconds': seconds,
+                     'Articles_per_s': len(sequences) / seconds, 'New_Tokens': generated})
+
+    logit_scores = np.array([parse_sentiment_score(t) for t in responses['logits']])
+    logit_labels = [category(t) for t in responses['logits']]
+    for row in rows:
+        texts = responses[row['Engine']]
+        scores = np.array([parse_sentiment_score(t) for t in texts])
+        row['Parsed'] = sum(category(t) is not None for t in texts)
+        row['Same_Category'] = float(np.mean([category(t) == label for t, label in zip(texts, logit_labels)]))
+        row['Score_Corr'] = float(np.corrcoef(scores, logit_scores)[0, 1]) if scores.std() and logit_scores.std() else np.nan
+
+    report = pd.DataFrame(rows)
+    print(report.round(3).to_string(index=False))
+    print("\nExample logit answer:", json.dumps(json.loads(responses['logits'][0])))
+    base = report.set_index('Engine')['Seconds']
+    print(f"Logit scoring: {base['generate'] / base['logits']:.1f}x faster than generate, "
+          f"{base['schema'] / base['logits']:.1f}x faster than schema-constrained")
+
+
+if __name__ == '__main__':
+    main()
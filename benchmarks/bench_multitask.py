@@ -0,0 +1,143 @@
+"""
+Single-load multi-task inference vs the current three-load flow.
+
+Current flow: NewsClassifier, the sentiment loop and NewsSummarizer each load the model,
+build and tokenize their own full prompts, generate, and unload.
+New flow: ModelTaskRunner loads once, tokenizes each article once and runs all tasks.
+
+Both flows decode the same way (free-form generate to each task's max_new_tokens, no prefix cache),
+so three-load vs single-load measures the loads and tokenization the runner saves (its batches are
+still length-bucketed). The runner's pipeline defaults - schema-constrained JSON for sector /
+sentiment and the shared-prefix KV cache - change how much is generated, not how often the model
+is loaded; they are reported separately as 'single-load+json' and left out of the comparison.
+New_Tokens must match between three-load and single-load. The stand-in loads from the page cache in
+a few ms, so on it the two flows take about the same time; the saving is the load time of a real
+checkpoint (tens of seconds for a 14B model) times the two loads avoided.
+
+    python -m benchmarks.bench_multitask --rows 64
+    python -m benchmarks.bench_multitask --model Qwen/Qwen2.5-0.5B-Instruct   # real small model
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import pandas as pd
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.inference import ModelTaskRunner, load_model, release_memory, count_new_tokens
+from pipeline.tasks import (EXISTING_SECTORS, parse_sector, parse_sentiment_score, sector_task, sentiment_task,
+                            summary_task)
+from benchmarks.synthetic import make_news_frame
+from benchmarks.standin import save_standin
+
+
+def legacy_prompt(task, title, content):
+    """Prompts exactly as the per-stage notebook cells build them."""
+    if task == 'sector':
+        return f"""Classify into JSON.
+Sectors: {EXISTING_SECTORS}
+If unrelated, use "Other".
+News: "{title}"
+Snippet: "{str(content)[:500]}..."
+Format: {{"sector": "..."}}"""
+    if task == 'sentiment':
+        text = (f"{title}\n{content}")[:3000]
+        return f"""Analyze the sentiment of this financial news.
+Consider the impact on the company, sector, or economy mentioned.
+
+News: "{text}"
+
+Return ONLY a JSON object with this format:
+{{
+  "category": "Positive" or "Negative" or "Neutral",
+  "score": <float number between -1.0 to 1.0>
+}}"""
+    return f"""Task: Summarize the financial news into 1 sentence.
+News: {title} - {str(content)[:1000]}...
+Summary:"""
+
+
+def run_legacy(model_path, df, tasks, batch_size):
+    rows = []
+    for task in tasks:
+        start_load = time.perf_counter()
+        model, tokenizer = load_model(model_path, device='cpu')
+        load_seconds = time.perf_counter() - start_load
+
+        start = time.perf_counter()
+        new_tokens = 0
+        for i in range(0, len(df), batch_size):
+            batch = df.iloc[i : i + batch_size]
+            prompts = [
+                tokenizer.apply_chat_template([{"role": "user", "content": legacy_prompt(task.name, t, c)}],
+                                              tokenize=False, add_generation_prompt=True)
+                for t, c in zip(batch['Title'], batch['Content'])
+            ]
+            inputs = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True, max_length=2048)
+            with torch.no_grad():
+                outputs = model.generate(**inputs, max_new_tokens=task.max_new_tokens, do_sample=False,
+                                         pad_token_id=tokenizer.pad_token_id)
+            generated = outputs[:, inputs.input_ids.shape[1]:]
+            new_tokens += count_new_tokens(generated, tokenizer.eos_token_id, tokenizer.pad_token_id)
+            tokenizer.batch_decode(generated, skip_special_tokens=True)
+        seconds = time.perf_counter() - start
+
+        del model, tokenizer
+        release_memory()
+        rows.append({'Flow': 'three-load', 'Task': task.name, 'Load_s': load_seconds, 'Generate_s': seconds,
+                     'New_Tokens': new_tokens, 'Tokens_per_s': new_tokens / seconds})
+    return rows
+
+
+def free_form(task):
+    """task เดิมแต่ generate อิสระจน max_new_tokens / eos เหมือน flow เดิม (ไม่ใช้ JSON schema -> parser แบบมี fallback)"""
+    task = copy.copy(task)
+    task.json_format = None
+    task.parse = {'sector': parse_sector, 'sentiment': parse_sentiment_score}.get(task.name, task.parse)
+    return task
+
+
+def run_unified(model_path, df, tasks, batch_size, flow='single-load', prefix_cache=False):
+    runner = ModelTaskRunner(model_path, tasks, device='cpu', batch_size=batch_size, prefix_cache=prefix_cache)
+    runner.run(df)
+    load_seconds = runner.stats['load_seconds']
+    rows = []
+    for i, (_, stat) in enumerate(runner.report().set_index('Task').iterrows()):
+        rows.append({'Flow': flow, 'Task': tasks[i].name, 'Load_s': load_seconds if i == 0 else 0.0,
+                     'Generate_s': stat['seconds'], 'New_Tokens': stat['new_tokens'],
+                     'Tokens_per_s': stat['tokens_per_sec']})
+    runner.release()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=64)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--model', default=None, help='HF model id/path (default: offline stand-in)')
+    parser.add_argument('--hidden-size', type=int, default=256, help='stand-in hidden size')
+    parser.add_argument('--layers', type=int, default=4, help='stand-in layers')
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model_path = args.model or save_standin(hidden_size=args.hidden_size, num_layers=args.layers)
+    df = make_news_frame(args.rows, content_words=200)
+    df['Sector'] = 'Other'   # ให้ sector task ทำทุกแถวเหมือน task อื่น (เทียบกันได้ตรงๆ)
+    tasks = [sector_task(), sentiment_task(), summary_task()]
+
+    report = pd.DataFrame(run_legacy(model_path, df, tasks, args.batch_size) +
+                          run_unified(model_path, df, [free_form(t) for t in tasks], args.batch_size) +
+                          run_unified(model_path, df, tasks, args.batch_size, 'single-load+json', prefix_cache=True))
+    print(report.round(3).to_string(index=False))
+
+    totals = report.groupby('Flow', sort=False)[['Load_s', 'Generate_s', 'New_Tokens']].sum()
+    totals['Total_s'] = totals['Load_s'] + totals['Generate_s']
+    print("\nTotals (three-load vs single-load = same decoding; single-load+json = pipeline defaults, not comparable):")
+    print(totals.round(3).to_string())
+
+
+if __name__ == '__main__':
+    main()
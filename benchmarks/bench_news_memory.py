@@ -0,0 +1,137 @@
+"""
+Resident memory of the dashboard's news data: today's frame (full cleaned Content in memory,
+Score_* columns, previews/dates/colours recomputed per rerun) vs the lean frame with precomputed
+display columns and zlib-compressed bodies (data_loader._load_news_tables).
+
+Each variant loads the same checkpoint in a fresh process and builds the search index. RSS is
+reported at the end of the load (peak) and after freeing load-time temporaries (what a Streamlit
+server keeps resident for one data version). Also times one News Center page of cards built
+from each frame.
+
+    python -m benchmarks.bench_news_memory --rows 50000
+    python -m benchmarks.bench_news_memory --checkpoint csv_checkpoint/news_summary.csv
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+
+def rss_mb():
+    import psutil
+    return psutil.Process().memory_info().rss / 1024**2
+
+
+def release_free_memory():
+    """คืนหน่วยความจำชั่วคราวตอนโหลด (arrow buffers, string ชั่วคราว) ให้ OS -> RSS ที่เหลือคือของที่ค้างอยู่จริง"""
+    import ctypes
+    import gc
+    import pyarrow as pa
+    gc.collect()
+    pa.default_memory_pool().release_unused()
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except OSError:
+        pass
+
+
+def legacy_load(path):
+    """_load_news ก่อนมี presentation materialization (frame เก็บ Content เต็ม + Score_*)"""
+    import data_loader
+    df = data_loader._read_typed(path, columns=data_loader.NEWS_COLUMNS)
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    score_col = next((c for c in data_loader.NEWS_SCORE_COLUMNS if c in df.columns), None)
+    df['Sentiment_Score'] = df[score_col] * 10 if score_col else 5.0
+    df['Combined_Sector'] = df['Combined_Sector'].fillna('General')
+    labels, df[data_loader.SECTOR_MASK_COLUMN] = data_loader.sector_bitmask(df['Combined_Sector'])
+    df.attrs['sector_labels'] = labels
+    df['Content'] = df['Content'].fillna('').astype(str).map(data_loader.clean_news_content)
+    df['Short_Ans'] = df['Short_Ans'].fillna('') if 'Short_Ans' in df.columns else ''
+    return df
+
+
+def child(variant, path):
+    """รันใน process แยก: โหลด 1 data version แล้วรายงานหน่วยความจำ"""
+    import news_cards
+    import data_loader
+    from search_index import SearchIndex
+
+    before = rss_mb()
+    start = time.perf_counter()
+    if variant == 'legacy':
+        df = legacy_load(path)
+        bodies_bytes = 0
+        index = SearchIndex(df)
+    else:
+        signature = data_loader.file_signature(path)
+        df, bodies = data_loader._load_news_tables(path, *signature)
+        bodies_bytes = bodies.memory_bytes()
+        index = data_loader._load_search_index(path, *signature)
+    load_s = time.perf_counter() - start
+    peak = rss_mb()
+    release_free_memory()
+    after = rss_mb()
+
+    page = df.sort_values('Date', ascending=False).head(news_cards.PAGE_SIZE)
+    times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        news_cards.card_fragments(page, news_cards.NEWS_CENTER_CARD)
+        times.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        'Variant': variant, 'Rows': len(df), 'Load_s': load_s,
+        'Frame_MB': df.memory_usage(deep=True).sum() / 1024**2,
+        'Bodies_MB': bodies_bytes / 1024**2,
+        'Index_MB': index.memory_bytes() / 1024**2,
+        'RSS_peak_MB': peak - before,
+        'RSS_delta_MB': after - before,
+        'Page_cards_ms': float(np.median(times)) * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--content-words', type=int, default=400, help='~6 chars per word')
+    parser.add_argument('--checkpoint', help='real news checkpoint (.parquet/.csv) instead of synthetic rows')
+    parser.add_argument('--child', nargs=2, metavar=('VARIANT', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(*args.child)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.abspath(args.checkpoint) if args.checkpoint else None
+        if path is None:
+            from pipeline.checkpoint import CheckpointStore
+            from benchmarks.synthetic import make_news_frame
+            print(f"Generating {args.rows:,} articles...")
+            df = make_news_frame(args.rows, content_words=args.content_words)
+            path = CheckpointStore(tmp_dir, fmt='parquet').write('news_summary', df)
+
+        rows = []
+        for variant in ('legacy', 'lean'):
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_news_memory', '--child', variant, path],
+                                 cwd=ROOT, capture_output=True, text=True, check=True).stdout
+            rows.append(json.loads(out.strip().splitlines()[-1]))
+
+    report = pd.DataFrame(rows)
+    print(report.round(2).to_string(index=False))
+    legacy, lean = report.iloc[0], report.iloc[1]
+    print(f"\nResident (RSS) {legacy['RSS_delta_MB']:.0f} MB -> {lean['RSS_delta_MB']:.0f} MB "
+          f"({legacy['RSS_delta_MB'] / max(lean['RSS_delta_MB'], 1e-9):.1f}x less), "
+          f"frame {legacy['Frame_MB']:.0f} MB -> {lean['Frame_MB'] + lean['Bodies_MB']:.0f} MB incl. compressed bodies")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Prep / generate / post overlap (pipeline.overlap.run_pipelined) vs the one-thread batch loop, for the
+ModelTaskRunner tasks (sector + sentiment + summary, journal + inference cache on every batch like the notebook)
+and the sector-history jobs (run_model_jobs with an inference cache).
+
+Each row reports the busy time of the three phases, the wall time and how much of it overlapped, with
+--depth 0 (sequential, today's loop) and --depth N (worker threads, bounded queues of N batches).
+Answers must be identical. The overlap can hide at most min(generate, prep + post): batches are planned
+from estimated lengths (estimate_lengths), so prep renders the chat template and tokenizes each batch. Post decodes
+the free-form batches (summary: generate_batch(decode=False) hands back token ids) and parses / appends
+to the journal / commits to SQLite; the JSON tasks decode inside generate_json, which needs the text to
+stop each row. On the CPU stand-in prep + post stay under 1% of the wall time, so the wall-time
+difference between depths is mostly run-to-run noise and the threads can even add contention; it pays
+off when generate runs on a GPU (the CPU is free meanwhile), with a large-vocabulary tokenizer's decode,
+or when post is heavy (network filesystem, large journals).
+
+    python -m benchmarks.bench_overlap --rows 96
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.inference import ModelTaskRunner, load_model
+from pipeline.inference_cache import InferenceCache
+from pipeline.journal import ResultJournal
+from pipeline.sector_history import build_jobs, prepare_news, run_model_jobs
+from pipeline.tasks import sector_task, sentiment_task, summary_task
+from pipeline.timing import StageTimer
+from benchmarks.synthetic import make_news_frame
+from benchmarks.standin import save_standin
+
+
+def run_tasks(model_path, model, tokenizer, df, depth, batch_size, workdir):
+    """notebook cell ของ unified inference: journal.append + cache.store ทุก batch"""
+    cache = InferenceCache(os.path.join(workdir, f'cache-{depth}.sqlite'))
+    journal = ResultJournal(f'tasks-{depth}', base_dir=workdir)
+
+    def on_batch(task_name, batch_idx, values):
+        journal.append([{'Link': df.at[idx, 'Link'], 'Model': task_name, 'Value': value}
+                        for idx, value in zip(batch_idx, values)])
+
+    runner = ModelTaskRunner(model_path, [sector_task(), sentiment_task(), summary_task()], model=model, tokenizer=tokenizer,
+                             batch_size=batch_size, cache=cache, overlap_depth=depth)
+    results = runner.run(df, on_batch=on_batch)
+    cache.close()
+    rows = []
+    for task_name, stat in runner.stats.items():
+        if not isinstance(stat, dict): continue
+        rows.append({'Stage': f'runner:{task_name}', 'Depth': depth, 'Batches': stat['batches'],
+                     'Prep_s': stat['prep_seconds'], 'Generate_s': stat['generate_seconds'],
+                     'Post_s': stat['post_seconds'], 'Wall_s': stat['seconds'], 'Overlap_s': stat['overlap_seconds']})
+    return rows, {name: list(values) for name, values in results.items()}
+
+
+def run_history(model, tokenizer, jobs, depth, batch_size, max_new_tokens, workdir):
+    cache = InferenceCache(os.path.join(workdir, f'history-{depth}.sqlite'))
+    timer = StageTimer()
+    responses = run_model_jobs('standin', jobs, timer, model=model, tokenizer=tokenizer, cache=cache,
+                               max_batch_size=batch_size, max_new_tokens=max_new_tokens, temperature=0,
+                               overlap_depth=depth)
+    cache.close()
+    report = timer.report().set_index('Stage')['Seconds']
+    generate = timer.report().set_index('Stage').loc['generate']
+    return [{'Stage': 'sector_history', 'Depth': depth, 'Batches': int(generate['Batches']),
+             'Prep_s': report['prep'], 'Generate_s': report['generate'], 'Post_s': report['post'],
+             'Wall_s': generate['Wall_s'], 'Overlap_s': generate['Overlap_s']}], responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=96)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--max-new-tokens', type=int, default=40, help='sector-history answer budget')
+    parser.add_argument('--hidden-size', type=int, default=256)
+    parser.add_argument('--layers', type=int, default=4)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model_path = save_standin(hidden_size=args.hidden_size, num_layers=args.layers)
+    model, tokenizer = load_model(model_path, device='cpu')
+    df = make_news_frame(args.rows, content_words=150)
+    df['Sector'] = 'Other'
+    expanded_df, target_dates = prepare_news(make_news_frame(args.rows * 4, content_words=20))
+    jobs = build_jobs(expanded_df, target_dates)
+
+    report, answers = [], {}
+    with tempfile.TemporaryDirectory(prefix='marketmind-overlap-') as workdir:
+        for depth in (0, args.depth):
+            rows, task_answers = run_tasks(model_path, model, tokenizer, df, depth, args.batch_size, workdir)
+            history_rows, history_answers = run_history(model, tokenizer, jobs, depth, args.batch_size,
+                                                        args.max_new_tokens, workdir)
+            report += rows + history_rows
+            answers[depth] = (task_answers, history_answers)
+
+    report = pd.DataFrame(report)
+    report['Busy_s'] = report[['Prep_s', 'Generate_s', 'Post_s']].sum(axis=1)
+    print(report.round(3).to_string(index=False))
+    walls = report.groupby('Depth')['Wall_s'].sum()
+    print(f"\nWall time: sequential {walls[0]:.2f}s -> overlapped {walls[args.depth]:.2f}s "
+          f"({walls[0] / walls[args.depth]:.2f}x); identical answers: {answers[0] == answers[args.depth]}")
+
+
+if __name__ == '__main__':
+    main()
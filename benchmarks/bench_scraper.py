@@ -0,0 +1,126 @@
+"""
+Sequential article fetching (original scraper loop) vs the concurrent fetcher, against the local HTTP stand-in.
+
+Both paths use the same per-host rate limit; the stand-in adds a fixed latency per request.
+Articles on the last listing page are treated as already scraped, so the stop-on-known-link
+logic is exercised too. Also times html.parser vs lxml on the article pages.
+
+    python -m benchmarks.bench_scraper --pages 5 --per-page 20 --latency 0.15 --rate 20
+    python -m benchmarks.bench_scraper --recorded path/to/recorded_pages
+"""
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.scraper import (ArticleFetcher, HostRateLimiter, MIN_CONTENT_CHARS, extract_clean_text,
+                              mount_pool, parse_listing, scrape_new_articles)
+from benchmarks.http_standin import LISTING_PATH, StandinServer, load_recorded, synthetic_site
+
+
+def legacy_scrape(session, limiter, existing_links, max_pages, base_url, domain):
+    """The original loop: listing page, then each article fetched and parsed in turn (html.parser)."""
+    new_articles, seen = [], set()
+    for page in range(1, max_pages + 1):
+        url = f"{base_url}/{page}"
+        limiter.wait(url)
+        response = session.get(url, timeout=20)
+        if response.status_code != 200:
+            continue
+        listing = parse_listing(response.text, page, domain, parser="html.parser")
+        if not listing:
+            break
+        stop, candidates = False, []
+        for item in listing:
+            if item["Link"] in existing_links:
+                stop = True
+                break
+            if item["Link"] in seen or "comment" in item["Link"]:
+                continue
+            candidates.append(item)
+            seen.add(item["Link"])
+        for item in candidates:
+            limiter.wait(item["Link"])
+            content = extract_clean_text(session.get(item["Link"], timeout=20).text, parser="html.parser")
+            if content and len(content) > MIN_CONTENT_CHARS:
+                item["Content"] = content
+                new_articles.append(item)
+        if stop:
+            break
+    return new_articles
+
+
+def run(name, site, latency, fn):
+    with StandinServer(site, latency=latency) as server:
+        start = time.perf_counter()
+        articles = fn(server)
+        seconds = time.perf_counter() - start
+        row = {'Path': name, 'Articles': len(articles), 'Seconds': seconds,
+               'Articles_per_s': len(articles) / seconds if seconds else 0.0,
+               'Requests': server.requests, 'Connections': server.connections,
+               'Peak_concurrency': server.peak_concurrency}
+    return row, articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.15, help='seconds added to every response')
+    parser.add_argument('--rate', type=float, default=20.0, help='requests per second per host (both paths)')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--parse-processes', type=int, default=0)
+    parser.add_argument('--recorded', help='directory of recorded pages instead of synthetic ones')
+    args = parser.parse_args()
+
+    site = load_recorded(args.recorded) if args.recorded else synthetic_site(args.pages, args.per_page)
+    listing_pages = sorted(int(p.rsplit('/', 1)[1]) for p in site if p.rsplit('/', 1)[1].isdigit())
+    last_page = site[f"{LISTING_PATH}/{listing_pages[-1]}"].decode('utf-8')
+    # บทความในหน้าสุดท้าย = "มีอยู่แล้ว" -> ต้องหยุดที่หน้านั้น
+    existing = {item['Link'] for item in parse_listing(last_page, 0, domain='')}
+
+    def with_domain(server):
+        return {server.domain + link for link in existing}
+
+    def sequential(server):
+        session = requests.Session()
+        return legacy_scrape(session, HostRateLimiter(args.rate, jitter=0), with_domain(server),
+                             len(listing_pages), server.base_url, server.domain)
+
+    def concurrent(server):
+        session = mount_pool(requests.Session(), args.workers)
+        with ArticleFetcher(session, workers=args.workers, limiter=HostRateLimiter(args.rate, jitter=0),
+                            referer=server.base_url, parse_processes=args.parse_processes) as fetcher:
+            return scrape_new_articles(fetcher, with_domain(server), len(listing_pages),
+                                       server.base_url, server.domain)
+
+    rows = []
+    row, legacy = run('sequential + html.parser', site, args.latency, sequential)
+    rows.append(row)
+    row, new = run(f'{args.workers} workers + lxml', site, args.latency, concurrent)
+    rows.append(row)
+
+    report = pd.DataFrame(rows)
+    print("\n" + report.round(3).to_string(index=False))
+    print(f"\nSpeedup: {report.loc[0, 'Seconds'] / report.loc[1, 'Seconds']:.1f}x")
+    # แต่ละ run ได้ port ใหม่ -> เทียบเฉพาะ path ของ Link
+    key = lambda articles: [(urlsplit(a['Link']).path, a['Title'], a['Date'], a['Content']) for a in articles]
+    same = key(legacy) == key(new)
+    print(f"Same articles, order and content: {same}")
+
+    # Parser only
+    articles = [body.decode('utf-8') for path, body in site.items() if not path.rsplit('/', 1)[1].isdigit()]
+    for backend in ('html.parser', 'lxml'):
+        start = time.perf_counter()
+        for html in articles:
+            extract_clean_text(html, parser=backend)
+        print(f"extract_clean_text [{backend:11s}]: {(time.perf_counter() - start) / len(articles) * 1000:.2f} ms/article")
+
+
+if __name__ == '__main__':
+    main()
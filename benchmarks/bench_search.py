@@ -0,0 +1,99 @@
+"""
+News search: str.contains scan over Title/Content (current pages) vs the inverted index (search_index.py).
+
+The corpus uses a Zipf-distributed vocabulary so that posting lists have realistic lengths
+(a few very common words, a long tail of rare ones). Reports index build time and size and
+median query latency per query type at each corpus size.
+
+    python -m benchmarks.bench_search --sizes 10000,100000,1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from search_index import SearchIndex
+from benchmarks.synthetic import WORDS
+
+QUERIES = {
+    'common term': 'market',
+    'rare term': 'tariff',
+    'AND (2 terms)': 'oil crude',
+    'phrase': '"interest rate"',
+    'prefix': 'semi*',
+}
+
+
+# คำที่ใช้ค้น วางไว้ที่อันดับความถี่ต่าง ๆ ใน Zipf (อันดับ 3 = พบบ่อยมาก, 3000 = พบน้อย)
+PLACED_WORDS = {'market': 3, 'stocks': 8, 'rate': 40, 'interest': 60, 'oil': 90, 'crude': 400,
+                'semiconductor': 700, 'semis': 2500, 'tariff': 3000}
+
+
+def make_search_corpus(n, content_words=60, vocab_size=50_000, seed=0):
+    """Zipf vocabulary of synthetic tokens with the query words placed at chosen frequency ranks."""
+    rng = np.random.default_rng(seed)
+    others = [w for w in WORDS if w not in PLACED_WORDS]
+    vocab = others + [f"tok{i}" for i in range(vocab_size)]
+    for word, rank in sorted(PLACED_WORDS.items(), key=lambda kv: kv[1]):
+        vocab.insert(rank, word)
+    vocab = np.array(vocab)
+    ranks = np.minimum(rng.zipf(1.15, size=(n, content_words)) - 1, len(vocab) - 1)
+    content = [" ".join(row) for row in vocab[ranks]]
+    titles = [" ".join(row) for row in vocab[np.minimum(rng.zipf(1.3, size=(n, 8)) - 1, len(vocab) - 1)]]
+    dates = pd.Timestamp('2025-12-17') - pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n), unit='m')
+    return pd.DataFrame({'Date': dates, 'Title': titles, 'Content': content, 'Short_Ans': ''})
+
+
+def scan(df, query):
+    """What Home.py / News Center did before: regex scan of Title and Content on every rerun."""
+    return df[df['Title'].str.contains(query, case=False, na=False) |
+              df['Content'].str.contains(query, case=False, na=False)]
+
+
+def median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--content-words', type=int, default=60)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for n in [int(s) for s in args.sizes.split(',')]:
+        print(f"Generating {n:,} articles...")
+        df = make_search_corpus(n, content_words=args.content_words)
+        start = time.perf_counter()
+        index = SearchIndex(df)
+        build = time.perf_counter() - start
+        print(f"  index build {build:.1f}s, {index.memory_bytes() / 1024**2:.0f} MB, {len(index.vocabulary):,} terms")
+
+        for name, query in QUERIES.items():
+            hits = index.search(query)
+            row = {'Articles': n, 'Query': name, 'Hits': len(hits),
+                   'Index_ms': median_ms(lambda: index.search(query), args.repeats)}
+            # scan เทียบได้ตรง ๆ เฉพาะคำเดี่ยว/วลี (substring), AND/prefix ใช้ term แรกเป็นตัวแทนต้นทุน
+            scan_query = query.strip('"').split()[0].rstrip('*')
+            row['Scan_ms'] = median_ms(lambda: scan(df, scan_query), max(1, args.repeats // 2))
+            row['Speedup'] = row['Scan_ms'] / max(row['Index_ms'], 1e-6)
+            rows.append(row)
+        rows[-len(QUERIES)]['Build_s'] = build
+        rows[-len(QUERIES)]['Index_MB'] = index.memory_bytes() / 1024**2
+
+    report = pd.DataFrame(rows)
+    print("\n" + report.round(2).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+SectorClassifier: per-row Python post-processing vs vectorized top-k, and refit vs persisted vectorizer.
+
+    python -m benchmarks.bench_sector_classifier --rows 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.sector_classifier import SECTOR_KEYWORDS, SectorClassifier, top_k_sectors, SectorScores
+from benchmarks.synthetic import make_news_frame
+
+
+def legacy_postprocess(similarity_scores, sector_names, threshold, max_labels):
+    """The original per-article loop from the TF-IDF notebook cell."""
+    primary_sectors, confidences, sector_dicts, sector_counts = [], [], [], []
+    for scores in similarity_scores:
+        best_idx = scores.argmax()
+        max_score = scores.max()
+        primary_sectors.append(sector_names[best_idx] if max_score > threshold else "Other")
+        confidences.append(max_score)
+
+        qualified_indices = np.where(scores > threshold)[0]
+        if len(qualified_indices) == 0:
+            sector_dicts.append({'Other': 0.0})
+            sector_counts.append(0)
+        else:
+            qualified_scores = scores[qualified_indices]
+            sorted_indices_local = np.argsort(qualified_scores)[::-1]
+            final_indices = qualified_indices[sorted_indices_local[:max_labels]]
+            current_dict = {sector_names[i]: round(float(scores[i]), 5) for i in final_indices}
+            sector_dicts.append(current_dict)
+            sector_counts.append(len(current_dict))
+    return primary_sectors, confidences, sector_dicts, sector_counts
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--content-words', type=int, default=120)
+    parser.add_argument('--new-rows', type=int, default=1000, help='articles added since the last run')
+    parser.add_argument('--threshold', type=float, default=0.02)
+    parser.add_argument('--max-labels', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic articles...")
+    df = make_news_frame(args.rows, content_words=args.content_words)
+    texts = (df['Title'].fillna('') + " " + df['Content'].fillna('')).tolist()
+    names, docs = list(SECTOR_KEYWORDS), list(SECTOR_KEYWORDS.values())
+    rows = []
+
+    # 1. Original: refit + cosine_similarity + per-row loop
+    vectorizer = TfidfVectorizer(stop_words='english')
+    matrix, t_fit = timed(vectorizer.fit_transform, docs + texts)
+    sim, t_sim = timed(cosine_similarity, matrix[len(names):], matrix[:len(names)])
+    legacy, t_post = timed(legacy_postprocess, sim, names, args.threshold, args.max_labels)
+    rows.append({'Path': 'original (refit + loop)', 'Vectorize_s': t_fit, 'Similarity_s': t_sim,
+                 'TopK_s': t_post, 'Sector_Dict_s': 0.0})
+
+    # 2. Vectorized post-processing, refit every run
+    clf = SectorClassifier()
+    news_vectors, t_fit = timed(clf.fit, texts)
+    sim2, t_sim = timed(clf.similarity, news_vectors)
+    result, t_topk = timed(lambda: SectorScores(names, *top_k_sectors(sim2, args.threshold, args.max_labels)))
+    dicts, t_dicts = timed(result.sector_dicts)
+    rows.append({'Path': 'vectorized (refit)', 'Vectorize_s': t_fit, 'Similarity_s': t_sim,
+                 'TopK_s': t_topk, 'Sector_Dict_s': t_dicts})
+
+    # 3. Persisted vectorizer: load + transform only
+    path = os.path.join(tempfile.mkdtemp(), 'sector_tfidf.joblib')
+    clf.save(path)
+    start = time.perf_counter()
+    loaded = SectorClassifier.load(path)
+    news_vectors = loaded.transform(texts)
+    t_fit = time.perf_counter() - start
+    sim3, t_sim = timed(loaded.similarity, news_vectors)
+    result3, t_topk = timed(lambda: SectorScores(names, *top_k_sectors(sim3, args.threshold, args.max_labels)))
+    rows.append({'Path': 'vectorized (load + transform all)', 'Vectorize_s': t_fit, 'Similarity_s': t_sim,
+                 'TopK_s': t_topk, 'Sector_Dict_s': np.nan})
+
+    # 4. Persisted vectorizer, only the articles added since the last run
+    new_texts = texts[-args.new_rows:]
+    start = time.perf_counter()
+    news_vectors = SectorClassifier.load(path).transform(new_texts)
+    t_fit = time.perf_counter() - start
+    sim4, t_sim = timed(loaded.similarity, news_vectors)
+    result4, t_topk = timed(lambda: SectorScores(names, *top_k_sectors(sim4, args.threshold, args.max_labels)))
+    _, t_dicts = timed(result4.sector_dicts)
+    rows.append({'Path': f'vectorized (load + transform {args.new_rows:,} new)', 'Vectorize_s': t_fit,
+                 'Similarity_s': t_sim, 'TopK_s': t_topk, 'Sector_Dict_s': t_dicts})
+
+    report = pd.DataFrame(rows)
+    report['Post_s'] = report['TopK_s'] + report['Sector_Dict_s'].fillna(0)
+    report['Total_s'] = report[['Vectorize_s', 'Similarity_s', 'Post_s']].sum(axis=1)
+    print(report.round(3).to_string(index=False))
+    base = report.loc[0]
+    print(f"\nPost-processing speedup (top-k only): {base['TopK_s'] / report.loc[1, 'TopK_s']:.1f}x, "
+          f"(incl. legacy Sector_Dict): {base['Post_s'] / report.loc[1, 'Post_s']:.1f}x")
+    print(f"End-to-end speedup, persisted vectorizer on {args.new_rows:,} new articles: "
+          f"{base['Total_s'] / report.loc[3, 'Total_s']:.0f}x")
+
+    # Equivalence with the original loop
+    primary, conf, legacy_dicts, counts = legacy
+    same = (list(np.asarray(result.primary_sectors(), dtype=object)) == primary
+            and np.allclose(result.confidence, conf)
+            and result.counts.tolist() == counts
+            and dicts == legacy_dicts)
+    print(f"Matches original output: {same}")
+
+
+if __name__ == '__main__':
+    main()
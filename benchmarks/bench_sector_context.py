@@ -0,0 +1,85 @@
+"""
+Sector prompt size with the full news window in the News Feed (context_tokens=None) vs the
+token-budgeted context (pipeline.sector_history.CONTEXT_TOKEN_BUDGET).
+
+Synthetic news over the last LOOKBACK_DAYS + ANALYSIS_RANGE days at increasing volume, 30% of
+them re-published headlines (" - Reuters" suffix / punctuation only). Per volume: prompt tokens
+(stand-in tokenizer, chat template applied), items kept / dropped, and the prefill time of the
+busiest sector's prompt (one forward pass on CPU, stand-in model).
+
+    python -m benchmarks.bench_sector_context --articles 50,200,800
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.inference import load_model
+from pipeline.sector_history import (
+    ANALYSIS_RANGE, CONTEXT_TOKEN_BUDGET, LOOKBACK_DAYS, build_jobs, encode_prompts, prepare_news,
+)
+from benchmarks.synthetic import make_news_frame
+from benchmarks.standin import save_standin
+
+
+def news_window(n, seed=0):
+    df = make_news_frame(n, seed=seed, content_words=20)
+    rng = np.random.default_rng(seed)
+    days = LOOKBACK_DAYS + ANALYSIS_RANGE
+    df['Date'] = pd.Timestamp('2025-12-17') - pd.to_timedelta(rng.integers(0, days * 24 * 60, n), unit='m')
+    repost = rng.random(n) < 0.3
+    source = rng.integers(0, n, n)[repost]
+    df.loc[repost, 'Title'] = df['Title'].to_numpy()[source] + np.where(rng.random(repost.sum()) < 0.5, ' - Reuters', '!')
+    return df
+
+
+def prefill_ms(model, sequence, repeats=3):
+    input_ids = torch.tensor([sequence], device=model.device)
+    times = []
+    with torch.no_grad():
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(input_ids=input_ids)
+            times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', default='50,200,800', help='articles in the analysed period')
+    parser.add_argument('--context-tokens', type=int, default=CONTEXT_TOKEN_BUDGET)
+    parser.add_argument('--model', default=None, help='HF model id/path (default: offline stand-in)')
+    parser.add_argument('--hidden-size', type=int, default=256)
+    parser.add_argument('--layers', type=int, default=4)
+    args = parser.parse_args()
+
+    model_path = args.model or save_standin(hidden_size=args.hidden_size, num_layers=args.layers)
+    model, tokenizer = load_model(model_path, device='cpu')
+    prefill_ms(model, [tokenizer.eos_token_id] * 16, repeats=1)     # warm-up
+
+    rows = []
+    for n in [int(a) for a in args.articles.split(',')]:
+        expanded_df, target_dates = prepare_news(news_window(n))
+        for name, budget in (('full window', None), (f'<= {args.context_tokens} tok', args.context_tokens)):
+            jobs = build_jobs(expanded_df, target_dates, context_tokens=budget)
+            lengths = [len(s) for s in encode_prompts(tokenizer, [job['prompt'] for job in jobs])]
+            busiest = int(np.argmax([job['news_volume'] for job in jobs]))
+            rows.append({
+                'Articles': n, 'Context': name, 'Jobs': len(jobs),
+                'Max_News_Volume': jobs[busiest]['news_volume'],
+                'Items_Kept': int(np.median([job['context_items'] for job in jobs])),
+                'Items_Dropped': sum(job['context_dropped'] for job in jobs),
+                'Prompt_Tokens_p50': int(np.median(lengths)), 'Prompt_Tokens_max': max(lengths),
+                'Busiest_Prefill_ms': prefill_ms(model, encode_prompts(tokenizer, [jobs[busiest]['prompt']])[0]),
+            })
+
+    print(pd.DataFrame(rows).round(1).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Sector-history job building: the per-date filter + copy / per-sector sort + iterrows() loop
+vs the single sorted index in pipeline.sector_history.sector_signals.
+
+Synthetic news spread over `--days` days, every day analysed (ANALYSIS_RANGE = days), so each
+article falls into LOOKBACK_DAYS + 1 windows. Checks that both paths produce the same windows,
+contexts and weighted scores (up to float summation order). The new path runs without a context
+token budget (context_tokens=None) so its prompts carry the same full news feed as the old loop.
+
+    python -m benchmarks.bench_sector_history --rows 10000,50000 --days 90
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.sector_history import LOOKBACK_DAYS, build_jobs, build_prompt, prepare_news, sector_signals
+from benchmarks.synthetic import make_news_frame
+
+
+def legacy_get_sector_context(sector_name, full_df):
+    sector_df = full_df[full_df['Target_Sector'] == sector_name].sort_values(by='Date', ascending=False, kind='stable')
+    news_count = len(sector_df)
+    total_weight = sector_df['Time_Weight'].sum()
+    weighted_avg_score = (sector_df['Weighted_Score'].sum() / total_weight) if total_weight > 0 else 0
+    news_context = ""
+    for _, row in sector_df.iterrows():
+        d_str = row['Date'].strftime('%Y-%m-%d')
+        news_context += f"- {d_str}: {row.get('Title', 'N/A')} -> {str(row.get('Short_Ans', ''))[:150]}...\n"
+    return news_context, weighted_avg_score, news_count
+
+
+def legacy_build_jobs(expanded_df, target_dates):
+    """build_jobs ก่อนเปลี่ยน: filter + copy ทั้ง frame ต่อวัน, filter/sort/iterrows ต่อ sector"""
+    jobs = []
+    for target_date in target_dates:
+        start_window = target_date - timedelta(days=LOOKBACK_DAYS)
+        daily_df = expanded_df[(expanded_df['Date'] <= target_date) & (expanded_df['Date'] >= start_window)].copy()
+        if daily_df.empty: continue
+        daily_df['Days_Ago'] = (target_date - daily_df['Date']).dt.days
+        daily_df['Time_Weight'] = (1 - daily_df['Days_Ago'] / (LOOKBACK_DAYS + 1)).clip(lower=0.1)
+        if 'Consensus_Score' not in daily_df.columns:
+            score_cols = [c for c in daily_df.columns if 'Score_' in c]
+            daily_df['Consensus_Score'] = daily_df[score_cols].mean(axis=1) if score_cols else 0
+        daily_df['Weighted_Score'] = daily_df['Consensus_Score'] * daily_df['Time_Weight']
+        for sector in daily_df['Target_Sector'].dropna().unique():
+            if len(str(sector)) < 2: continue
+            news_context, q_score, news_count = legacy_get_sector_context(sector, daily_df)
+            jobs.append({'date': target_date.strftime('%Y-%m-%d'), 'sector': sector, 'news_volume': news_count,
+                         'prompt': build_prompt(sector, q_score, news_context),
+                         'q_score': q_score, 'news_context': news_context})
+    return jobs
+
+
+def same_signals(legacy, signals):
+    """เทียบ (date, sector, volume, context) ตรงตัว และ q_score ที่ float tolerance (ลำดับการบวกต่างกัน)"""
+    if len(legacy) != len(signals):
+        return False
+    for job, row in zip(legacy, signals.itertuples(index=False)):
+        if (job['date'], job['sector'], job['news_volume'], job['news_context']) != \
+                (row.date.strftime('%Y-%m-%d'), row.sector, row.news_volume, row.news_context):
+            return False
+        if not np.isclose(job['q_score'], row.q_score, rtol=0, atol=1e-9):
+            return False
+    return True
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='10000,50000')
+    parser.add_argument('--days', type=int, default=90)
+    args = parser.parse_args()
+
+    report = []
+    for n in [int(r) for r in args.rows.split(',')]:
+        df = make_news_frame(n, content_words=20)
+        rng = np.random.default_rng(1)
+        df['Date'] = pd.Timestamp('2025-12-17') - pd.to_timedelta(rng.integers(0, args.days * 24 * 60, n), unit='m')
+        expanded_df, _ = prepare_news(df)
+        latest = expanded_df['Date'].max()
+        target_dates = [latest - timedelta(days=i) for i in range(args.days)][::-1]
+
+        legacy, legacy_s = timed(lambda: legacy_build_jobs(expanded_df, target_dates))
+        signals, signals_s = timed(lambda: sector_signals(expanded_df, target_dates, context_tokens=None))
+        jobs, jobs_s = timed(lambda: build_jobs(expanded_df, target_dates, context_tokens=None))
+        report.append({
+            'Articles': n, 'Rows_exploded': len(expanded_df), 'Jobs': len(jobs),
+            'Legacy_s': legacy_s, 'Signals_ms': signals_s * 1000, 'Build_jobs_ms': jobs_s * 1000,
+            'Speedup': legacy_s / jobs_s, 'Same_signals': same_signals(legacy, signals),
+        })
+
+    print(pd.DataFrame(report).round(3).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
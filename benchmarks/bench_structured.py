@@ -0,0 +1,104 @@
+"""
+JSON-answer generation: run every row to max_new_tokens and regex the object out (generate_batch)
+vs stopping each row at its closing brace (generate_json) vs schema-constrained decoding
+(generate_json with the task's JsonFormat), for the sector, sentiment and sector-history prompts.
+
+Reports wall time, generated tokens and answers that do not parse into a valid object (JSON with
+the expected keys, enum values and number range) — today those silently become "Other" / 0.0 / 5.0.
+The offline stand-in model never closes a brace on its own, so the balanced-brace mode only shows
+its gain with a real instruct model (--model).
+
+    python -m benchmarks.bench_structured --rows 32
+    python -m benchmarks.bench_structured --model Qwen/Qwen2.5-0.5B-Instruct
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.inference import generate_batch, load_model
+from pipeline.sector_history import MAX_NEW_TOKENS, OUTLOOK_FORMAT, build_jobs, encode_prompts, prepare_news
+from pipeline.structured import Enum, Number, generate_json
+from pipeline.tasks import _extract_json, sector_task, sentiment_task, task_prompt
+from benchmarks.synthetic import make_news_frame
+from benchmarks.standin import save_standin
+
+
+def valid(text, json_format):
+    """คำตอบที่ parse ได้และตรง schema (key ครบ, enum ถูก, ตัวเลขอยู่ในช่วง)"""
+    data = _extract_json(text)
+    if not isinstance(data, dict):
+        return False
+    for key, kind in json_format.fields.items():
+        value = data.get(key)
+        if isinstance(kind, Enum) and value not in kind.values:
+            return False
+        if isinstance(kind, Number):
+            try:
+                if not kind.minimum <= float(value) <= kind.maximum:
+                    return False
+            except (TypeError, ValueError):
+                return False
+    return True
+
+
+def workloads(tokenizer, rows):
+    df = make_news_frame(rows, content_words=150)
+    cases = []
+    for task in (sector_task(), sentiment_task()):
+        prompts = [task_prompt(t, c, task) for t, c in zip(df['Title'], df['Content'])]
+        cases.append((task.name, encode_prompts(tokenizer, prompts), task.max_new_tokens, task.json_format))
+    expanded_df, target_dates = prepare_news(make_news_frame(rows * 4, content_words=20))
+    jobs = build_jobs(expanded_df, target_dates)[:rows]
+    cases.append(('sector_history', encode_prompts(tokenizer, [j['prompt'] for j in jobs]), MAX_NEW_TOKENS,
+                  OUTLOOK_FORMAT))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=32)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--model', default=None, help='HF model id/path (default: offline stand-in)')
+    parser.add_argument('--hidden-size', type=int, default=256)
+    parser.add_argument('--layers', type=int, default=4)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model_path = args.model or save_standin(hidden_size=args.hidden_size, num_layers=args.layers)
+    model, tokenizer = load_model(model_path, device='cpu')
+
+    modes = {
+        'max_new_tokens': lambda seqs, n, fmt: generate_batch(model, tokenizer, seqs, n),
+        'balanced-brace': lambda seqs, n, fmt: generate_json(model, tokenizer, seqs, n),
+        'schema': lambda seqs, n, fmt: generate_json(model, tokenizer, seqs, n, fmt),
+    }
+    report = []
+    for name, sequences, max_new_tokens, json_format in workloads(tokenizer, args.rows):
+        for mode, generate in modes.items():
+            texts, new_tokens = [], 0
+            start = time.perf_counter()
+            for i in range(0, len(sequences), args.batch_size):
+                decoded, n_new = generate(sequences[i:i + args.batch_size], max_new_tokens, json_format)
+                texts += decoded
+                new_tokens += n_new
+            seconds = time.perf_counter() - start
+            report.append({
+                'Prompt': name, 'Mode': mode, 'Rows': len(sequences), 'Max_New': max_new_tokens,
+                'Seconds': seconds, 'New_Tokens': new_tokens, 'Tokens_per_row': new_tokens / len(sequences),
+                'Invalid': sum(not valid(t, json_format) for t in texts),
+            })
+
+    report = pd.DataFrame(report)
+    print(report.round(3).to_string(index=False))
+    base = report[report['Mode'] == 'max_new_tokens'].set_index('Prompt')['Seconds']
+    schema = report[report['Mode'] == 'schema'].set_index('Prompt')['Seconds']
+    print("\nSchema-constrained speedup: " + ", ".join(f"{p} {base[p] / schema[p]:.1f}x" for p in base.index))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Persistent inference worker (pipeline.worker + pipeline.model_pool) vs load / unload per stage.
+
+A mini pipeline run = the notebook's LLM stages on stand-in models: ModelTaskRunner sector + sentiment
+on model A, sentiment on model B (the unified cell), then sector-history jobs on model A. No inference
+cache, so every run generates. Repeated --runs times:
+
+    per-stage : every stage loads its model and releases it (today's notebook)
+    worker    : stages send token ids to one `python -m pipeline.worker` process that keeps models
+                warm in an LRU pool; run 1 loads, later runs should not
+    worker + small budget (--tight): pool budget fits one model -> A / B evict each other every run
+
+Reported per run: seconds spent loading, model loads, wall time, and for the worker the pool stats
+(resident models, hits, evictions) and the deepest job queue seen while the run was in flight.
+Answers must match the per-stage run. Stand-in weights load from the page cache in well under a
+second; a 14B checkpoint takes tens of seconds per load, which is what the warm pool saves.
+
+    python -m benchmarks.bench_worker --runs 3
+    python -m benchmarks.bench_worker --hidden-size 1024 --layers 8 --tight
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.inference import ModelTaskRunner
+from pipeline.sector_history import build_jobs, prepare_news, run_model_jobs
+from pipeline.tasks import sector_task, sentiment_task
+from pipeline.timing import StageTimer
+from pipeline.worker import WorkerClient, describe, start_worker
+from benchmarks.synthetic import make_news_frame
+from benchmarks.standin import save_standin
+
+
+def pipeline_run(model_a, model_b, df, jobs, batch_size, models=None):
+    """-> (load seconds, loads, answers) ของ 1 รอบ pipeline"""
+    load_s, loads, answers = 0.0, 0, {}
+    for model_name, tasks in ((model_a, [sector_task(), sentiment_task()]), (model_b, [sentiment_task()])):
+        runner = ModelTaskRunner(model_name, tasks, batch_size=batch_size, models=models)
+        try:
+            results = runner.run(df)
+        finally:
+            runner.release()
+        load_s += runner.stats.get('load_seconds', 0.0)
+        loads += not runner.stats.get('warm', False)
+        answers.update({f"{os.path.basename(model_name)}:{name}": list(values) for name, values in results.items()})
+
+    timer = StageTimer()
+    answers['history'] = run_model_jobs(model_a, jobs, timer, max_batch_size=batch_size, max_new_tokens=40,
+                                        temperature=0, models=models)
+    load = timer.report().set_index('Stage').loc['load']
+    load_s += load['Seconds']
+    loads += not load.get('Warm', False)
+    return load_s, loads, answers
+
+
+def sample_queue(address, stop, depths):
+    """อ่าน queue_depth ของ worker ผ่าน connection แยกระหว่างที่ pipeline รัน"""
+    client = WorkerClient(address)
+    while not stop.is_set():
+        depths.append(client.stats()['queue_depth'])
+        time.sleep(0.02)
+    client.close()
+
+
+def run_mode(label, args, model_a, model_b, df, jobs, budget_gb=None, address=None):
+    client = start_worker(address, backend='cpu', budget_gb=budget_gb) if address else None
+    rows, answers = [], []
+    try:
+        for run in range(1, args.runs + 1):
+            stop, depths = threading.Event(), []
+            sampler = None
+            if client is not None:
+                sampler = threading.Thread(target=sample_queue, args=(client.address, stop, depths))
+                sampler.start()
+            start = time.perf_counter()
+            load_s, loads, run_answers = pipeline_run(model_a, model_b, df, jobs, args.batch_size, client)
+            wall = time.perf_counter() - start
+            stop.set()
+            row = {'Mode': label, 'Run': run, 'Loads': loads, 'Load_s': load_s, 'Wall_s': wall}
+            if sampler is not None:
+                sampler.join()
+                stats = client.stats()
+                row.update({'Resident': len(stats['resident']), 'Pool_Loads': stats['loads'],
+                            'Evictions': stats['evictions'], 'Max_Queue': max(depths, default=0)})
+            rows.append(row)
+            answers.append(run_answers)
+        if client is not None:
+            print(f"{label}: {describe(client.stats())}")
+    finally:
+        if client is not None:
+            client.shutdown()
+    return rows, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--rows', type=int, default=24)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--tight', action='store_true', help='also run the worker with a one-model budget')
+    parser.add_argument('--hidden-size', type=int, default=512)
+    parser.add_argument('--layers', type=int, default=4)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model_a = save_standin(hidden_size=args.hidden_size, num_layers=args.layers)
+    model_b = save_standin(hidden_size=args.hidden_size, num_layers=args.layers, seed=1)
+    df = make_news_frame(args.rows, content_words=80)
+    df['Sector'] = 'Other'
+    expanded_df, target_dates = prepare_news(make_news_frame(args.rows * 4, content_words=20))
+    jobs = build_jobs(expanded_df, target_dates)
+
+    socket_dir = tempfile.mkdtemp(prefix='marketmind_worker_')   # 0700; ไม่ชนกับ worker ของ notebook
+    modes = [('per-stage', {}), ('worker', {'address': os.path.join(socket_dir, 'worker.sock')})]
+    if args.tight:
+        # budget ~1.5 โมเดล: โหลด B ต้องไล่ A ออก และกลับกัน
+        model_gb = sum(os.path.getsize(os.path.join(model_a, f)) for f in os.listdir(model_a)
+                       if f.endswith('.safetensors')) / 1024**3
+        modes.append(('worker-tight', {'address': os.path.join(socket_dir, 'tight.sock'), 'budget_gb': model_gb * 1.5}))
+
+    report, answers = [], {}
+    for label, kwargs in modes:
+        rows, answers[label] = run_mode(label, args, model_a, model_b, df, jobs, **kwargs)
+        report += rows
+
+    print(pd.DataFrame(report).round(3).to_string(index=False))
+    baseline = answers['per-stage'][0]
+    print("\nIdentical answers to per-stage run 1: " + ", ".join(
+        f"{label} {all(a == baseline for a in runs)}" for label, runs in answers.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Local HTTP stand-in for the investing.com listing/article pages.
+
+Serves either synthetic pages with the same markup the scraper reads, or recorded pages
+from a directory (listing_<n>.html -> /news/stock-market-news/<n>, <slug>.html ->
+/news/stock-market-news/<slug>), with a fixed per-request latency.
+
+    site = synthetic_site(pages=5, per_page=20)
+    with StandinServer(site, latency=0.1) as server:
+        server.base_url   # -> http://127.0.0.1:<port>/news/stock-market-news
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+import numpy as np
+
+from benchmarks.synthetic import SOURCES, WORDS
+
+LISTING_PATH = "/news/stock-market-news"
+
+
+def _article_html(rng, title, paragraphs):
+    words = np.array(WORDS)
+    body = "\n".join(
+        f"<p>{' '.join(words[rng.integers(0, len(words), int(rng.integers(20, 60)))])}.</p>"
+        for _ in range(paragraphs)
+    )
+    return (
+        "<html><head><title>{t}</title><style>p {{color: #000}}</style>"
+        "<script>window.dataLayer = [];</script></head><body>"
+        "<header><p>Markets Stocks Commodities Currencies Crypto Bonds News Analysis</p></header>"
+        "<div class=\"WYSIWYG articlePage\"><h1>{t}</h1>{b}"
+        "<p>This article was generated with the support of AI and reviewed by an editor.</p>"
+        "<p>Position: added to the InvestingPro watchlist by the author.</p></div>"
+        "<footer><p>Risk Disclosure: Trading in financial instruments involves high risks.</p></footer>"
+        "</body></html>"
+    ).format(t=title, b=body)
+
+
+def _listing_html(items):
+    rows = "\n".join(
+        "<li><article data-test=\"article-item\">"
+        f"<a data-test=\"article-title-link\" href=\"{LISTING_PATH}/{slug}\">{title}</a>"
+        f"<span data-test=\"news-provider-name\">{source}</span>"
+        f"<time data-test=\"article-publish-date\" datetime=\"{date}\">{date}</time>"
+        "</article></li>"
+        for slug, title, source, date in items
+    )
+    return f"<html><body><ul data-test=\"news-list\">{rows}</ul></body></html>"
+
+
+def synthetic_site(pages: int = 5, per_page: int = 20, paragraphs: int = 12, seed: int = 0) -> Dict[str, bytes]:
+    """{path: body}; page 1 holds the newest articles, like the real listing."""
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS)
+    site = {}
+    n = 0
+    for page in range(1, pages + 1):
+        items = []
+        for _ in range(per_page):
+            n += 1
+            title = " ".join(words[rng.integers(0, len(words), 8)]).capitalize()
+            slug = f"{title.lower().replace(' ', '-')}-{100000 + n}"
+            date = f"2025-12-{17 - (n // 200):02d} {(n * 7) % 24:02d}:{(n * 13) % 60:02d}:00"
+            items.append((slug, title, SOURCES[n % len(SOURCES)], date))
+            site[f"{LISTING_PATH}/{slug}"] = _article_html(rng, title, paragraphs).encode("utf-8")
+        site[f"{LISTING_PATH}/{page}"] = _listing_html(items).encode("utf-8")
+    return site
+
+
+def load_recorded(directory: str) -> Dict[str, bytes]:
+    """Recorded pages saved from the real site (see module docstring for file naming)."""
+    site = {}
+    for name in os.listdir(directory):
+        if not name.endswith(".html"):
+            continue
+        stem = name[:-5]
+        key = stem[len("listing_"):] if stem.startswith("listing_") else stem
+        with open(os.path.join(directory, name), "rb") as f:
+            site[f"{LISTING_PATH}/{key}"] = f.read()
+    return site
+
+
+class StandinServer:
+    """Threaded HTTP server over a {path: body} dict; counts requests and peak concurrency."""
+
+    def __init__(self, site: Dict[str, bytes], latency: float = 0.0, host: str = "127.0.0.1"):
+        self.site = site
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self.peak_concurrency = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def domain(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return self.domain + LISTING_PATH
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, so connection reuse is visible
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    server._active += 1
+                    server.peak_concurrency = max(server.peak_concurrency, server._active)
+                try:
+                    time.sleep(server.latency)
+                    body = server.site.get(self.path.split("?")[0])
+                    self.send_response(200 if body is not None else 404)
+                    body = body if body is not None else b"<html><body>Not found</body></html>"
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server._lock:
+                        server._active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
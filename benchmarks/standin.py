@@ -0,0 +1,90 @@
+"""
+Tiny stand-in causal LM for CPU benchmarks.
+
+The real pipeline runs 8-14B checkpoints from the Hugging Face Hub; benchmarks only need
+something with the same interface (chat template, left padding, generate) that loads in
+milliseconds and needs no network access. The tokenizer is a word-level vocabulary built
+from the synthetic corpus and the model is a randomly initialised 2-layer Llama-style decoder.
+"""
+import os
+import tempfile
+
+from benchmarks.synthetic import SECTORS, WORDS
+
+CHAT_TEMPLATE = (
+    "{% for message in messages %}<|im_start|>{{ message['role'] }}\n{{ message['content'] }}<|im_end|>\n{% endfor %}"
+    "{% if add_generation_prompt %}<|im_start|>assistant\n{% endif %}"
+)
+SPECIAL_TOKENS = ['<pad>', '<unk>', '<|im_start|>', '<|im_end|>']
+PUNCTUATION = list('{}[]":,.-<>()/\'?!;=+*0123456789')
+PROMPT_WORDS = (
+    "analyze the sentiment of this financial news consider impact on company sector or economy mentioned "
+    "return only a json object with format category positive negative neutral score float number between "
+    "to classify into sectors if unrelated use other snippet task summarize 1 sentence summary role senior "
+    "analyst real time momentum quantitative signal weighted scale prioritizes recent older feed sorted by "
+    "recency newest first instructions bias give significantly more weight from last days top of list old "
+    "should be treated as context but not drivers outlook determine bullish bearish assign precise e g "
+    "write short executive max sentences explicitly if has shifted recently started week strong ended weak "
+    "output strictly in analysis for with a focus user assistant system sector news n/a"
+).split()
+
+
+def build_tokenizer():
+    from tokenizers import Tokenizer, models, pre_tokenizers, decoders
+    from transformers import PreTrainedTokenizerFast
+
+    vocab = {}
+    for token in SPECIAL_TOKENS + PUNCTUATION + WORDS + PROMPT_WORDS + [w for s in SECTORS for w in s.lower().split()]:
+        for variant in (token, token.capitalize()):
+            vocab.setdefault(variant, len(vocab))
+
+    backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token='<unk>'))
+    backend.pre_tokenizer = pre_tokenizers.Sequence([pre_tokenizers.WhitespaceSplit(), pre_tokenizers.Punctuation()])
+    backend.decoder = decoders.WordPiece(prefix='##')
+    backend.add_special_tokens(SPECIAL_TOKENS)
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend, unk_token='<unk>', pad_token='<pad>', eos_token='<|im_end|>',
+        bos_token=None, padding_side='left',
+    )
+    tokenizer.chat_template = CHAT_TEMPLATE
+    return tokenizer
+
+
+def build_model(tokenizer, hidden_size=64, num_layers=2, seed=0):
+    import torch
+    # Granite = Llama-style decoder whose AutoTokenizer mapping is the generic TokenizersBackend,
+    # so from_pretrained() keeps the word-level tokenizer as saved
+    from transformers import GraniteConfig, GraniteForCausalLM
+
+    torch.manual_seed(seed)
+    config = GraniteConfig(
+        vocab_size=len(tokenizer), hidden_size=hidden_size, intermediate_size=hidden_size * 2,
+        num_hidden_layers=num_layers, num_attention_heads=4, num_key_value_heads=2,
+        max_position_embeddings=8192, pad_token_id=tokenizer.pad_token_id,
+        eos_token_id=tokenizer.eos_token_id, bos_token_id=tokenizer.eos_token_id,
+        tie_word_embeddings=True,
+    )
+    model = GraniteForCausalLM(config).eval()
+    model.generation_config.pad_token_id = tokenizer.pad_token_id
+    model.generation_config.eos_token_id = tokenizer.eos_token_id
+    return model
+
+
+def save_standin(path=None, **model_kwargs):
+    """Writes tokenizer + model to `path` (temp dir by default) so from_pretrained() can load it."""
+    path = path or tempfile.mkdtemp(prefix='marketmind-standin-')
+    tokenizer = build_tokenizer()
+    build_model(tokenizer, **model_kwargs).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
+
+
+_STANDIN_PATH = None
+
+
+def standin_path():
+    """Stand-in checkpoint directory, built once per benchmark process."""
+    global _STANDIN_PATH
+    if _STANDIN_PATH is None:
+        _STANDIN_PATH = save_standin(os.environ.get('MARKETMIND_STANDIN_DIR'))
+    return _STANDIN_PATH
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+SECTORS = [
+    'Financials', 'Technology', 'Healthcare', 'Consumer Cyclical',
+    'Energy', 'Industrials', 'Basic Materials', 'Communication Services',
+    'Utilities', 'Consumer Defensive', 'Real Estate'
+]
+SOURCES = ['Reuters', 'Investing.com', 'AP', 'Bloomberg', 'MarketWatch', 'CNBC']
+WORDS = (
+    "market stocks shares rally fell rose profit loss earnings revenue guidance oil crude gas "
+    "chip semiconductor ai cloud bank rate fed inflation bond yield dollar gold copper retail "
+    "consumer demand supply drug fda trial utility power grid reit property housing investors "
+    "analysts quarter outlook forecast growth slowdown tariff trade china europe billion percent"
+).split()
+
+def make_news_frame(n: int, seed: int = 0, content_words: int = 300) -> pd.DataFrame:
+    """
+    Synthetic stand-in for the news checkpoints (same columns as news_summary.csv),
+    used when the real archive is not available on the benchmark machine.
+    """
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS)
+    dates = pd.Timestamp('2025-12-17') - pd.to_timedelta(rng.integers(0, 90 * 24 * 60, n), unit='m')
+
+    def sentence(k):
+        return " ".join(words[rng.integers(0, len(words), k)])
+
+    sector_idx = rng.integers(0, len(SECTORS), (n, 2))
+    df = pd.DataFrame({
+        'Page': rng.integers(1, 50, n),
+        'Date': dates.strftime('%Y-%m-%dT%H:%M:%S'),
+        'Source': rng.choice(SOURCES, n),
+        'Title': [sentence(10).capitalize() for _ in range(n)],
+        'Link': [f"https://www.investing.com/news/stock-market-news/article-{i}" for i in range(n)],
+        'Content': [sentence(content_words) for _ in range(n)],
+        'Sector': [SECTORS[i] for i in sector_idx[:, 0]],
+        'Confidence': rng.uniform(0, 0.4, n).round(5),
+        'Sector_Dict': [str({SECTORS[a]: 0.1, SECTORS[b]: 0.05}) for a, b in sector_idx],
+        'Sector_Count': 2,
+        'Combined_Sector': [f"{SECTORS[a]}, {SECTORS[b]}" for a, b in sector_idx],
+    })
+    for model in ['Qwen2.5-14B-Instruct', 'Meta-Llama-3.1-8B-Instruct', 'gemma-3-12b-it']:
+        df[f'Score_{model}'] = rng.uniform(-1, 1, n).round(2)
+    df['Short_Ans'] = [sentence(25) for _ in range(n)]
+    return df
@@ -0,0 +1,376 @@
+import os
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import news_cards
+import utils
+from pipeline.checkpoint import CheckpointStore
+from search_index import SearchIndex
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+CHECKPOINT_DIR = os.path.join(BASE_DIR, 'csv_checkpoint')
+
+STORE = CheckpointStore(CHECKPOINT_DIR)
+
+# Checkpoint names (อ่านได้ทั้ง .parquet และ .csv ผ่าน CheckpointStore)
+SECTOR_HISTORY_FILE = 'sector_daily_history_7days'
+SECTOR_ENRICHED_FILE = 'sector_daily_history_enriched'
+NEWS_FILES = [
+    'news_summary',     # มี Short_Ans (AI Summary)
+    'sentiment_final',  # Fallback: ยังไม่ได้สรุปข่าว
+]
+BENCHMARK_FILES = [
+    os.path.join(BASE_DIR, 'benchmark_results', 'final_llm_benchmark_detailed.csv'),
+    os.path.join(CHECKPOINT_DIR, 'final_llm_benchmark_detailed.csv'),
+]
+
+# --- 🎯 11 MAIN SECTORS (WHITELIST) ---
+MAIN_SECTORS = [
+    "Energy",
+    "Basic Materials",           # GICS: Materials
+    "Industrials",
+    "Consumer Cyclical",         # GICS: Consumer Discretionary
+    "Consumer Defensive",        # GICS: Consumer Staples
+    "Healthcare",                # GICS: Health Care
+    "Financials",
+    "Technology",                # GICS: Information Technology
+    "Communication Services",
+    "Utilities",
+    "Real Estate"
+]
+
+CATEGORY_COLUMNS = ['Sector', 'Source', 'Final_Outlook']
+
+# Combined_Sector -> bit ต่อ sector (uint64, ไม่เกิน 64 labels) ให้ filter ด้วย bitwise AND แทน regex
+SECTOR_MASK_COLUMN = 'Sector_Mask'
+MAX_SECTOR_BITS = 64
+
+# --- Presentation columns: คำนวณครั้งเดียวต่อ data version แทนทุก rerun ---
+PREVIEW_CHARS = 200         # ความยาว preview ที่ยาวที่สุดที่การ์ดใช้ (News Center)
+DATE_LABEL_FORMATS = {
+    'Date_Label': '%d %b %Y %H:%M',     # News Center
+    'Date_Label_Short': '%d %b %H:%M',  # Home
+}
+BODY_COMPRESSION_LEVEL = 1  # zlib: เนื้อข่าวเต็มถูกบีบอัดไว้ แตกออกเฉพาะตอนเปิดอ่าน / ตรวจ phrase
+
+# Score คอลัมน์ที่ใช้แสดงผลบน Dashboard (เรียงตามลำดับความสำคัญ)
+# Consensus_Score (pipeline.cascade) มาก่อน: ในโหมด cascade โมเดลแพงให้คะแนนเฉพาะข่าวที่ไม่ชัด -> Score_* รายโมเดลมี NaN
+NEWS_SCORE_COLUMNS = ['Consensus_Score', 'Score_Qwen2.5-14B-Instruct', 'Score_finma-7b-full']
+
+# --- Column projection: โหลดเฉพาะคอลัมน์ที่หน้าเพจใช้จริง ---
+NEWS_COLUMNS = [
+    'Date', 'Source', 'Title', 'Link', 'Content', 'Combined_Sector', 'Short_Ans', 'Sentiment_Score'
+] + NEWS_SCORE_COLUMNS
+SECTOR_SNAPSHOT_COLUMNS = ['Report_Date', 'Sector', 'News_Volume', 'Final_Daily_Score', 'Final_Outlook']
+
+def _is_enriched_column(col):
+    return col in SECTOR_SNAPSHOT_COLUMNS or col.startswith('Invest_Reason_') or col.startswith('Invest_Score_')
+
+# ==========================================
+# 2. HELPERS
+# ==========================================
+def clean_news_content(text):
+    """ลบ Prefix สำนักข่าว และรวมบรรทัดให้เป็นย่อหน้าเดียว"""
+    if not isinstance(text, str): return ""
+    pattern = r"(?s)^.*?(?:\([^\)]+\)\s*-\s*|\s+--\s+)"
+    cleaned_text = re.sub(pattern, "", text).strip()
+    cleaned_text = cleaned_text.replace("\n", " ")
+    cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
+    return cleaned_text if cleaned_text else text
+
+def sector_bitmask(combined: pd.Series):
+    """
+    Explodes comma-joined Combined_Sector once into a per-article uint64 bitmask.
+    Returns (labels, masks): labels[i] คือ sector ของ bit i (เรียงตามความถี่, มากไปน้อย)
+    ทำงานบน combination ที่ไม่ซ้ำ (มีไม่กี่ร้อยแบบ) แล้ว map กลับด้วย codes
+    """
+    codes, combos = pd.factorize(combined.fillna('').astype(str))
+    parts = [[p.strip() for p in combo.split(',') if p.strip()] for combo in combos]
+    counts = np.bincount(codes[codes >= 0], minlength=len(combos))
+
+    freq = {}
+    for combo_parts, count in zip(parts, counts):
+        for label in combo_parts:
+            freq[label] = freq.get(label, 0) + count
+    labels = sorted(freq, key=lambda label: (-freq[label], label))
+    if len(labels) > MAX_SECTOR_BITS:
+        print(f"⚠️ {len(labels)} sector labels, only the {MAX_SECTOR_BITS} most frequent are filterable")
+        labels = labels[:MAX_SECTOR_BITS]
+    bit = {label: np.uint64(1) << np.uint64(i) for i, label in enumerate(labels)}
+
+    combo_masks = np.zeros(len(combos) + 1, dtype=np.uint64)   # ช่องสุดท้าย = NaN (code -1)
+    for i, combo_parts in enumerate(parts):
+        for label in combo_parts:
+            combo_masks[i] |= bit.get(label, np.uint64(0))
+    return labels, combo_masks[codes]
+
+def sector_labels(df_news):
+    """sector ทั้งหมดที่มีในข่าว (เรียงตามตัวอักษร) สำหรับตัวเลือก filter"""
+    return sorted(df_news.attrs.get('sector_labels', []))
+
+def filter_sectors(df, selected, labels):
+    """
+    แถวที่มีอย่างน้อยหนึ่ง sector ใน selected (เทียบชื่อแบบ exact, ไม่สนตัวพิมพ์)
+    labels = df_news.attrs['sector_labels'] ของ frame ต้นทางจาก load_news()
+    """
+    if not selected:
+        return df
+    bit_of = {label.lower(): i for i, label in enumerate(labels)}
+    wanted = np.uint64(0)
+    for name in selected:
+        if str(name).lower() in bit_of:
+            wanted |= np.uint64(1) << np.uint64(bit_of[str(name).lower()])
+    return df[(df[SECTOR_MASK_COLUMN].to_numpy() & wanted) != 0]
+
+class ArticleBodies:
+    """
+    เนื้อข่าวเต็ม (Content ที่ clean แล้ว) แบบบีบอัด zlib ต่อบทความใน buffer เดียว เรียงตาม iloc ของ frame ข่าว
+    frame หลักเก็บแค่ Preview; ตัวเต็มแตกออกเฉพาะแถวที่ขอ (เปิดอ่าน / ตรวจ phrase ของ search)
+    """
+
+    def __init__(self, texts, level=BODY_COMPRESSION_LEVEL):
+        chunks = [zlib.compress(str(t).encode('utf-8'), level) for t in texts]
+        self.offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in chunks], out=self.offsets[1:])
+        self.blob = b"".join(chunks)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return zlib.decompress(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def take(self, rows):
+        return [self[i] for i in rows]
+
+    def memory_bytes(self) -> int:
+        return len(self.blob) + self.offsets.nbytes
+
+def materialize_display(df):
+    """
+    Presentation columns ของการ์ดข่าว (in-place, ครั้งเดียวต่อ data version):
+    Preview, Date_Label(_Short), Color (lookup table), Tags_HTML; ใช้โดย news_cards.card_fragments
+    """
+    content = df['Content'] if 'Content' in df.columns else pd.Series('', index=df.index)
+    df['Preview'] = content.where(content.str.len() <= PREVIEW_CHARS, content.str.slice(0, PREVIEW_CHARS) + '...')
+
+    if 'Date' in df.columns:
+        for col, fmt in DATE_LABEL_FORMATS.items():
+            df[col] = df['Date'].dt.strftime(fmt).fillna('')
+    df['Color'] = pd.Categorical(utils.sentiment_colors(df['Sentiment_Score']))
+
+    df['Tags_HTML'] = pd.Categorical(news_cards.sector_tags(df['Combined_Sector'].astype(str)))
+    return df
+
+def file_signature(path):
+    """
+    Returns (mtime_ns, size) of a file, or None if it does not exist.
+    Used as the cache key so that a rewritten checkpoint is picked up on the next rerun.
+    Parquet dataset directory -> (mtime ล่าสุด, ขนาดรวม) ของ part ทั้งหมด (append / upsert เพิ่ม part ใหม่เสมอ)
+    """
+    try:
+        if os.path.isdir(path):
+            stats = [entry.stat() for entry in os.scandir(path) if entry.name.endswith('.parquet')]
+            return max((s.st_mtime_ns for s in stats), default=0), sum(s.st_size for s in stats)
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _first_existing(names):
+    for name in names:
+        path = STORE.find(name)
+        if path:
+            return path
+    return None
+
+def _read_typed(path, columns=None):
+    """อ่าน checkpoint (Parquet/CSV) เฉพาะคอลัมน์ที่ต้องใช้ พร้อมกำหนด dtype"""
+    df = STORE.read_path(path, columns=columns)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in df.columns:
+        if col.startswith('Score_') or col.startswith('Invest_Score_'):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    return df
+
+# ==========================================
+# 3. CACHED READERS (shared by every page / session)
+# ==========================================
+# st.cache_resource คืน object ตัวเดียวกันให้ทุกหน้า (ไม่ copy แบบ cache_data)
+# max_entries=1 -> เมื่อไฟล์เปลี่ยน (mtime/size ใหม่) ของเก่าจะถูกโยนทิ้งทันที
+# ⚠️ Frame ที่ได้เป็น shared read-only ห้ามแก้ไข in-place ในหน้าเพจ
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_sector_history(path, mtime_ns, size):
+    df = _read_typed(path, columns=SECTOR_SNAPSHOT_COLUMNS)
+    if 'Report_Date' in df.columns:
+        df['Report_Date'] = pd.to_datetime(df['Report_Date'])
+    return df
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_sector_snapshot(path, mtime_ns, size):
+    df = _load_sector_history(path, mtime_ns, size)
+
+    # กรองเอาเฉพาะ "วันล่าสุด" มาแสดงใน Heatmap (Snapshot)
+    if 'Report_Date' in df.columns:
+        df = df[df['Report_Date'] == df['Report_Date'].max()]
+    df = df.copy()
+
+    # CSV มี 'Final_Daily_Score' แต่กราฟ Treemap เรียกใช้ 'Final_AI_Score'
+    if 'Final_Daily_Score' in df.columns:
+        df['Final_AI_Score'] = pd.to_numeric(df['Final_Daily_Score'], errors='coerce').fillna(0.0)
+    else:
+        df['Final_AI_Score'] = 0.0
+
+    if 'News_Volume' not in df.columns:
+        df['News_Volume'] = 10  # Default value
+    if 'Final_Outlook' not in df.columns:
+        df['Final_Outlook'] = 'Neutral'
+    return df
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_sector_enriched(path, mtime_ns, size):
+    df = _read_typed(path, columns=_is_enriched_column)
+    df['Report_Date'] = pd.to_datetime(df['Report_Date'])
+    return df
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_news_tables(path, mtime_ns, size):
+    """-> (lean news frame, ArticleBodies) ของ data version นี้"""
+    df = _read_typed(path, columns=NEWS_COLUMNS)
+
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+
+    # จัดการ Score (รองรับหลายโมเดล) -> Sentiment_Score ครั้งเดียว แล้วทิ้ง Score_* ต้นทาง
+    score_col = next((c for c in NEWS_SCORE_COLUMNS if c in df.columns), None)
+    if score_col:
+        df['Sentiment_Score'] = df[score_col] * 10
+    elif 'Sentiment_Score' not in df.columns:
+        df['Sentiment_Score'] = 5.0
+    df['Sentiment_Score'] = pd.to_numeric(df['Sentiment_Score'], errors='coerce').astype('float32')
+    df = df.drop(columns=[c for c in NEWS_SCORE_COLUMNS if c in df.columns])
+
+    # Clean Data
+    if 'Combined_Sector' in df.columns:
+        df['Combined_Sector'] = df['Combined_Sector'].fillna('General')
+    else:
+        df['Combined_Sector'] = 'General'
+    labels, df[SECTOR_MASK_COLUMN] = sector_bitmask(df['Combined_Sector'])
+    df.attrs['sector_labels'] = labels
+
+    if 'Content' in df.columns:
+        df['Content'] = df['Content'].fillna('').astype(str).map(clean_news_content)
+
+    if 'Short_Ans' in df.columns:
+        df['Short_Ans'] = df['Short_Ans'].fillna('')
+    else:
+        df['Short_Ans'] = ''
+
+    # Presentation materialization: เก็บแค่ Preview ใน frame, เนื้อเต็มไปอยู่ใน ArticleBodies (บีบอัด)
+    materialize_display(df)
+    bodies = ArticleBodies(df['Content'] if 'Content' in df.columns else [''] * len(df))
+    df = df.drop(columns=['Content', 'Combined_Sector'], errors='ignore')
+    return df, bodies
+
+def _load_news(path, mtime_ns, size):
+    return _load_news_tables(path, mtime_ns, size)[0]
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_search_index(path, mtime_ns, size):
+    # สร้างครั้งเดียวต่อ data version จาก frame เดียวกับ load_news() -> row ids ตรงกับ iloc ของ frame นั้น
+    df, bodies = _load_news_tables(path, mtime_ns, size)
+    return SearchIndex(df, texts={'Content': bodies}) if not df.empty else None
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_benchmark(path, mtime_ns, size):
+    return pd.read_csv(path)
+
+# ==========================================
+# 4. PUBLIC API
+# ==========================================
+def _load(reader, path):
+    """เรียก reader ด้วย key (path, mtime, size) ถ้าไฟล์หายหรืออ่านไม่ได้คืน DataFrame ว่าง"""
+    if path is None:
+        return pd.DataFrame()
+    signature = file_signature(path)
+    if signature is None:
+        return pd.DataFrame()
+    try:
+        return reader(path, *signature)
+    except Exception as e:
+        print(f"⚠️ Could not load {path}: {e}")
+        return pd.DataFrame()
+
+def load_sector_history():
+    """ประวัติคะแนนรายวันของทุก Sector (sector_daily_history_7days)"""
+    return _load(_load_sector_history, STORE.find(SECTOR_HISTORY_FILE))
+
+def load_sector_snapshot():
+    """Snapshot วันล่าสุดสำหรับ Heatmap (มี Final_AI_Score / News_Volume / Final_Outlook ครบ)"""
+    return _load(_load_sector_snapshot, STORE.find(SECTOR_HISTORY_FILE))
+
+def load_sector_enriched():
+    """ประวัติรายวันพร้อม Invest_* ของแต่ละโมเดล (sector_daily_history_enriched)"""
+    return _load(_load_sector_enriched, STORE.find(SECTOR_ENRICHED_FILE))
+
+def load_news():
+    """
+    ข่าวทั้งหมดแบบ lean: Sentiment_Score, Sector_Mask, Short_Ans และ presentation columns
+    (Preview / Date_Label / Color / Tags_HTML) เนื้อข่าวเต็มอ่านผ่าน article_body()
+    """
+    return _load(_load_news, _first_existing(NEWS_FILES))
+
+def article_body(df_news, label):
+    """เนื้อข่าวเต็ม (clean แล้ว) ของแถว index label ใน df_news (frame จาก load_news()) แตกออกเฉพาะตอนเรียก"""
+    path = _first_existing(NEWS_FILES)
+    signature = file_signature(path) if path else None
+    if signature is None:
+        return ""
+    bodies = _load_news_tables(path, *signature)[1]
+    position = df_news.index.get_loc(label)
+    return bodies[position] if len(bodies) == len(df_news) else ""
+
+def search_news(df_news, query):
+    """
+    ผลค้นหาข่าวจาก inverted index (AND ทุกคำ, "วลี", prefix*) เรียงตาม BM25 + ความใหม่
+    คืน df_news เดิมถ้า query ว่าง; df_news ต้องเป็น frame จาก load_news()
+    """
+    if not query or not str(query).strip():
+        return df_news
+    path = _first_existing(NEWS_FILES)
+    signature = file_signature(path) if path else None
+    index = _load_search_index(path, *signature) if signature else None
+    if index is None or index.n_docs != len(df_news):
+        return df_news.iloc[0:0]
+    rows = index.search(query)
+    return df_news if rows is None else df_news.iloc[rows]
+
+def data_version(source):
+    """
+    (path, mtime_ns, size) ของ checkpoint ที่ frame มาจาก ('sector_history' / 'sector_enriched' / 'news' / 'benchmark')
+    ใช้เป็น key ของ cache ที่สร้างจาก frame เหล่านั้น (เช่น figures.figure) เปลี่ยนเมื่อไฟล์ถูกเขียนใหม่
+    """
+    path = {
+        'sector_history': lambda: STORE.find(SECTOR_HISTORY_FILE),
+        'sector_enriched': lambda: STORE.find(SECTOR_ENRICHED_FILE),
+        'news': lambda: _first_existing(NEWS_FILES),
+        'benchmark': lambda: next((p for p in BENCHMARK_FILES if os.path.exists(p)), None),
+    }[source]()
+    return (path, file_signature(path)) if path else None
+
+def load_benchmark():
+    """ผล LLM Benchmark (CFA / FPB / GSM8K)"""
+    return _load(_load_benchmark, next((p for p in BENCHMARK_FILES if os.path.exists(p)), None))
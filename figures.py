@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+# แต่ละ (kind, data version, key) = 1 entry; 11 sectors x (gauge + trend) + treemap + benchmark พอดีใน 64
+FIGURE_CACHE_ENTRIES = 64
+
+_STATS = {}
+_STATS_LOCK = threading.Lock()
+
+# ==========================================
+# 2. FIGURE CACHE
+# ==========================================
+# เก็บ go.Figure ที่ validate แล้ว (ไม่ใช่ JSON): st.plotly_chart รับ Figure แล้วแค่ to_dict + to_json,
+# ถ้าส่ง dict/JSON จะถูกสร้าง go.Figure (validate ทั้งก้อน) ใหม่ทุก rerun
+# ⚠️ Figure ที่ได้เป็น shared read-only ห้าม update_layout / add_trace ในหน้าเพจ
+
+def _record(kind, **updates):
+    with _STATS_LOCK:
+        entry = _STATS.setdefault(kind, {'Builds': 0, 'Calls': 0, 'Build_ms': 0.0, 'Serve_ms': 0.0})
+        for name, value in updates.items():
+            entry[name] = entry[name] + value if name in ('Builds', 'Calls') else value
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def _cached_figure(kind, version, key, _build):
+    start = time.perf_counter()
+    fig = _build()
+    build_ms = (time.perf_counter() - start) * 1000
+    _record(kind, Builds=1, Build_ms=build_ms)
+    print(f"📊 Built {kind} figure ({key}) in {build_ms:.1f} ms")
+    return fig
+
+def figure(kind: str, version, key, build):
+    """
+    Figure ของ (kind, data version, key) จาก cache; เรียก build() เฉพาะครั้งแรก
+    version = data_loader.data_version(...) -> checkpoint ใหม่ได้ figure ใหม่เอง
+    """
+    start = time.perf_counter()
+    fig = _cached_figure(kind, version, key, build)
+    _record(kind, Calls=1, Serve_ms=(time.perf_counter() - start) * 1000)
+    return fig
+
+def stats() -> pd.DataFrame:
+    """ต่อ figure kind: จำนวนครั้งที่สร้างจริง / ถูกเรียก, เวลาสร้างล่าสุด และเวลาเรียกล่าสุด (ms)"""
+    with _STATS_LOCK:
+        rows = [{'Figure': kind, **entry} for kind, entry in _STATS.items()]
+    return pd.DataFrame(rows, columns=['Figure', 'Builds', 'Calls', 'Build_ms', 'Serve_ms'])
+
+# ==========================================
+# 3. BUILDERS
+# ==========================================
+def sector_treemap(df_chart):
+    fig = px.treemap(
+        df_chart,
+        path=['Sector'],
+        values='News_Volume',
+        color='Final_AI_Score',
+        color_continuous_scale=['#FF4B4B', '#FACA2B', '#09AB3B'],
+        range_color=[0, 10],
+        custom_data=['Final_Outlook', 'News_Volume', 'Final_AI_Score']
+    )
+
+    fig.update_traces(
+        textinfo="label+value",
+        texttemplate="<span style='color:white; font-weight:bold;'>%{label}</span><br><span style='color:white; font-size:18px;'>%{customdata[2]:.2f}</span>",
+        textposition="middle center",
+        hovertemplate="<b>%{label}</b><br>Score: %{customdata[2]:.2f}/10<br>Vol: %{value}<br>Outlook: %{customdata[0]}<extra></extra>",
+        marker=dict(cornerradius=5)
+    )
+
+    fig.update_layout(
+        height=780,
+        margin=dict(t=0, l=0, r=0, b=0),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter, sans-serif", size=14),
+        coloraxis_showscale=False
+    )
+    return fig
+
+def gauge_chart(score):
+    bar_color = '#09ab3b' if score >= 6.5 else ('#ff4b4b' if score <= 3.5 else '#faca2b')
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number", value = score,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        gauge = {
+            'axis': {'range': [0, 10], 'tickwidth': 1},
+            'bar': {'color': bar_color},
+            'bgcolor': "white", 'borderwidth': 2, 'bordercolor': "gray",
+            'steps': [
+                {'range': [0, 3.5], 'color': 'rgba(255, 75, 75, 0.2)'},
+                {'range': [3.5, 6.5], 'color': 'rgba(250, 202, 43, 0.2)'},
+                {'range': [6.5, 10], 'color': 'rgba(9, 171, 59, 0.2)'}
+            ],
+            'threshold': {'line': {'color': "black", 'width': 4}, 'thickness': 0.75, 'value': score}
+        }
+    ))
+    fig.update_layout(height=300, margin=dict(l=20, r=20, t=30, b=20))
+    return fig
+
+def sector_trend(sector_data):
+    fig = px.line(
+        sector_data, x='Report_Date', y='Final_Daily_Score',
+        markers=True, range_y=[0, 10], color_discrete_sequence=['#1f77b4']
+    )
+    fig.add_hrect(y0=6.5, y1=10, fillcolor="green", opacity=0.1, line_width=0)
+    fig.add_hrect(y0=0, y1=3.5, fillcolor="red", opacity=0.1, line_width=0)
+    fig.update_layout(height=350)
+    return fig
+
+def benchmark_bars(df):
+    # Melt for plotting
+    df_melted = df.melt(
+        id_vars=['Model'],
+        value_vars=['CFA_Score(%)', 'FPB_Score(%)', 'GSM8K_Score(%)'],
+        var_name='Benchmark',
+        value_name='Score'
+    )
+    # Clean up labels
+    df_melted['Benchmark'] = df_melted['Benchmark'].str.replace('_Score(%)', '')
+
+    fig = px.bar(
+        df_melted,
+        x='Benchmark',
+        y='Score',
+        color='Model',
+        barmode='group',
+        text_auto='.1f',
+        color_discrete_sequence=px.colors.qualitative.Bold,
+        height=500
+    )
+
+    fig.update_layout(
+        title="Score Comparison by Category (Scale: 0-100%)",
+        xaxis_title="",
+        yaxis_title="Score (%)",
+        legend_title="AI Model",
+        font=dict(family="Inter, sans-serif", size=14),
+        hovermode="x unified"
+    )
+    fig.update_traces(textposition='outside')
+    return fig
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import utils
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+PAGE_SIZE = 50          # การ์ดต่อหน้าใน News Center
+TAG_PREFIX = '<span class="sector-tag">🏷️ '
+
+# ค่าต่าง ๆ ของการ์ดแต่ละหน้า (ความยาวเนื้อหา, รูปแบบวันที่, กล่อง AI Summary)
+HOME_CARD = {
+    'content_chars': 120,
+    'date_format': '%d %b %H:%M',
+    'date_column': 'Date_Label_Short',
+    'summary_chars': 150,           # ตัดแล้วต่อ "..." เสมอ
+    'summary_class': 'ai-summary-home',
+    'summary_label': '🤖 ',
+    'tags_style': 'margin-bottom:8px;',
+    'content_style': 'font-size:13px; color:#444;',
+}
+NEWS_CENTER_CARD = {
+    'content_chars': 200,
+    'date_format': '%d %b %Y %H:%M',
+    'date_column': 'Date_Label',
+    'summary_chars': None,          # แสดงเต็ม
+    'summary_class': 'ai-summary-box',
+    'summary_label': '<strong>🤖 AI Summary :</strong> ',
+    'tags_style': 'margin-bottom:5px;',
+    'content_class': 'original-content',
+}
+
+# ==========================================
+# 2. VECTORIZED FRAGMENTS
+# ==========================================
+# HTML escape + ยุบบรรทัด (บรรทัดว่างจะตัด HTML block ของ markdown เมื่อรวมหลายการ์ดใน payload เดียว)
+_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', '\n': ' ', '\r': ' '})
+_escape = np.frompyfunc(lambda s: s.translate(_ESCAPE), 1, 1)
+_non_blank = np.frompyfunc(lambda s: bool(s.strip()), 1, 1)
+
+def _text(df, col, default=''):
+    """column เป็น numpy object array ของ str (ค่าว่าง -> default)"""
+    if col not in df.columns:
+        return np.full(len(df), default, dtype=object)
+    values = df[col].to_numpy(dtype=object)
+    return np.where(pd.isna(values), default, values).astype(str).astype(object)
+
+def _truncate(values, chars: int, always_ellipsis=False):
+    cut = np.frompyfunc(lambda s: s[:chars] + '...' if always_ellipsis or len(s) > chars else s, 1, 1)
+    return cut(values)
+
+def sector_tags(combined):
+    """Combined_Sector -> tag HTML; คำนวณต่อ combination ที่ไม่ซ้ำ (มีไม่กี่ร้อยแบบ) แล้ว map กลับ"""
+    codes, combos = pd.factorize(combined)
+    html = np.array(["".join(f'{TAG_PREFIX}{s.strip()}</span>' for s in combo.split(',') if s.strip())
+                     for combo in combos] + [''], dtype=object)
+    return html[codes]
+
+def card_fragments(df: pd.DataFrame, card=NEWS_CENTER_CARD) -> pd.Series:
+    """
+    HTML ของการ์ดข่าวทุกแถวใน df (Series ตาม index เดิม) สร้างแบบ vectorized ทั้ง frame
+    แทนการ format ทีละแถวใน iterrows()
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+
+    # ใช้ presentation columns จาก data_loader.materialize_display() ถ้ามี, ไม่มีก็คำนวณจาก column ดิบ
+    if 'Color' in df.columns:
+        color = _text(df, 'Color')
+    else:
+        color = utils.sentiment_colors(df['Sentiment_Score'] if 'Sentiment_Score' in df.columns
+                                       else np.full(len(df), 5.0))
+    if card['date_column'] in df.columns:
+        date_str = _text(df, card['date_column'])
+    else:
+        dates = pd.to_datetime(df['Date'], errors='coerce') if 'Date' in df.columns else pd.Series(pd.NaT, index=df.index)
+        date_str = dates.dt.strftime(card['date_format']).fillna('').to_numpy(dtype=object)
+    preview = _text(df, 'Preview') if 'Preview' in df.columns else _text(df, 'Content')
+    content = _escape(_truncate(preview, card['content_chars']))
+    tags = _text(df, 'Tags_HTML') if 'Tags_HTML' in df.columns else sector_tags(_text(df, 'Combined_Sector'))
+
+    short_ans = _text(df, 'Short_Ans')
+    has_summary = _non_blank(short_ans).astype(bool)
+    if card['summary_chars']:
+        short_ans = _truncate(short_ans, card['summary_chars'], always_ellipsis=True)
+    summary = np.where(has_summary, f'<div class="{card["summary_class"]}">{card["summary_label"]}'
+                       + _escape(short_ans) + '</div>', '').astype(object)
+
+    content_attr = (f'class="{card["content_class"]}"' if 'content_class' in card
+                    else f'style="{card["content_style"]}"')
+    html = ('<div class="news-card" style="border-left: 6px solid ' + color + ';">'
+            + '<div class="news-meta">' + _escape(_text(df, 'Source', 'Unknown')) + ' • ' + date_str + '</div>'
+            + '<a href="' + _escape(_text(df, 'Link', '#')) + '" target="_blank" class="news-title">'
+            + _escape(_text(df, 'Title', 'No Title')) + '</a>'
+            + f'<div style="{card["tags_style"]}">' + tags + '</div>'
+            + f'<div {content_attr}>' + content + '</div>'
+            + summary + '</div>')
+    return pd.Series(html, index=df.index, dtype=object)
+
+# ==========================================
+# 3. RENDERING (one payload per page)
+# ==========================================
+def render_cards(df: pd.DataFrame, card=NEWS_CENTER_CARD, columns: int = 1):
+    """
+    ส่งการ์ดทั้งหน้าเป็น st.markdown ครั้งเดียว (1 delta ต่อ rerun แทน 1 ต่อข่าว)
+    columns > 1 จัดเป็น CSS grid (ลำดับซ้าย->ขวา เหมือนการสลับ column เดิม)
+    """
+    fragments = card_fragments(df, card)
+    if fragments.empty:
+        return
+    grid = (f'<div style="display:grid; grid-template-columns:repeat({columns}, minmax(0, 1fr)); column-gap:1rem;">'
+            if columns > 1 else '<div>')
+    st.markdown(grid + ''.join(fragments.tolist()) + '</div>', unsafe_allow_html=True)
+
+def _go_to(key, page):
+    st.session_state[key] = page
+
+def paginate(df: pd.DataFrame, page_size: int = PAGE_SIZE, key: str = 'news_page', reset_on=None):
+    """
+    หน้าปัจจุบันของ df (เก็บเลขหน้าใน session_state[key]) กลับไปหน้า 1 เมื่อ reset_on (เช่น filter) เปลี่ยน
+    คืน (page_df, page, n_pages)
+    """
+    n_pages = max(1, -(-len(df) // page_size))
+    if st.session_state.get(f'{key}_filters') != reset_on:
+        st.session_state[f'{key}_filters'] = reset_on
+        st.session_state[key] = 1
+    page = min(max(1, st.session_state.get(key, 1)), n_pages)
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size], page, n_pages
+
+def page_controls(page: int, n_pages: int, total: int, page_size: int = PAGE_SIZE, key: str = 'news_page'):
+    """แถบ ◀ / หน้า x จาก n / ▶ ใต้รายการการ์ด"""
+    if n_pages <= 1:
+        return
+    c1, c2, c3 = st.columns([1, 2, 1], vertical_alignment="center")
+    with c1:
+        st.button("◀ Previous", key=f'{key}_prev', disabled=page <= 1, use_container_width=True,
+                  on_click=_go_to, args=(key, page - 1))
+    with c2:
+        first, last = (page - 1) * page_size + 1, min(page * page_size, total)
+        st.caption(f"Page {page} of {n_pages} • showing {first}-{last} of {total}")
+    with c3:
+        st.button("Next ▶", key=f'{key}_next', disabled=page >= n_pages, use_container_width=True,
+                  on_click=_go_to, args=(key, page + 1))
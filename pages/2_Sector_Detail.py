@@ -1,7 +1,5 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import sys
 import os
 
@@ -18,20 +16,9 @@ try:
 except:
     pass
 
-# --- 🎯 CONFIG: 11 MAIN SECTORS (WHITELIST) ---
-MAIN_SECTORS = [
-    "Energy", 
-    "Basic Materials",           # GICS: Materials
-    "Industrials", 
-    "Consumer Cyclical",         # GICS: Consumer Discretionary
-    "Consumer Defensive",        # GICS: Consumer Staples
-    "Healthcare",                # GICS: Health Care
-    "Financials", 
-    "Technology",                # GICS: Information Technology
-    "Communication Services", 
-    "Utilities", 
-    "Real Estate"
-]
+import data_loader
+import figures
+MAIN_SECTORS = data_loader.MAIN_SECTORS
 
 # --- 🎨 MODERN UI CSS ---
 st.markdown("""
@@ -123,23 +110,11 @@ st.markdown("""
 # ==========================================
 # 2. LOAD DATA
 # ==========================================
-@st.cache_data
 def load_data():
-    file_path = 'csv_checkpoint/sector_daily_history_enriched.csv' 
-    if not os.path.exists(file_path):
-        file_path = 'sector_daily_history_enriched.csv'
-
-    try:
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
-            df['Report_Date'] = pd.to_datetime(df['Report_Date'])
-            df = df[df['Sector'].isin(MAIN_SECTORS)]
-            return df
-        else:
-            return pd.DataFrame()
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return pd.DataFrame()
+    df = data_loader.load_sector_enriched()
+    if df.empty:
+        return df
+    return df[df['Sector'].isin(MAIN_SECTORS)]
 
 df = load_data()
 
@@ -155,26 +130,6 @@ CUTE_MODEL_NAMES = {
     "Mistral": "Misty Wind 🌪️"
 }
 
-def create_gauge_chart(score):
-    bar_color = '#09ab3b' if score >= 6.5 else ('#ff4b4b' if score <= 3.5 else '#faca2b')
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number", value = score,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        gauge = {
-            'axis': {'range': [0, 10], 'tickwidth': 1}, 
-            'bar': {'color': bar_color},
-            'bgcolor': "white", 'borderwidth': 2, 'bordercolor': "gray",
-            'steps': [
-                {'range': [0, 3.5], 'color': 'rgba(255, 75, 75, 0.2)'}, 
-                {'range': [3.5, 6.5], 'color': 'rgba(250, 202, 43, 0.2)'}, 
-                {'range': [6.5, 10], 'color': 'rgba(9, 171, 59, 0.2)'}
-            ],
-            'threshold': {'line': {'color': "black", 'width': 4}, 'thickness': 0.75, 'value': score}
-        }
-    ))
-    fig.update_layout(height=300, margin=dict(l=20, r=20, t=30, b=20))
-    return fig
-
 # ==========================================
 # 4. MAIN UI
 # ==========================================
@@ -190,7 +145,8 @@ if not df.empty:
 
     selected_sector = st.selectbox("Select Sector", sector_list, key="selected_sector")
 
-    # Filter Data
+    # Filter Data (figures ถูก cache ตาม data version + sector)
+    version = data_loader.data_version('sector_enriched')
     sector_data = df[df['Sector'] == selected_sector].sort_values(by='Report_Date')
     
     if not sector_data.empty:
@@ -203,17 +159,12 @@ if not df.empty:
         with col1:
             st.subheader(f"Health Score: {current_score:.2f}")
             st.caption(f"Outlook: {latest_data['Final_Outlook']} (as of {latest_date_str})")
-            st.plotly_chart(create_gauge_chart(current_score), use_container_width=True)
+            fig_gauge = figures.figure('gauge', version, selected_sector, lambda: figures.gauge_chart(current_score))
+            st.plotly_chart(fig_gauge, use_container_width=True)
 
         with col2:
             st.subheader("30-Day Trend")
-            fig_line = px.line(
-                sector_data, x='Report_Date', y='Final_Daily_Score',
-                markers=True, range_y=[0, 10], color_discrete_sequence=['#1f77b4']
-            )
-            fig_line.add_hrect(y0=6.5, y1=10, fillcolor="green", opacity=0.1, line_width=0)
-            fig_line.add_hrect(y0=0, y1=3.5, fillcolor="red", opacity=0.1, line_width=0)
-            fig_line.update_layout(height=350)
+            fig_line = figures.figure('trend', version, selected_sector, lambda: figures.sector_trend(sector_data))
             st.plotly_chart(fig_line, use_container_width=True)
 
         # --- C. AI INVESTMENT STRATEGY ---
@@ -1,12 +1,12 @@
 import streamlit as st
-import pandas as pd
-import re
 import sys
 import os
 
 # เพิ่ม path ให้หา utils เจอ
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import utils
+import data_loader
+import news_cards
 
 # Config
 st.set_page_config(page_title="News Center", page_icon="📰", layout="wide", initial_sidebar_state="collapsed")
@@ -80,105 +80,44 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def clean_news_content(text):
-    if not isinstance(text, str): return ""
-    
-    # 1. ลบพวก Prefix สำนักข่าว (Pattern เดิม)
-    pattern = r"(?s)^.*?(?:\([^\)]+\)\s*-\s*|\s+--\s+)"
-    cleaned_text = re.sub(pattern, "", text).strip()
-    
-    # 2. [สำคัญ] เปลี่ยนการขึ้นบรรทัดใหม่ (\n) เป็นช่องว่างธรรมดา
-    cleaned_text = cleaned_text.replace("\n", " ")
-    
-    # 3. ลบช่องว่างซ้ำๆ ให้เหลือช่องเดียว
-    cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-    
-    return cleaned_text if cleaned_text else text
-
-@st.cache_data
-def load_data():
-    try:
-        df_news = pd.read_csv('csv_checkpoint/news_summary.csv')
-        if 'Date' in df_news.columns: df_news['Date'] = pd.to_datetime(df_news['Date'], errors='coerce')
-        score_col = 'Score_Qwen2.5-14B-Instruct' 
-        if score_col in df_news.columns: df_news['Sentiment_Score'] = df_news['Score_Qwen2.5-14B-Instruct'] * 10 
-        elif 'Score_finma-7b-full' in df_news.columns: df_news['Sentiment_Score'] = df_news['Score_finma-7b-full'] * 10
-        else: df_news['Sentiment_Score'] = 5.0
-        
-        df_news['Combined_Sector'] = df_news['Combined_Sector'].fillna('General')
-        df_news['Content'] = df_news['Content'].fillna('')
-        df_news['Content'] = df_news['Content'].apply(lambda x: clean_news_content(str(x)))
-        
-        if 'Short_Ans' in df_news.columns:
-            df_news['Short_Ans'] = df_news['Short_Ans'].fillna('')
-        else:
-            df_news['Short_Ans'] = ''
-            
-        return df_news
-    except: return pd.DataFrame()
-
-df_news = load_data()
+df_news = data_loader.load_news()
 
 if not df_news.empty:
     with st.expander("🔍 Search & Filter Options", expanded=True):
         with st.form("news_filter_form"):
             c1, c2, c3 = st.columns([2, 1, 1])
-            with c1: search_query = st.text_input("Search Keyword", placeholder="Type to search headlines or content...")
+            with c1: search_query = st.text_input("Search Keyword", placeholder='Type to search headlines or content... (e.g. fed "interest rate" semi*)')
             with c2: 
-                all_sectors = set()
-                for sectors in df_news['Combined_Sector'].dropna(): all_sectors.update([s.strip() for s in sectors.split(',')])
-                selected_sectors = st.multiselect("Filter by Sector", options=sorted(list(all_sectors)))
+                selected_sectors = st.multiselect("Filter by Sector", options=data_loader.sector_labels(df_news))
             with c3: sentiment_filter = st.selectbox("Sentiment Type", ["All", "Bullish Only", "Bearish Only", "Neutral"])
             st.form_submit_button("Apply Filters")
 
-    filtered_df = df_news.copy()
-    if search_query: filtered_df = filtered_df[filtered_df['Title'].str.contains(search_query, case=False, na=False) | filtered_df['Content'].str.contains(search_query, case=False, na=False)]
-    if selected_sectors: filtered_df = filtered_df[filtered_df['Combined_Sector'].str.contains('|'.join(selected_sectors), case=False, na=False)]
+    # ค้นผ่าน inverted index: ได้ row ids เรียงตาม BM25 + ความใหม่
+    filtered_df = data_loader.search_news(df_news, search_query)
+    if selected_sectors: filtered_df = data_loader.filter_sectors(filtered_df, selected_sectors, df_news.attrs.get('sector_labels', []))
     if sentiment_filter == "Bullish Only": filtered_df = filtered_df[filtered_df['Sentiment_Score'] >= 6]
     elif sentiment_filter == "Bearish Only": filtered_df = filtered_df[filtered_df['Sentiment_Score'] <= 4]
     elif sentiment_filter == "Neutral": filtered_df = filtered_df[(filtered_df['Sentiment_Score'] > 4) & (filtered_df['Sentiment_Score'] < 6)]
 
-    filtered_df = filtered_df.sort_values(by=['Date'], ascending=False)
+    if not search_query:
+        filtered_df = filtered_df.sort_values(by=['Date'], ascending=False)
     
     st.subheader(f"Latest News ({len(filtered_df)} items)")
 
-    # --- [ส่วนที่แก้ไข] สร้าง Layout 2 Columns ---
-    cols = st.columns(2) 
-
-    # ใช้ enumerate เพื่อสลับ column ซ้าย/ขวา
-    for i, (index, row) in enumerate(filtered_df.head(50).iterrows()):
-        
-        # เลือก column: ถ้า i เป็นเลขคู่ลง column 0 (ซ้าย), เลขคี่ลง column 1 (ขวา)
-        current_col = cols[i % 2]
-        
-        with current_col:
-            sectors = str(row['Combined_Sector']).split(',')
-            tags_html = "".join([f'<span class="sector-tag">🏷️ {s.strip()}</span>' for s in sectors if s.strip()])
-            date_str = row['Date'].strftime('%d %b %Y %H:%M') if pd.notnull(row['Date']) else ""
-            
-            score = row['Sentiment_Score']
-            color = utils.get_sentiment_color(score)
-
-            # เตรียม AI Summary (แต่ยังไม่ใส่)
-            ai_summary_html = ""
-            if row['Short_Ans'] and str(row['Short_Ans']).strip() != "":
-                ai_summary_html = f'<div class="ai-summary-box"><strong>🤖 AI Summary :</strong> {row["Short_Ans"]}</div>'
+    # --- Layout 2 Columns: ทั้งหน้าเป็น HTML payload เดียว (CSS grid) + แบ่งหน้า ---
+    page_df, page, n_pages = news_cards.paginate(
+        filtered_df, reset_on=(search_query, tuple(selected_sectors), sentiment_filter))
+    news_cards.render_cards(page_df, news_cards.NEWS_CENTER_CARD, columns=2)
+    news_cards.page_controls(page, n_pages, len(filtered_df))
 
-            # เตรียมเนื้อหาข่าว (Original)
-            original_text = row['Content']
-            if len(original_text) > 200: 
-                original_text = original_text[:200] + "..."
-            
-            # สร้าง HTML: เอา Original Content ขึ้นก่อน -> ตามด้วย AI Summary ด้านล่างสุด
-            card_html = f"""
-<div class="news-card" style="border-left: 6px solid {color};">
-<div class="news-meta">{row['Source']} • {date_str} </b></div>
-<a href="{row['Link']}" target="_blank" class="news-title">{row['Title']}</a>
-<div style="margin-bottom:5px;">{tags_html}</div>
-<div class="original-content">{original_text}</div>
-{ai_summary_html}
-</div>
-"""
-            st.markdown(card_html, unsafe_allow_html=True)
+    # เนื้อข่าวเต็มไม่อยู่ใน frame หลัก -> แตกออกมาเฉพาะข่าวที่เลือกอ่าน
+    if not page_df.empty:
+        with st.expander("📖 Read full article"):
+            chosen = st.selectbox("Article", options=page_df.index.tolist(), index=None,
+                                  format_func=lambda i: page_df.at[i, 'Title'],
+                                  placeholder="Choose a headline on this page...", label_visibility="collapsed")
+            if chosen is not None:
+                st.markdown(f"**{page_df.at[chosen, 'Title']}**")
+                st.write(data_loader.article_body(df_news, chosen))
 
 else: st.error("No news data found.")
\ No newline at end of file
@@ -1,6 +1,4 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import os
 import sys
 
@@ -24,24 +22,9 @@ except:
 # ==========================================
 # 1. LOAD DATA
 # ==========================================
-@st.cache_data
-def load_benchmark_data():
-    # Adjust file path as needed
-    file_path = 'benchmark_results/final_llm_benchmark_detailed.csv'
-    
-    # Fallback path check
-    if not os.path.exists(file_path):
-        if os.path.exists('csv_checkpoint/final_llm_benchmark_detailed.csv'):
-            file_path = 'csv_checkpoint/final_llm_benchmark_detailed.csv'
-            
-    try:
-        df = pd.read_csv(file_path)
-        return df
-    except Exception as e:
-        st.error(f"Error loading benchmark data: {e}")
-        return pd.DataFrame()
-
-df = load_benchmark_data()
+import data_loader
+import figures
+df = data_loader.load_benchmark()
 
 # ==========================================
 # 2. UI HEADER
@@ -97,37 +80,8 @@ if not df.empty:
     
     # --- Chart Preparation ---
     try:
-        # Melt for plotting
-        df_melted = df.melt(
-            id_vars=['Model'], 
-            value_vars=['CFA_Score(%)', 'FPB_Score(%)', 'GSM8K_Score(%)'],
-            var_name='Benchmark', 
-            value_name='Score'
-        )
-        # Clean up labels
-        df_melted['Benchmark'] = df_melted['Benchmark'].str.replace('_Score(%)', '')
-        
-        # Plot Bar Chart
-        fig = px.bar(
-            df_melted, 
-            x='Benchmark', 
-            y='Score', 
-            color='Model', 
-            barmode='group',
-            text_auto='.1f',
-            color_discrete_sequence=px.colors.qualitative.Bold,
-            height=500
-        )
-        
-        fig.update_layout(
-            title="Score Comparison by Category (Scale: 0-100%)",
-            xaxis_title="",
-            yaxis_title="Score (%)",
-            legend_title="AI Model",
-            font=dict(family="Inter, sans-serif", size=14),
-            hovermode="x unified"
-        )
-        fig.update_traces(textposition='outside')
+        fig = figures.figure('benchmark_bars', data_loader.data_version('benchmark'), 'all',
+                             lambda: figures.benchmark_bars(df))
         
         st.plotly_chart(fig, use_container_width=True)
         
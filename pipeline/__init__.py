@@ -0,0 +1 @@
+"""Reusable building blocks for the MarketMind pipeline stages in main.ipynb."""
@@ -0,0 +1,98 @@
+import os
+import warnings
+from dataclasses import dataclass, replace
+from typing import Optional, Union
+
+import torch
+from transformers import AutoModelForCausalLM
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+BACKEND_ENV = "MARKETMIND_BACKEND"           # cuda | cpu | cpu-int8 | auto (default)
+THREADS_ENV = "MARKETMIND_NUM_THREADS"       # จำนวน thread ของ torch บน CPU (ไม่ตั้ง = ค่า default ของ torch)
+
+# ==========================================
+# 2. INFERENCE BACKENDS
+# ==========================================
+@dataclass(frozen=True)
+class InferenceBackend:
+    """
+    วิธีโหลดโมเดลสำหรับเครื่องแต่ละแบบ — ทุก stage ใช้ (model, tokenizer) ผ่าน generate_batch / generate_json /
+    label_responses เหมือนเดิม backend เปลี่ยนแค่ device, dtype และการ quantize ตอนโหลด
+
+        cuda      : bf16 บน GPU (device_map) แบบเดิม
+        cpu       : fp32 บน CPU
+        cpu-int8  : fp32 + dynamic int8 quantization ของ nn.Linear (weights int8, activations quantize ทีละ batch)
+
+    num_threads: torch.set_num_threads ตอนโหลด (CPU); mmap=True: memory-map safetensors แทนการอ่านทั้งไฟล์
+    เข้า RAM ก่อน (โหลดเร็วขึ้น, page cache ใช้ร่วมกันระหว่าง process ที่โหลดโมเดลเดียวกัน)
+    """
+    name: str
+    device: str
+    dtype: torch.dtype
+    quantize: Optional[str] = None
+    num_threads: Optional[int] = None
+    mmap: bool = True
+
+    @property
+    def is_cuda(self) -> bool:
+        return str(self.device).startswith('cuda')
+
+    def cache_model_key(self, model_name: str) -> str:
+        """key ของโมเดลใน InferenceCache: คำตอบของโมเดลที่ quantize ไม่ปนกับของโมเดลเต็ม"""
+        return f"{model_name}@{self.quantize}" if self.quantize else model_name
+
+    def load_weights(self, model_name: str):
+        if self.num_threads and not self.is_cuda:
+            torch.set_num_threads(self.num_threads)
+        kwargs = {'dtype': self.dtype, 'trust_remote_code': True, 'disable_mmap': not self.mmap}
+        if self.is_cuda:
+            model = AutoModelForCausalLM.from_pretrained(model_name, device_map=self.device, **kwargs)
+        else:  # device_map ต้องใช้ accelerate; บน CPU โหลดตรงๆ ได้เลย
+            model = AutoModelForCausalLM.from_pretrained(model_name, **kwargs).to(self.device)
+        model.eval()
+        if self.quantize == 'int8':
+            model = quantize_int8(model)
+        return model
+
+BACKENDS = {
+    'cuda': InferenceBackend('cuda', 'cuda:0', torch.bfloat16),
+    'cpu': InferenceBackend('cpu', 'cpu', torch.float32),
+    'cpu-int8': InferenceBackend('cpu-int8', 'cpu', torch.float32, quantize='int8'),
+}
+
+def quantize_int8(model):
+    """
+    Dynamic int8 quantization ของทุก nn.Linear (CPU เท่านั้น): weights เก็บเป็น int8 ต่อ channel,
+    activations quantize ตอน forward -> linear layers (รวม lm_head) เร็วขึ้นและใช้ RAM ราว 1/4 ของ fp32
+    embedding / norm ยังเป็น fp32
+    """
+    if next(model.parameters()).device.type != 'cpu':
+        raise ValueError("int8 dynamic quantization runs on CPU only; load the model with device='cpu'")
+    with warnings.catch_warnings():
+        # torch.ao.quantization แจ้ง deprecation (ย้ายไป torchao) แต่ quantize_dynamic ยังเป็นทางที่ไม่ต้องพึ่ง package เพิ่ม
+        warnings.simplefilter('ignore')
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def get_backend(backend: Union[None, str, InferenceBackend] = None, device: Optional[str] = None,
+                dtype=None, num_threads: Optional[int] = None) -> InferenceBackend:
+    """
+    Resolves the backend of a stage: an InferenceBackend, a name from BACKENDS, or None = MARKETMIND_BACKEND
+    (default 'auto': cuda ถ้ามี GPU ไม่งั้น cpu).
+    device / dtype / num_threads override ค่าของ backend (เช่น device='cuda:1'); device คนละชนิดกับ backend
+    (cpu กับ backend cuda) = ใช้ backend default ของ device นั้น
+    """
+    if not isinstance(backend, InferenceBackend):
+        name = backend or os.environ.get(BACKEND_ENV, 'auto')
+        if name == 'auto':
+            name = 'cuda' if torch.cuda.is_available() else 'cpu'
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown inference backend {name!r}; expected one of {sorted(BACKENDS)} or 'auto'")
+        backend = BACKENDS[name]
+        if num_threads is None and os.environ.get(THREADS_ENV):
+            num_threads = int(os.environ[THREADS_ENV])
+    if device is not None and str(device).startswith('cuda') != backend.is_cuda:
+        backend = BACKENDS['cuda' if str(device).startswith('cuda') else 'cpu']
+    overrides = {'device': device, 'dtype': dtype, 'num_threads': num_threads}
+    return replace(backend, **{k: v for k, v in overrides.items() if v is not None})
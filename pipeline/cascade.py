@@ -0,0 +1,116 @@
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+DISAGREEMENT = 0.5      # ช่วงห่าง (max - min) ของ score ที่ได้แล้ว เกินนี้ -> ถามโมเดลถัดไป
+MIN_CONFIDENCE = 0.2    # |consensus| ต่ำกว่านี้ (ใกล้ neutral / ไม่แน่ใจ) -> ถามโมเดลถัดไป
+MIN_MODELS = 1          # จำนวนโมเดลขั้นต่ำที่ทุกข่าวต้องผ่าน
+SCORED_BY_COLUMN = 'Scored_By'
+CONSENSUS_COLUMN = 'Consensus_Score'
+
+def score_column(model_name: str) -> str:
+    return f"Score_{model_name.split('/')[-1]}"
+
+def cascade_order(models_config: List[Dict]) -> List[Dict]:
+    """เรียงโมเดลจากถูกไปแพง ('cost' เช่นจำนวนพารามิเตอร์; ไม่มี cost = ลำดับเดิมต่อท้าย)"""
+    return sorted(models_config, key=lambda c: c.get('cost', float('inf')))
+
+# ==========================================
+# 2. ESCALATION POLICY
+# ==========================================
+class CascadePolicy:
+    """
+    ตัดสินว่าข่าวไหนต้องให้โมเดลถัดไปใน cascade ให้คะแนนเพิ่ม จาก Score_* ที่ได้แล้ว (NaN = โมเดลนั้นไม่ได้ให้)
+
+    - ยังได้คะแนนไม่ถึง min_models                        -> escalate
+    - โมเดลที่ให้แล้วเห็นต่างกันเกิน disagreement (max - min) -> escalate
+    - consensus ใกล้ 0 กว่า min_confidence                  -> escalate
+    - settled(df): (optional) mask ข่าวที่ถือว่าชัดแล้ว (เช่นจาก TF-IDF stage) -> ไม่ escalate หลัง min_models
+    """
+
+    def __init__(self, disagreement: float = DISAGREEMENT, min_confidence: float = MIN_CONFIDENCE,
+                 min_models: int = MIN_MODELS, settled=None):
+        self.disagreement = disagreement
+        self.min_confidence = min_confidence
+        self.min_models = min_models
+        self.settled = settled
+
+    def escalate(self, df: pd.DataFrame, score_cols: List[str]) -> pd.Series:
+        """bool ต่อแถว: ต้องให้โมเดลถัดไปให้คะแนนหรือไม่"""
+        if not score_cols:
+            return pd.Series(True, index=df.index)
+        scores = df[score_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        scored = (~np.isnan(scores)).sum(axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)   # แถวที่ยังไม่มีคะแนนเลย -> NaN (นับใน scored แล้ว)
+            spread = np.nanmax(scores, axis=1) - np.nanmin(scores, axis=1)
+            consensus = np.nanmean(scores, axis=1)
+        uncertain = (np.nan_to_num(spread) > self.disagreement) | (np.abs(np.nan_to_num(consensus)) < self.min_confidence)
+        if self.settled is not None:
+            uncertain &= ~np.asarray(self.settled(df), dtype=bool)
+        return pd.Series((scored < self.min_models) | uncertain, index=df.index)
+
+    def __repr__(self):
+        return (f"CascadePolicy(disagreement={self.disagreement}, min_confidence={self.min_confidence}, "
+                f"min_models={self.min_models})")
+
+# ==========================================
+# 3. CONSENSUS OVER THE MODELS THAT SCORED
+# ==========================================
+def scored_by(df: pd.DataFrame, models_config: List[Dict]) -> pd.Series:
+    """ชื่อโมเดล (short name) ที่ให้คะแนนแต่ละข่าวจริง คั่นด้วย ',' ตามลำดับ cascade"""
+    names = np.array([c['name'].split('/')[-1] for c in models_config], dtype=object)
+    cols = [score_column(c['name']) for c in models_config]
+    present = df.reindex(columns=cols).notna().to_numpy()
+    return pd.Series([",".join(names[row]) for row in present], index=df.index, dtype=object)
+
+def weighted_consensus(df: pd.DataFrame, models_config: List[Dict]) -> pd.Series:
+    """
+    Σ weight x score / Σ weight เฉพาะโมเดลที่ให้คะแนนแถวนั้น (NaN ไม่นับทั้ง score และ weight)
+    ไม่มีโมเดลไหนให้คะแนน -> NaN
+    """
+    cols = [score_column(c['name']) for c in models_config]
+    scores = df.reindex(columns=cols).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    weights = np.array([c.get('weight', 1.0) for c in models_config], dtype=float)
+    present = ~np.isnan(scores)
+    total = (present * weights).sum(axis=1)
+    weighted = (np.nan_to_num(scores) * weights).sum(axis=1)
+    return pd.Series(np.divide(weighted, total, out=np.full(len(df), np.nan), where=total > 0), index=df.index)
+
+def cascade_summary(df: pd.DataFrame, models_config: List[Dict]) -> Dict:
+    """จำนวน (ข่าว, โมเดล) ที่ให้คะแนนจริงเทียบกับ run ทุกโมเดล + สัดส่วนที่ประหยัด (ถ่วงด้วย cost ถ้ามี)"""
+    cols = [score_column(c['name']) for c in models_config]
+    present = df.reindex(columns=cols).notna().to_numpy()
+    costs = np.array([c.get('cost', 1.0) for c in models_config], dtype=float)
+    calls, full = int(present.sum()), present.shape[0] * present.shape[1]
+    return {
+        'articles': len(df),
+        'calls': calls,
+        'calls_full': full,
+        'calls_saved': 1 - calls / full if full else 0.0,
+        'cost_saved': 1 - (present * costs).sum() / (costs.sum() * len(df)) if len(df) else 0.0,
+        'per_model': dict(zip([c['name'].split('/')[-1] for c in models_config], present.sum(axis=0).tolist())),
+    }
+
+def replay(df: pd.DataFrame, models_config: List[Dict], policy: CascadePolicy,
+           order: Optional[List[Dict]] = None) -> pd.DataFrame:
+    """
+    Replays the cascade on a checkpoint that already has every model's Score_*:
+    โมเดลที่ policy ไม่ได้ escalate ไปถึง -> NaN (เหมือนไม่ได้รัน) แล้วเติม Scored_By / Consensus_Score ใหม่
+    """
+    order = order or cascade_order(models_config)
+    out = df.copy()
+    done = []
+    for config in order:
+        col = score_column(config['name'])
+        if col not in out.columns: continue
+        out.loc[~policy.escalate(out, done), col] = np.nan
+        done.append(col)
+    out[SCORED_BY_COLUMN] = scored_by(out, order)
+    out[CONSENSUS_COLUMN] = weighted_consensus(out, order)
+    return out
@@ -0,0 +1,257 @@
+import ast
+import glob
+import os
+import shutil
+
+import pandas as pd
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'csv_checkpoint')
+
+# 'parquet' (default) หรือ 'csv' (compat mode สำหรับเครื่องที่ยังใช้ไฟล์ CSV เดิม)
+CHECKPOINT_FORMAT = os.environ.get('MARKETMIND_CHECKPOINT_FORMAT', 'parquet')
+
+FORMATS = {'parquet': '.parquet', 'csv': '.csv'}
+
+# คอลัมน์ที่เก็บเป็น dict {sector: score} -> Parquet map<string, double>
+MAP_COLUMNS = ['Sector_Dict']
+# คอลัมน์ที่ค่าซ้ำกันเยอะ -> dictionary encoding (category)
+CATEGORY_COLUMNS = ['Sector', 'Source', 'Final_Outlook']
+# คอลัมน์วันที่ (แปลงเฉพาะเมื่อแปลงได้ครบทุกแถว ไม่ทำให้ข้อมูลหาย)
+DATETIME_COLUMNS = ['Date', 'Report_Date']
+
+PARQUET_COMPRESSION = 'zstd'
+# append / upsert ของ Parquet เขียนเป็น part ใหม่ใน <name>.parquet/ (dataset directory) แทนการเขียนทั้งไฟล์ใหม่
+PART_PATTERN = 'part-*.parquet'
+
+# ==========================================
+# 2. HELPERS
+# ==========================================
+def parse_sector_dict(value):
+    """แปลง Sector_Dict ที่มาจาก CSV (string) ให้กลับเป็น dict"""
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str) and value.strip():
+        try:
+            parsed = ast.literal_eval(value)
+            return parsed if isinstance(parsed, dict) else {}
+        except (ValueError, SyntaxError):
+            return {}
+    return {}
+
+def _select_columns(available, columns):
+    """columns เป็น list หรือ callable(name) -> bool ก็ได้ คืนเฉพาะคอลัมน์ที่มีจริง (ตามลำดับในไฟล์)"""
+    if columns is None:
+        return list(available)
+    if callable(columns):
+        return [c for c in available if columns(c)]
+    wanted = set(columns)
+    return [c for c in available if c in wanted]
+
+def _to_parquet_frame(df):
+    """เตรียม DataFrame ให้เป็น typed columns ก่อนเขียน Parquet"""
+    df = df.copy()
+    for col in MAP_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: {str(k): float(s) for k, s in parse_sector_dict(v).items()})
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    for col in DATETIME_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            parsed = pd.to_datetime(df[col], errors='coerce', format='mixed')
+            if parsed.isna().sum() == df[col].isna().sum():
+                df[col] = parsed
+    # object คอลัมน์ที่ปน type กัน (เช่น str + float) ให้เป็น string ทั้งหมด
+    for col in df.columns:
+        if df[col].dtype == object and col not in MAP_COLUMNS:
+            kinds = {type(v) for v in df[col].dropna()}
+            if len(kinds) > 1:
+                df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+def _parquet_parts(path):
+    """ไฟล์ Parquet ของ checkpoint: dataset directory -> part ตามลำดับที่เขียน, ไฟล์เดี่ยว -> [path]"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, PART_PATTERN)))
+    return [path]
+
+def _next_part(path) -> str:
+    parts = _parquet_parts(path)
+    index = int(os.path.basename(parts[-1])[5:-8]) + 1 if parts else 0
+    return os.path.join(path, f'part-{index:05d}.parquet')
+
+def _to_dataset(path):
+    """ไฟล์ Parquet เดี่ยว (จาก write) -> dataset directory ที่มีไฟล์เดิมเป็น part แรก (rename ไม่เขียนข้อมูลใหม่)"""
+    if os.path.isdir(path):
+        return
+    moved = path + '.part'
+    os.replace(path, moved)
+    os.makedirs(path)
+    os.replace(moved, os.path.join(path, 'part-00000.parquet'))
+
+def _write_parquet(df, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    frame = _to_parquet_frame(df)
+    table = pa.Table.from_pandas(frame, schema=_parquet_schema(frame), preserve_index=False)
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression=PARQUET_COMPRESSION)
+    os.replace(tmp_path, path)
+
+def _read_parquet(path, columns=None) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+    selected = None if columns is None else _select_columns(pq.read_schema(path).names, columns)
+    return pq.read_table(path, columns=selected).to_pandas(maps_as_pydicts='strict')
+
+def _parquet_schema(df):
+    import pyarrow as pa
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for col in MAP_COLUMNS:
+        if col in df.columns:
+            schema = schema.set(schema.get_field_index(col), pa.field(col, pa.map_(pa.string(), pa.float64())))
+    return schema
+
+# ==========================================
+# 3. CHECKPOINT STORE
+# ==========================================
+class CheckpointStore:
+    """
+    Storage abstraction ของไฟล์ระหว่างทางใน csv_checkpoint/
+    - 'parquet': typed columns, Sector_Dict เป็น map<string, double>, zstd compression
+                 write() = ไฟล์เดียว; append() / replace_rows() = part ใน <name>.parquet/ (เขียนเฉพาะส่วนที่เปลี่ยน)
+    - 'csv'    : รูปแบบเดิม (compat mode)
+    อ่านได้ทั้งสองแบบเสมอ: ถ้าไม่มีไฟล์ในรูปแบบที่ตั้งไว้ จะ fallback ไปอีกแบบ
+    """
+
+    def __init__(self, base_dir: str = CHECKPOINT_DIR, fmt: str = CHECKPOINT_FORMAT):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown checkpoint format '{fmt}' (expected one of {list(FORMATS)})")
+        self.base_dir = base_dir
+        self.fmt = fmt
+
+    def path(self, name: str, fmt: str = None) -> str:
+        return os.path.join(self.base_dir, name + FORMATS[fmt or self.fmt])
+
+    def find(self, name: str):
+        """Path ของไฟล์ที่มีอยู่จริง (รูปแบบที่ตั้งไว้ก่อน) หรือ None"""
+        for fmt in [self.fmt] + [f for f in FORMATS if f != self.fmt]:
+            path = self.path(name, fmt)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def exists(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def columns(self, name: str) -> list:
+        path = self.find(name)
+        if path is None:
+            return []
+        if path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            names = {}
+            for part in _parquet_parts(path):
+                names.update(dict.fromkeys(pq.read_schema(part).names))
+            return list(names)
+        return pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns.tolist()
+
+    def read(self, name: str, columns=None) -> pd.DataFrame:
+        """
+        Reads a checkpoint. `columns` (list or predicate) projects only the needed columns,
+        so Parquet never decodes the long Content / Reason_* strings unless asked to.
+        """
+        path = self.find(name)
+        if path is None:
+            raise FileNotFoundError(f"Checkpoint '{name}' not found in {self.base_dir}")
+        return self.read_path(path, columns)
+
+    def read_path(self, path: str, columns=None) -> pd.DataFrame:
+        if path.endswith('.parquet'):
+            frames = [_read_parquet(part, columns) for part in _parquet_parts(path)]
+            if len(frames) == 1:
+                return frames[0]
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+        usecols = None
+        if columns is not None:
+            header = pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns
+            usecols = _select_columns(header, columns)
+        df = pd.read_csv(path, usecols=usecols, encoding='utf-8-sig')
+        for col in MAP_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].map(parse_sector_dict)
+        return df
+
+    def write(self, name: str, df: pd.DataFrame) -> str:
+        """
+        เขียนทั้งไฟล์ (ผ่านไฟล์ .tmp แล้ว rename เพื่อไม่ให้ไฟล์เดิมเสียถ้า crash กลางทาง)
+        Parquet dataset ที่มีอยู่ถูกแทนด้วยไฟล์เดียว (= compact part ทั้งหมด)
+        """
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self.path(name)
+        tmp_path = path + '.tmp'
+
+        if self.fmt == 'parquet':
+            _write_parquet(df, tmp_path)
+        else:
+            df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+
+        if os.path.isdir(path):
+            old_path = path + '.old'
+            os.replace(path, old_path)
+            os.replace(tmp_path, path)
+            shutil.rmtree(old_path)
+        else:
+            os.replace(tmp_path, path)
+        return path
+
+    def _parquet_dataset(self, name: str):
+        """path ของ dataset directory ของ name (แปลงไฟล์เดี่ยวให้) หรือ None ถ้าไม่มีไฟล์ Parquet ของ name"""
+        path = self.path(name, 'parquet')
+        if self.fmt != 'parquet' or self.find(name) != path:
+            return None
+        _to_dataset(path)
+        return path
+
+    def append(self, name: str, df_new: pd.DataFrame) -> str:
+        """
+        Appends rows. CSV appends in place; Parquet writes df_new as a new part file of the
+        <name>.parquet/ dataset, so the cost is the new rows only (not the whole archive).
+        """
+        path = self.path(name)
+        if self.fmt == 'csv':
+            os.makedirs(self.base_dir, exist_ok=True)
+            df_new.to_csv(path, mode='a', header=not os.path.isfile(path), index=False, encoding='utf-8-sig')
+            return path
+        dataset = self._parquet_dataset(name)
+        if dataset is None:
+            if self.exists(name):   # มีแต่ CSV เดิม -> แปลงเป็น Parquet ครั้งเดียว
+                df_new = pd.concat([self.read(name), df_new], ignore_index=True)
+            return self.write(name, df_new)
+        if not df_new.empty:
+            _write_parquet(df_new, _next_part(dataset))
+        return dataset
+
+    def replace_rows(self, name: str, df_new: pd.DataFrame, stale, key_columns) -> str:
+        """
+        Drops the rows for which stale(frame of key_columns) is True and appends df_new.
+        Parquet: อ่านแค่ key_columns ของทุก part, เขียนใหม่เฉพาะ part ที่มีแถว stale (part ที่ว่างถูกลบ)
+        แล้ว df_new เป็น part ใหม่; CSV / มีแต่ CSV เดิม -> อ่านและเขียนทั้งไฟล์ครั้งเดียว
+        """
+        dataset = self._parquet_dataset(name)
+        if dataset is None:
+            df_old = self.read(name)
+            return self.write(name, pd.concat([df_old[~stale(df_old)], df_new], ignore_index=True))
+        for part in _parquet_parts(dataset):
+            mask = stale(_read_parquet(part, columns=key_columns)).to_numpy()
+            if not mask.any():
+                continue
+            if mask.all():
+                os.remove(part)
+            else:
+                df_part = _read_parquet(part)
+                _write_parquet(df_part[~mask], part)
+        return self.append(name, df_new)
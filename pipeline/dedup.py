@@ -0,0 +1,276 @@
+import os
+import re
+import zlib
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from pipeline.checkpoint import CHECKPOINT_DIR
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+INDEX_PATH = os.path.join(CHECKPOINT_DIR, 'models', 'near_dup_lsh.npz')
+NUM_PERM = 128        # ความยาว MinHash signature
+BANDS = 32            # LSH: 32 bands x 4 rows -> candidate ตั้งแต่ Jaccard ~0.4 (recall สูง) แล้วค่อยยืนยันด้วย THRESHOLD
+THRESHOLD = 0.7       # ยืนยันคู่ candidate ด้วย Jaccard ที่ประมาณจาก signature
+SHINGLE_SIZE = 3      # word 3-grams
+MAX_WORDS = 200       # ใช้หัวข่าว + ต้นข่าว (ข่าว syndicated ต่างกันที่ท้ายข่าว/disclaimer เป็นหลัก)
+CHUNK_SHINGLES = 50_000   # shingles ต่อก้อน (x NUM_PERM x 4 bytes ~ 25MB)
+MAX_BUCKET = 64       # bucket ใหญ่กว่านี้ (ข้อความ template ซ้ำ ๆ) จับคู่แค่กับสมาชิกตัวแรก
+
+_TOKEN = re.compile(r"\w+")
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_FNV = np.uint64(0x100000001B3)
+
+# ==========================================
+# 2. MINHASH SIGNATURES (vectorized)
+# ==========================================
+def _word_hashes(docs_tokens: List[List[str]]):
+    """stable 64-bit hash ต่อคำ (crc32 ต่อคำที่ไม่ซ้ำ แล้ว map กลับด้วย factorize)"""
+    flat = [w for tokens in docs_tokens for w in tokens]
+    codes, uniques = pd.factorize(pd.Series(flat, dtype=object), sort=False)
+    table = np.fromiter((zlib.crc32(w.encode('utf-8')) for w in uniques), dtype=np.uint64, count=len(uniques))
+    return (table * _MIX)[codes] if len(flat) else np.empty(0, np.uint64)
+
+def _shingle_hashes(words: np.ndarray, lengths: np.ndarray, k: int):
+    """word k-gram hashes (uint32) ที่ไม่ข้ามขอบข่าว -> (hashes, จำนวน shingle ต่อข่าว)"""
+    counts = np.maximum(lengths - k + 1, 0)
+    if not counts.sum():
+        return np.empty(0, np.uint32), counts
+    starts = np.repeat(np.cumsum(lengths) - lengths, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    pos = starts + offsets
+    h = np.zeros(len(pos), np.uint64)
+    with np.errstate(over='ignore'):
+        for j in range(k):
+            h = (h ^ words[pos + j]) * _FNV
+    return ((h >> np.uint64(32)) ^ h).astype(np.uint32), counts
+
+class NearDupIndex:
+    """
+    MinHash + LSH near-duplicate index, persisted across runs.
+
+    - เก็บเฉพาะ signature ของตัวแทน (representative) ของแต่ละ cluster -> bucket เล็ก, index โตตามจำนวนข่าวที่ไม่ซ้ำ
+    - add(links, texts): หา candidate ด้วย band keys (searchsorted บน keys ที่เรียงไว้) แล้วยืนยันด้วย Jaccard
+      ข่าวใหม่ที่ไม่ตรงกับตัวแทนเดิม -> จัดกลุ่มกันเองด้วย connected components (ตัวแรกตามลำดับ input เป็นตัวแทน)
+    - ต้นทุนต่อรอบ O(ข่าวใหม่ x bands x log n), ไม่ใช่ O(n^2)
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS, threshold: float = THRESHOLD,
+                 shingle_size: int = SHINGLE_SIZE, max_words: int = MAX_WORDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_words = max_words
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # permutation ของ uint32: x -> a*x + b (mod 2^32), a เป็นเลขคี่ -> bijection (เร็วกว่า 64-bit ~8x)
+        self._a = rng.integers(0, 2**32, num_perm, dtype=np.uint32) | np.uint32(1)
+        self._b = rng.integers(0, 2**32, num_perm, dtype=np.uint32)
+
+        self.links = np.empty(0, dtype=object)                       # Link ของตัวแทน
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._sorted_keys = np.empty(0, np.uint64)
+        self._sorted_rep = np.empty(0, np.int64)
+
+    def __len__(self):
+        return len(self.links)
+
+    def params(self):
+        return {'num_perm': self.num_perm, 'bands': self.bands, 'shingle_size': self.shingle_size,
+                'max_words': self.max_words, 'seed': self.seed}
+
+    # --- signatures ---
+    def tokenize(self, text) -> List[str]:
+        if not isinstance(text, str):
+            return []
+        # ตัดข้อความก่อน regex (ใช้แค่ max_words คำแรกอยู่แล้ว)
+        return _TOKEN.findall(text[:self.max_words * 16].lower())[:self.max_words]
+
+    def signatures_of(self, texts: List[str]):
+        """-> (signatures (n, num_perm) uint32, valid mask) ; ข่าวที่สั้นกว่า shingle_size คำ = ไม่ valid"""
+        tokens = [self.tokenize(t) for t in texts]
+        lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=len(tokens))
+        shingles, counts = _shingle_hashes(_word_hashes(tokens), lengths, self.shingle_size)
+        valid = counts > 0
+        sigs = np.full((len(texts), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+        # แบ่งเป็นก้อนตามจำนวน shingle (คุมหน่วยความจำของ matrix shingles x permutations)
+        doc_ends = np.cumsum(counts)
+        doc = 0
+        while doc < len(texts):
+            start = doc_ends[doc] - counts[doc]
+            stop = int(np.searchsorted(doc_ends, start + CHUNK_SHINGLES, side='right'))
+            stop = max(stop, doc + 1)
+            block = shingles[start:doc_ends[stop - 1]]
+            seg_counts = counts[doc:stop]
+            has = seg_counts > 0
+            if has.any():
+                # (num_perm, shingles): reduceat ตามแนวแถวที่ต่อเนื่องในหน่วยความจำ
+                with np.errstate(over='ignore'):
+                    hashed = self._a[:, None] * block
+                    hashed += self._b[:, None]
+                seg_starts = (np.cumsum(seg_counts) - seg_counts)[has]
+                sigs[doc:stop][has] = np.minimum.reduceat(hashed, seg_starts, axis=1).T
+            doc = stop
+        return sigs, valid
+
+    def band_keys(self, sigs: np.ndarray) -> np.ndarray:
+        """(n, bands) uint64; band id ผสมเข้าไปใน key -> ค้นทุก band ใน array เดียวได้"""
+        # จำนวน row ต่อ band ระบุตรง ๆ: reshape(-1) ใช้กับ 0 แถวไม่ได้ (ทุกข่าวใน batch สั้นเกิน shingle / None)
+        rows = sigs.reshape(len(sigs), self.bands, self.num_perm // self.bands).astype(np.uint64)
+        keys = np.zeros(rows.shape[:2], np.uint64)
+        with np.errstate(over='ignore'):
+            for j in range(rows.shape[2]):
+                keys = (keys ^ rows[:, :, j]) * _FNV
+            keys ^= np.arange(self.bands, dtype=np.uint64) * _MIX
+        return keys
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> np.ndarray:
+        """estimated Jaccard ต่อคู่ (แถวต่อแถว)"""
+        return (sig_a == sig_b).mean(axis=1)
+
+    # --- matching ---
+    def _match_existing(self, keys: np.ndarray, sigs: np.ndarray):
+        """-> (rep index หรือ -1, similarity) ของแต่ละข่าวใหม่เทียบกับตัวแทนใน index"""
+        n = len(keys)
+        best, best_sim = np.full(n, -1, np.int64), np.zeros(n)
+        if not len(self._sorted_keys) or not n:
+            return best, best_sim
+        flat = keys.ravel()
+        lo = np.searchsorted(self._sorted_keys, flat, side='left')
+        hi = np.searchsorted(self._sorted_keys, flat, side='right')
+        sizes = np.minimum(hi - lo, MAX_BUCKET)
+        if not sizes.sum():
+            return best, best_sim
+        query = np.repeat(np.arange(len(flat)) // self.bands, sizes)
+        pos = np.repeat(lo, sizes) + (np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes))
+        pairs = np.unique(np.stack([query, self._sorted_rep[pos]], axis=1), axis=0)
+        sim = self.similarity(sigs[pairs[:, 0]], self.signatures[pairs[:, 1]])
+        ok = sim >= self.threshold
+        pairs, sim = pairs[ok], sim[ok]
+        # ตัวแทนที่คล้ายที่สุดต่อข่าว
+        order = np.lexsort((-sim, pairs[:, 0]))
+        first = np.unique(pairs[order, 0], return_index=True)[1]
+        chosen = order[first]
+        best[pairs[chosen, 0]] = pairs[chosen, 1]
+        best_sim[pairs[chosen, 0]] = sim[chosen]
+        return best, best_sim
+
+    def _cluster_new(self, keys: np.ndarray, sigs: np.ndarray):
+        """connected components ของข่าวใหม่ด้วยกันเอง -> component id ต่อข่าว"""
+        n = len(keys)
+        if n < 2:
+            return np.arange(n)
+        flat = keys.ravel()
+        doc = np.arange(len(flat)) // self.bands
+        order = np.argsort(flat, kind='stable')
+        flat, doc = flat[order], doc[order]
+        boundaries = np.flatnonzero(np.diff(flat)) + 1
+        run_starts = np.concatenate([[0], boundaries])
+        run_sizes = np.diff(np.concatenate([run_starts, [len(flat)]]))
+
+        # bucket ขนาด 2 (ส่วนใหญ่) -> คู่เดียว ทำแบบ vectorized; ที่ใหญ่กว่าค่อยวน
+        pair_starts = run_starts[run_sizes == 2]
+        left, right = [doc[pair_starts]], [doc[pair_starts + 1]]
+        for start, size in zip(run_starts[run_sizes > 2], run_sizes[run_sizes > 2]):
+            members = np.unique(doc[start:start + size])
+            if len(members) < 2:
+                continue
+            if len(members) > MAX_BUCKET:
+                left.append(np.full(len(members) - 1, members[0]))
+                right.append(members[1:])
+            else:
+                i, j = np.triu_indices(len(members), k=1)
+                left.append(members[i])
+                right.append(members[j])
+        pairs = np.stack([np.concatenate(left), np.concatenate(right)], axis=1)
+        pairs = np.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+        if not len(pairs):
+            return np.arange(n)
+        ok = self.similarity(sigs[pairs[:, 0]], sigs[pairs[:, 1]]) >= self.threshold
+        pairs = pairs[ok]
+        graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        return connected_components(graph, directed=False)[1]
+
+    def add(self, links: List[str], texts: List[str]) -> pd.DataFrame:
+        """
+        Assigns each new article to a cluster and indexes the new representatives.
+        -> DataFrame[Link, Dup_Of, Dup_Similarity, Is_Duplicate] ในลำดับเดียวกับ input
+           Dup_Of = Link ของตัวแทน (ตัวเองถ้าเป็นตัวแทน)
+        """
+        links = np.asarray(list(links), dtype=object)
+        sigs, valid = self.signatures_of(list(texts))
+        n = len(links)
+        dup_of = links.copy()
+        dup_sim = np.ones(n)
+
+        idx = np.flatnonzero(valid)
+        keys = self.band_keys(sigs[idx])
+
+        # 1. เทียบกับตัวแทนจากรอบก่อน ๆ
+        rep, sim = self._match_existing(keys, sigs[idx])
+        matched = rep >= 0
+        dup_of[idx[matched]] = self.links[rep[matched]]
+        dup_sim[idx[matched]] = sim[matched]
+
+        # 2. ข่าวใหม่ที่เหลือ: จัดกลุ่มกันเอง, ตัวแรกของแต่ละกลุ่มเป็นตัวแทนใหม่
+        rest = idx[~matched]
+        components = self._cluster_new(keys[~matched], sigs[rest])
+        _, first = np.unique(components, return_index=True)
+        leader = rest[first][np.searchsorted(np.unique(components), components)]
+        dup_of[rest] = links[leader]
+        is_leader = leader == rest
+        dup_sim[rest[~is_leader]] = self.similarity(sigs[rest[~is_leader]], sigs[leader[~is_leader]])
+
+        self._add_reps(links[rest[is_leader]], sigs[rest[is_leader]], keys[~matched][is_leader])
+        return pd.DataFrame({
+            'Link': links,
+            'Dup_Of': dup_of,
+            'Dup_Similarity': dup_sim,
+            'Is_Duplicate': dup_of != links,
+        })
+
+    def _add_reps(self, links, sigs, keys):
+        base = len(self.links)
+        self.links = np.concatenate([self.links, links])
+        self.signatures = np.concatenate([self.signatures, sigs])
+        new_keys = keys.ravel()
+        new_rep = np.repeat(np.arange(base, base + len(links)), self.bands)
+        all_keys = np.concatenate([self._sorted_keys, new_keys])
+        all_rep = np.concatenate([self._sorted_rep, new_rep])
+        order = np.argsort(all_keys, kind='stable')
+        self._sorted_keys, self._sorted_rep = all_keys[order], all_rep[order]
+
+    # --- persistence ---
+    def save(self, path: str = INDEX_PATH) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, links=self.links.astype(str), signatures=self.signatures,
+                 params=np.array([list(self.params().values())], dtype=np.int64),
+                 threshold=np.array([self.threshold]))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH, **kwargs) -> Optional['NearDupIndex']:
+        """Index saved at `path`, or None if missing or built with different signature params."""
+        if not os.path.exists(path):
+            return None
+        index = cls(**kwargs)
+        with np.load(path, allow_pickle=False) as state:
+            if state['params'][0].tolist() != list(index.params().values()):
+                print("⚠️ Saved near-dup index was built with different MinHash params, ignoring it")
+                return None
+            links, sigs = state['links'].astype(object), state['signatures']
+        if len(links):
+            index._add_reps(links, sigs, index.band_keys(sigs))
+        return index
@@ -0,0 +1,38 @@
+from typing import Iterable, Set
+
+import pandas as pd
+
+from pipeline.checkpoint import CheckpointStore
+from pipeline.journal import normalize_link
+
+# ==========================================
+# INCREMENTAL STAGE HELPERS
+# ==========================================
+# แต่ละ stage รู้ว่าข่าวไหนทำไปแล้วจาก Link ใน output ของตัวเอง (อ่านแค่คอลัมน์ Link)
+# -> งานคำนวณต่อรอบ (TF-IDF / LLM / merge logic) เป็นสัดส่วนกับข่าวใหม่ ไม่ใช่ทั้ง archive
+
+def processed_links(store: CheckpointStore, name: str) -> Set[str]:
+    """normalized Links ที่อยู่ใน checkpoint แล้ว (set ว่างถ้ายังไม่มีไฟล์)"""
+    if not store.exists(name):
+        return set()
+    links = store.read(name, columns=['Link'])['Link']
+    return set(links.dropna().map(normalize_link))
+
+def select_new(df: pd.DataFrame, done: Iterable[str]) -> pd.DataFrame:
+    """แถวที่ Link (normalized) ยังไม่อยู่ใน done; Link ซ้ำในชุดใหม่เก็บแถวล่าสุด"""
+    norm = df['Link'].map(normalize_link)
+    mask = ~norm.isin(done) & ~norm.duplicated(keep='last')
+    return df[mask]
+
+def upsert(store: CheckpointStore, name: str, df_new: pd.DataFrame) -> str:
+    """
+    Replaces rows of `name` whose Link is in df_new and appends the rest.
+    Only df_new is processed; with Parquet only the Link column of the archive is read and only
+    the part files holding a replaced Link are rewritten (CheckpointStore.replace_rows).
+    """
+    if not store.exists(name):
+        return store.write(name, df_new)
+    if df_new.empty:
+        return store.find(name)
+    new_links = set(df_new['Link'].map(normalize_link))
+    return store.replace_rows(name, df_new, lambda d: d['Link'].map(normalize_link).isin(new_links), ['Link'])
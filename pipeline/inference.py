@@ -0,0 +1,337 @@
+import gc
+import time
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+import torch
+from transformers import AutoTokenizer
+
+from pipeline.backend import InferenceBackend, get_backend
+from pipeline.batching import DEFAULT_BATCH_TOKENS, estimate_lengths, padding_stats, plan_batches
+from pipeline.logit_scoring import label_responses
+from pipeline.overlap import QUEUE_DEPTH, run_pipelined
+from pipeline.prefix_cache import PrefixCache, shared_layout
+from pipeline.structured import generate_json
+from pipeline.tasks import TASK_SEPARATOR, InferenceTask, build_article, task_prompt
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+MAX_PROMPT_TOKENS = 2048
+CHAT_MARKER = "<<MARKETMIND_USER_CONTENT>>"
+
+# ==========================================
+# 2. MODEL LOADING
+# ==========================================
+def load_model(model_name: str, device: Optional[str] = None, dtype=None,
+               backend: Union[None, str, InferenceBackend] = None):
+    """
+    Loads (model, tokenizer) once with left padding, as every batched stage needs.
+    backend: InferenceBackend / 'cuda' / 'cpu' / 'cpu-int8' / None = MARKETMIND_BACKEND (see pipeline.backend);
+    device / dtype override the backend's.
+    """
+    tokenizer = load_tokenizer(model_name)
+    model = get_backend(backend, device, dtype).load_weights(model_name)
+    return model, tokenizer
+
+def load_tokenizer(model_name: str):
+    """tokenizer แบบ left padding (ใช้เองได้เมื่อโมเดลอยู่ใน inference worker)"""
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True, trust_remote_code=True)
+    except Exception:
+        print("⚠️ Falling back to slow tokenizer...")
+        tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
+    tokenizer.padding_side = 'left'
+    if tokenizer.pad_token is None: tokenizer.pad_token = tokenizer.eos_token
+    return tokenizer
+
+def release_memory():
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+def chat_parts(tokenizer):
+    """
+    Splits the chat template around the user content: (head, tail).
+    head + user_content + tail == apply_chat_template(..., add_generation_prompt=True)
+    """
+    try:
+        rendered = tokenizer.apply_chat_template(
+            [{"role": "user", "content": CHAT_MARKER}], tokenize=False, add_generation_prompt=True
+        )
+        head, tail = rendered.split(CHAT_MARKER)
+        return head, tail
+    except Exception:
+        return "User: ", "\nAssistant:"
+
+def left_pad(sequences: List[List[int]], pad_id: int, device):
+    """list ของ token ids -> (input_ids, attention_mask) แบบ left padding"""
+    width = max(len(s) for s in sequences)
+    input_ids = torch.full((len(sequences), width), pad_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(sequences), width), dtype=torch.long)
+    for row, seq in enumerate(sequences):
+        if seq:
+            input_ids[row, width - len(seq):] = torch.tensor(seq, dtype=torch.long)
+            attention_mask[row, width - len(seq):] = 1
+    return input_ids.to(device), attention_mask.to(device)
+
+def count_new_tokens(generated, eos_ids, pad_id: int) -> int:
+    """จำนวน token ที่ generate จริง (ไม่นับ padding หลัง eos); generated = tensor หรือ list ของ token ids"""
+    eos_ids = set(eos_ids if isinstance(eos_ids, (list, tuple, set)) else [eos_ids])
+    total = 0
+    for row in (generated.tolist() if isinstance(generated, torch.Tensor) else generated):
+        for token in row:
+            total += 1
+            if token in eos_ids or token == pad_id:
+                break
+    return total
+
+def decode_batch(tokenizer, generated: List[List[int]]) -> List[str]:
+    """token ids ใหม่ของแต่ละแถว -> ข้อความ (ไม่รวม special tokens / padding)"""
+    return tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+def generate_batch(model, tokenizer, sequences: List[List[int]], max_new_tokens: int,
+                   prefix_cache: Optional[PrefixCache] = None, prefix_len: Optional[int] = None,
+                   decode: bool = True, **generate_kwargs):
+    """
+    Left-pads token id lists, generates and decodes only the new tokens.
+    Returns (decoded texts, number of generated tokens). Greedy unless generate_kwargs say otherwise.
+    decode=False returns the new token ids per row instead, so the caller can run decode_batch
+    off the model's thread (post stage of pipeline.overlap).
+
+    With a PrefixCache the shared prefix (prefix_len tokens) comes from its KV cache and only
+    each row's suffix is prefilled (see pipeline.prefix_cache).
+    """
+    input_ids, attention_mask, past, _ = shared_layout(
+        sequences, tokenizer.pad_token_id, model.device, prefix_cache, prefix_len)
+    if past is not None:
+        generate_kwargs['past_key_values'] = past
+    generate_kwargs.setdefault('do_sample', False)
+    with torch.no_grad():
+        outputs = model.generate(
+            input_ids=input_ids, attention_mask=attention_mask,
+            max_new_tokens=max_new_tokens, pad_token_id=tokenizer.pad_token_id, **generate_kwargs,
+        )
+    generated = outputs[:, input_ids.shape[1]:].tolist()
+    new_tokens = count_new_tokens(generated, tokenizer.eos_token_id, tokenizer.pad_token_id)
+    return (decode_batch(tokenizer, generated) if decode else generated), new_tokens
+
+# ==========================================
+# 3. SINGLE-LOAD MULTI-TASK RUNNER
+# ==========================================
+class ModelTaskRunner:
+    """
+    Loads one model once and runs every registered task (sector / sentiment / summary ...)
+    over the pending rows, then releases the weights.
+
+    แต่ละข่าวถูก tokenize ครั้งเดียว ส่วนของแต่ละ task (chat head + instruction, chat tail) tokenize
+    ครั้งเดียวต่อ task แล้วนำมาต่อกันเป็น input_ids: head + instruction + ข่าว + tail
+    chat head + instruction เหมือนกันทุกแถวของ task -> prefill ครั้งเดียวต่อโมเดลใน PrefixCache
+    แล้ว fork KV ให้แต่ละ batch (prefix_cache=False = prefill ทั้ง prompt ทุกแถว)
+
+    Batches are planned by estimated token length under max_batch_tokens (see pipeline.batching);
+    batch_size only caps the number of rows per batch. An optional InferenceCache skips
+    prompts that were already generated by this model.
+    backend (pipeline.backend): cuda / cpu / cpu-int8, default MARKETMIND_BACKEND; device overrides its device.
+    models (pipeline.model_pool.ModelPool / pipeline.worker.WorkerClient): ใช้โมเดลที่อุ่นอยู่ใน pool / worker
+    แทนการโหลดและ release เอง (batch ถูกส่งไปเป็น token ids)
+
+    ต่อ batch: ประกอบ input_ids (prep) และ decode / parse / cache.store / on_batch (post) ทำใน worker thread
+    ขณะที่โมเดล generate batch ถัดไป (pipeline.overlap, overlap_depth=0 = ทำทีละขั้นใน thread เดียว)
+    batch ถูกวางแผนจากความยาวโดยประมาณ (estimate_lengths) -> tokenize ข่าวของ batch เกิดใน prep thread
+    (ข่าวที่ task ก่อนหน้า tokenize แล้วใช้ซ้ำ) ไม่ใช่ก่อนเริ่ม generate
+    """
+
+    def __init__(self, model_name: str, tasks: List[InferenceTask], device: Optional[str] = None,
+                 batch_size: int = 64, max_batch_tokens: int = DEFAULT_BATCH_TOKENS,
+                 max_prompt_tokens: int = MAX_PROMPT_TOKENS, model=None, tokenizer=None, cache=None,
+                 prefix_cache: bool = True, overlap_depth: int = QUEUE_DEPTH,
+                 backend: Union[None, str, InferenceBackend] = None, models=None):
+        self.model_name = model_name
+        self.tasks = tasks
+        self.models = models        # optional ModelPool / WorkerClient ที่ถือโมเดลไว้แทนการโหลดเอง
+        self.backend = models.backend if models is not None else get_backend(backend, device)
+        self.device = self.backend.device
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_prompt_tokens = max_prompt_tokens
+        self.model = model
+        self.tokenizer = tokenizer
+        self.cache = cache          # optional pipeline.inference_cache.InferenceCache
+        self.use_prefix_cache = prefix_cache
+        self.overlap_depth = overlap_depth
+        self.prefix_cache = None    # PrefixCache ของโมเดลที่โหลดอยู่ (สร้างเมื่อมีโมเดล)
+        self.stats = {}
+
+    # --- lifecycle ---
+    def load(self):
+        if self.models is not None:
+            if self.tokenizer is None:
+                self.tokenizer = self.models.tokenizer(self.model_name)
+                start = time.perf_counter()
+                self.stats['warm'] = not self.models.warm(self.model_name)['loaded']
+                self.stats['load_seconds'] = time.perf_counter() - start
+            return self
+        if self.model is None:
+            print(f"🤖 Loading Model: {self.model_name}...")
+            start = time.perf_counter()
+            self.model, self.tokenizer = load_model(self.model_name, backend=self.backend)
+            self.stats['load_seconds'] = time.perf_counter() - start
+        if self.use_prefix_cache and self.prefix_cache is None:
+            self.prefix_cache = PrefixCache(self.model)
+        return self
+
+    def release(self):
+        if self.models is not None:   # โมเดลอยู่ใน pool / worker ต่อ (LRU ของ pool ตัดสินใจเอง)
+            self.tokenizer = None
+            return
+        if self.model is not None:
+            print(f"🧹 Unloading {self.model_name}")
+        self.model = None
+        self.tokenizer = None
+        self.prefix_cache = None
+        release_memory()
+
+    # --- tokenization ---
+    def _encode(self, text: str) -> List[int]:
+        return self.tokenizer(text, add_special_tokens=False)['input_ids']
+
+
+    def _task_parts(self, task: InferenceTask):
+        """(chat head + instruction + separator, chat tail) ของ task เป็น token ids"""
+        head, tail = chat_parts(self.tokenizer)
+        return self._encode(head + task.instruction + TASK_SEPARATOR), self._encode(tail)
+
+    # --- generation ---
+    def _generate(self, sequences: List[List[int]], task: InferenceTask, prefix_len: int = 0):
+        """
+        task ที่มี json_format: หยุดแต่ละแถวที่ JSON ครบ (และ constrain ตาม schema) แทนการรันจน max_new_tokens
+        task ที่มี score_labels: prefill ครั้งเดียว ไม่ generate
+        นอกนั้น: คืน token ids (decode_batch ทำใน post ไม่ใช่ใน thread ของโมเดล)
+        prefix_len token แรก (chat head + instruction) มาจาก KV ใน PrefixCache
+        """
+        if task.score_labels is not None:
+            return self._call(label_responses, sequences, task.score_labels, prefix_len=prefix_len)
+        if task.json_format is not None:
+            return self._call(generate_json, sequences, task.max_new_tokens,
+                              task.json_format if task.constrain else None, prefix_len=prefix_len)
+        return self._call(generate_batch, sequences, task.max_new_tokens, prefix_len=prefix_len, decode=False)
+
+    def _call(self, fn, sequences, *args, prefix_len: int = 0, **kwargs):
+        """fn(model, tokenizer, sequences, *args) บนโมเดลของ runner หรือผ่าน models (pool / worker)"""
+        if self.models is not None:
+            return self.models.call(self.model_name, fn.__name__, sequences, *args, prefix_len=prefix_len, **kwargs)
+        return fn(self.model, self.tokenizer, sequences, *args, prefix_cache=self.prefix_cache,
+                  prefix_len=prefix_len, **kwargs)
+
+    def run(self, df: pd.DataFrame, on_batch=None) -> Dict[str, pd.Series]:
+        """
+        Runs every task over df (needs Title / Content).
+        on_batch(task_name, indices, values): callback หลังจบแต่ละ batch (ใช้ append ลง journal)
+        Returns {task_name: Series of parsed values indexed like df}.
+
+        With a cache, rows whose (model, task version, params, prompt) were generated before are
+        answered from it; the model is only loaded if some row is a miss.
+        """
+        # 0. Cache lookup (ไม่ต้องโหลดโมเดล)
+        cache_key = self.backend.cache_model_key(self.model_name)
+        plans = {}
+        for task in self.tasks:
+            mask = task.select(df) if task.select is not None else pd.Series(True, index=df.index)
+            indices = list(df.index[mask])
+            keys, responses = [None] * len(indices), [None] * len(indices)
+            if self.cache is not None and indices:
+                prompts = [task_prompt(df.at[idx, 'Title'], df.at[idx, 'Content'], task) for idx in indices]
+                keys, responses = self.cache.lookup(cache_key, task.version, task.params(), prompts)
+            plans[task.name] = (indices, keys, responses)
+
+        # 1. ข้อความข่าวของแถวที่ยังต้อง generate; tokenize ครั้งเดียวต่อข่าวใน prep thread (ใช้ซ้ำข้าม task)
+        needed = list(dict.fromkeys(
+            idx for indices, _, responses in plans.values()
+            for idx, response in zip(indices, responses) if response is None
+        ))
+        article_texts = {idx: build_article(df.at[idx, 'Title'], df.at[idx, 'Content']) for idx in needed}
+        articles = {}
+        self.stats['article_seconds'] = 0.0
+        if needed:
+            self.load()
+
+        results = {}
+        for task in self.tasks:
+            indices, keys, responses = plans[task.name]
+            values, new_tokens = [None] * len(indices), 0
+
+            hits = [p for p, r in enumerate(responses) if r is not None]
+            for p in hits:
+                values[p] = task.parse(responses[p])
+            if hits and on_batch is not None:
+                on_batch(task.name, [indices[p] for p in hits], [values[p] for p in hits])
+
+            misses = [p for p, r in enumerate(responses) if r is None]
+            lengths, batches, prefix_len = [], [], 0
+            timing = {'prep_s': 0.0, 'generate_s': 0.0, 'post_s': 0.0, 'wall_s': 0.0, 'overlap_s': 0.0}
+            if misses:
+                head, tail = self._task_parts(task)
+                budget = self.max_prompt_tokens - len(head) - len(tail)
+                # วางแผน batch จากความยาวโดยประมาณ (ไม่ต้อง tokenize ก่อน); ความยาวจริงเก็บตอน prep
+                estimates = estimate_lengths([article_texts[indices[p]] for p in misses], max_length=budget)
+                batches = plan_batches([len(head) + n + len(tail) for n in estimates],
+                                       self.max_batch_tokens, self.batch_size, task.max_new_tokens)
+                lengths = [0] * len(misses)
+                prefix_len = len(head) if self.use_prefix_cache else 0
+
+                def prepare(batch):
+                    sequences = []
+                    for b in batch:
+                        idx = indices[misses[b]]
+                        if idx not in articles:
+                            start = time.perf_counter()
+                            articles[idx] = self._encode(article_texts[idx])
+                            self.stats['article_seconds'] += time.perf_counter() - start
+                        sequences.append(head + articles[idx][:budget] + tail)
+                        lengths[b] = len(sequences[-1])
+                    return sequences
+
+                def generate(sequences):
+                    return self._generate(sequences, task, prefix_len)
+
+                def post(batch, sequences, generated):
+                    decoded, n_new = generated
+                    if task.score_labels is None and task.json_format is None:
+                        decoded = decode_batch(self.tokenizer, decoded)
+                    positions = [misses[b] for b in batch]
+                    parsed = [task.parse(text) for text in decoded]
+                    for p, value in zip(positions, parsed):
+                        values[p] = value
+                    if self.cache is not None:
+                        self.cache.store(cache_key, task.version, [keys[p] for p in positions], decoded)
+                    if on_batch is not None:
+                        on_batch(task.name, [indices[p] for p in positions], parsed)
+                    return n_new
+
+                timing = run_pipelined(batches, prepare, generate, post, self.overlap_depth)
+                new_tokens = sum(timing['results'])
+            seconds = timing['wall_s']
+
+            results[task.name] = pd.Series(values, index=indices, dtype=object)
+            self.stats[task.name] = {
+                'rows': len(indices),
+                'cache_hits': len(hits),
+                'seconds': seconds,
+                'prompt_tokens': sum(lengths),
+                'prefix_tokens': prefix_len,
+                'new_tokens': new_tokens,
+                'tokens_per_sec': new_tokens / seconds if seconds > 0 else 0.0,
+                'batches': len(batches),
+                'padding_ratio': padding_stats(lengths, batches)['padding_ratio'] if batches else 0.0,
+                'prep_seconds': timing['prep_s'],
+                'generate_seconds': timing['generate_s'],
+                'post_seconds': timing['post_s'],
+                'overlap_seconds': timing['overlap_s'],
+            }
+        return results
+
+    def report(self) -> pd.DataFrame:
+        """ตารางเวลา / tokens ต่อวินาที ของแต่ละ task"""
+        rows = [{'Task': name, **stat} for name, stat in self.stats.items() if isinstance(stat, dict)]
+        return pd.DataFrame(rows)
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from pipeline.checkpoint import CHECKPOINT_DIR
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+CACHE_PATH = os.path.join(CHECKPOINT_DIR, 'inference_cache.sqlite')
+MAX_ENTRIES = 200_000        # LRU: เก็บคำตอบล่าสุดไม่เกินกี่รายการ
+MAX_BYTES = 512 * 1024**2    # LRU: ขนาดรวมของคำตอบ (bytes) ไม่เกินเท่านี้
+
+# ==========================================
+# 2. KEYS
+# ==========================================
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def cache_key(model: str, template_version: str, params: Dict, prompt: str) -> str:
+    """
+    (model name, prompt template version, generation params, hash of the rendered prompt) -> key.
+    prompt = ข้อความ user ก่อนใส่ chat template (template ขึ้นกับโมเดลซึ่งอยู่ใน key แล้ว)
+    """
+    payload = json.dumps(
+        [model, template_version, params, prompt_hash(prompt)], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# ==========================================
+# 3. PERSISTENT LRU CACHE
+# ==========================================
+class InferenceCache:
+    """
+    Persistent raw-response cache shared by every LLM stage (SQLite, one file).
+
+    - เก็บคำตอบดิบก่อน parse -> แก้ parser ได้โดยไม่ต้อง generate ใหม่
+    - LRU: ทุก hit อัปเดต last_used; เมื่อเกิน max_entries / max_bytes จะลบรายการที่ใช้ล่าสุดนานที่สุด
+    - hits / misses นับต่อ instance (stats()) และสะสมลงไฟล์ (lifetime_stats())
+    - เปลี่ยน prompt template -> เปลี่ยน template_version เพื่อไม่ให้ใช้คำตอบเก่า
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES,
+                 max_bytes: Optional[int] = MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # store() ถูกเรียกจาก post thread ของ pipeline.overlap -> ใช้ connection ข้าม thread ได้ (ทีละ thread)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY, model TEXT, template TEXT, response TEXT,'
+            ' size INTEGER, last_used REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_last_used ON entries(last_used)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)')
+        self._conn.commit()
+        # จำนวน / ขนาดรวมแบบ running total (อัปเดตใน put_many / evict) -> ไม่ต้อง scan ทั้งตารางทุก batch
+        self._entries, self._bytes = self._totals()
+
+    # --- read ---
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """{key: response} ของ key ที่มีใน cache (นับ hit/miss และ touch LRU)"""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), 500):   # SQLite จำกัดจำนวน parameter ต่อ query
+            chunk = unique[i : i + 500]
+            rows = self._conn.execute(
+                f"SELECT key, response FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update(rows)
+
+        hits = sum(1 for k in keys if k in found)
+        self._count(hits, len(keys) - hits)
+        if found:
+            now = time.time()
+            self._conn.executemany('UPDATE entries SET last_used = ? WHERE key = ?', [(now, k) for k in found])
+        self._conn.commit()
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        return self.get_many([key]).get(key)
+
+    # --- write ---
+    def put_many(self, items: List[tuple]):
+        """items: [(key, model, template_version, response), ...]"""
+        if not items:
+            return
+        now = time.time()
+        rows = {k: (k, m, t, r, len(r.encode('utf-8')), now) for k, m, t, r in items}
+        old = self._sizes(list(rows))   # key ที่มีอยู่แล้วถูกแทน -> นับเฉพาะส่วนต่างของขนาด
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO entries (key, model, template, response, size, last_used) VALUES (?, ?, ?, ?, ?, ?)',
+            list(rows.values()),
+        )
+        self._conn.commit()
+        self._entries += len(rows) - len(old)
+        self._bytes += sum(row[4] for row in rows.values()) - sum(old.values())
+        self.evict()
+
+    def put(self, key: str, model: str, template_version: str, response: str):
+        self.put_many([(key, model, template_version, response)])
+
+    # --- stage helpers ---
+    def lookup(self, model: str, template_version: str, params: Dict, prompts: List[str]):
+        """-> (keys, responses) โดย responses[i] เป็น None ถ้า prompt นั้นยังไม่เคย generate"""
+        keys = [cache_key(model, template_version, params, p) for p in prompts]
+        found = self.get_many(keys)
+        return keys, [found.get(k) for k in keys]
+
+    def store(self, model: str, template_version: str, keys: List[str], responses: List[str]):
+        """บันทึกคำตอบของ batch ที่เพิ่ง generate (เรียกทุก batch เหมือน journal.append)"""
+        self.put_many([(k, model, template_version, r) for k, r in zip(keys, responses) if r is not None])
+
+    def _over_budget(self):
+        over_entries = max(0, self._entries - self.max_entries)
+        over_bytes = max(0, self._bytes - self.max_bytes) if self.max_bytes is not None else 0
+        return over_entries, over_bytes
+
+    def evict(self):
+        """
+        ลบรายการที่ใช้ล่าสุดนานที่สุดจนกว่าจะอยู่ใน max_entries / max_bytes
+        เช็คจาก running total; query COUNT / SUM จริงเฉพาะเมื่อเกิน budget (ไฟล์อาจถูก process อื่นเขียนด้วย)
+        """
+        if not any(self._over_budget()):
+            return 0
+        self._entries, self._bytes = self._totals()
+        over_entries, over_bytes = self._over_budget()
+        if not over_entries and not over_bytes:
+            return 0
+
+        removed, freed, victims = 0, 0, []
+        for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY last_used'):
+            if removed >= over_entries and freed >= over_bytes:
+                break
+            victims.append((key,))
+            removed += 1
+            freed += size
+        self._conn.executemany('DELETE FROM entries WHERE key = ?', victims)
+        self._conn.commit()
+        self.evictions += removed
+        self._entries -= removed
+        self._bytes -= freed
+        return removed
+
+    def _sizes(self, keys: List[str]) -> Dict[str, int]:
+        sizes = {}
+        for i in range(0, len(keys), 500):   # SQLite จำกัดจำนวน parameter ต่อ query
+            chunk = keys[i : i + 500]
+            sizes.update(self._conn.execute(
+                f"SELECT key, size FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return sizes
+
+    def _totals(self):
+        return self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+
+    # --- counters ---
+    def _count(self, hits, misses):
+        self.hits += hits
+        self.misses += misses
+        self._conn.executemany(
+            'INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            [('hits', hits), ('misses', misses)],
+        )
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        count, total = self._totals()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': count,
+            'bytes': total,
+        }
+
+    def lifetime_stats(self) -> Dict:
+        return dict(self._conn.execute('SELECT name, value FROM counters').fetchall())
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,152 @@
+import glob
+import json
+import math
+import os
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from pipeline.checkpoint import CHECKPOINT_DIR
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+JOURNAL_DIR = os.path.join(CHECKPOINT_DIR, 'journal')
+
+SEGMENT_ROWS = 2000     # จำนวนแถวต่อ 1 segment ก่อนเปิดไฟล์ใหม่
+COMPACT_EVERY = 8       # รวม segment ทั้งหมดเป็นไฟล์เดียวเมื่อมีครบกี่ segment
+
+COMPACTED_FILE = 'compacted.jsonl'
+SEGMENT_PATTERN = re.compile(r'seg-(\d+)\.jsonl$')
+
+# ==========================================
+# 2. HELPERS
+# ==========================================
+def normalize_link(url):
+    """
+    Normalizes a URL by removing query parameters and fragments.
+    """
+    parts = urlsplit(str(url))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+def _clean_value(value):
+    """NaN/numpy -> ค่าที่ json เขียนได้"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def _fsync_write(path, lines, mode):
+    with open(path, mode, encoding='utf-8') as f:
+        f.writelines(lines)
+        f.flush()
+        os.fsync(f.fileno())
+
+# ==========================================
+# 3. RESULT JOURNAL
+# ==========================================
+class ResultJournal:
+    """
+    Append-only, crash-safe journal of per-article LLM results keyed by (normalized Link, model).
+
+    - append() เขียนเฉพาะแถวใหม่ของ batch ลง segment ปัจจุบัน (jsonl + fsync) -> I/O ต่อ batch คงที่
+    - segment เต็ม (SEGMENT_ROWS) จะเปิดไฟล์ใหม่; ครบ COMPACT_EVERY segments จะ compact()
+    - compact() เขียน state ล่าสุดลง compacted.jsonl ผ่าน .tmp + os.replace แล้วลบ segment เก่า
+    - load() อ่าน compacted + segments ตามลำดับครั้งเดียว (แถวหลังทับแถวก่อน)
+      บรรทัดสุดท้ายที่เขียนไม่ครบตอน crash จะถูกข้ามไป
+    """
+
+    def __init__(self, name: str, base_dir: str = JOURNAL_DIR,
+                 segment_rows: int = SEGMENT_ROWS, compact_every: int = COMPACT_EVERY):
+        self.name = name
+        self.dir = os.path.join(base_dir, name)
+        self.segment_rows = segment_rows
+        self.compact_every = compact_every
+        os.makedirs(self.dir, exist_ok=True)
+
+        self._state = None
+        self._segment_path = None
+        self._segment_count = 0
+
+    # --- files ---
+    def _segments(self):
+        found = []
+        for path in glob.glob(os.path.join(self.dir, 'seg-*.jsonl')):
+            match = SEGMENT_PATTERN.search(path)
+            if match:
+                found.append((int(match.group(1)), path))
+        return [path for _, path in sorted(found)]
+
+    def _new_segment(self):
+        segments = self._segments()
+        last_id = int(SEGMENT_PATTERN.search(segments[-1]).group(1)) if segments else 0
+        self._segment_path = os.path.join(self.dir, f'seg-{last_id + 1:06d}.jsonl')
+        self._segment_count = 0
+
+    # --- read ---
+    @staticmethod
+    def _replay(path, state):
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial line from an interrupted write
+                state[(record['Link'], record['Model'])] = record
+
+    def load(self) -> dict:
+        """{(link, model): record} ของผลลัพธ์ล่าสุดทั้งหมด (อ่านไฟล์ครั้งเดียวแล้ว cache ไว้)"""
+        if self._state is None:
+            state = {}
+            self._replay(os.path.join(self.dir, COMPACTED_FILE), state)
+            for path in self._segments():
+                self._replay(path, state)
+            self._state = state
+        return self._state
+
+    def get_map(self, model: str, field: str) -> dict:
+        """{link: value} ของโมเดลหนึ่ง (ใช้ resume / map กลับเข้า DataFrame)"""
+        return {link: rec.get(field) for (link, m), rec in self.load().items() if m == model}
+
+    def __len__(self):
+        return len(self.load())
+
+    # --- write ---
+    def append(self, rows: list):
+        """rows: list of dict ที่มี 'Link', 'Model' และ field ผลลัพธ์ (เช่น 'Score')"""
+        if not rows:
+            return
+        state = self.load()
+        if self._segment_path is None or self._segment_count >= self.segment_rows:
+            self._new_segment()
+
+        lines = []
+        for row in rows:
+            record = {k: _clean_value(v) for k, v in row.items()}
+            record['Link'] = normalize_link(record['Link'])
+            state[(record['Link'], record['Model'])] = record
+            lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+
+        _fsync_write(self._segment_path, lines, 'a')
+        self._segment_count += len(lines)
+
+        if len(self._segments()) >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """รวม segments ทั้งหมดเป็น compacted.jsonl (atomic rename) แล้วลบ segment ที่รวมแล้ว"""
+        state = self.load()
+        segments = self._segments()
+        if not segments:
+            return
+
+        target = os.path.join(self.dir, COMPACTED_FILE)
+        tmp_path = target + '.tmp'
+        _fsync_write(tmp_path, [json.dumps(r, ensure_ascii=False) + '\n' for r in state.values()], 'w')
+        os.replace(tmp_path, target)
+
+        for path in segments:
+            os.remove(path)
+        self._segment_path = None
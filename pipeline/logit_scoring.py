@@ -0,0 +1,71 @@
+import json
+from typing import List, Optional
+
+import numpy as np
+import torch
+
+from pipeline.prefix_cache import PrefixCache, prefill
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+# ค่าของแต่ละ label -> score = ค่าคาดหมายตามความน่าจะเป็นของ label (อยู่ใน [-1, 1] เสมอ)
+SENTIMENT_LABELS = {'Positive': 1.0, 'Negative': -1.0, 'Neutral': 0.0}
+# ต้นคำตอบตาม format ใน prompt ({"category": "...", "score": ...}): token ถัดไปคือ label
+ANSWER_PREFIX = '{"category": "'
+LOGIT_PARAMS = {'mode': 'label-logits', 'labels': SENTIMENT_LABELS}   # แทน generation params ใน cache key
+
+# ==========================================
+# 2. LABEL TOKENS
+# ==========================================
+def label_token_ids(tokenizer, labels) -> List[int]:
+    """
+    token แรกของแต่ละ label (ต่อจาก ANSWER_PREFIX) — ต้องไม่ซ้ำกัน เพราะเมื่อเลือกได้แค่ label ที่กำหนด
+    token แรกก็ระบุ label ได้แล้ว (token ที่เหลือถูกบังคับ) -> P(label) = P(token แรก) ที่ normalize เฉพาะ label
+    """
+    prefix = tokenizer(ANSWER_PREFIX, add_special_tokens=False)['input_ids']
+    ids = []
+    for label in labels:
+        full = tokenizer(ANSWER_PREFIX + label, add_special_tokens=False)['input_ids']
+        ids.append(full[len(prefix)] if full[:len(prefix)] == prefix else
+                   tokenizer(label, add_special_tokens=False)['input_ids'][0])
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Labels {list(labels)} share a first token for this tokenizer; "
+                         "use labels that start with different tokens")
+    return ids
+
+# ==========================================
+# 3. SINGLE-PREFILL SCORING
+# ==========================================
+def label_probabilities(model, tokenizer, sequences: List[List[int]], labels=SENTIMENT_LABELS,
+                        prefix_cache: Optional[PrefixCache] = None, prefix_len: Optional[int] = None) -> np.ndarray:
+    """
+    One forward pass per batch (no generate): logits ของ token ถัดไปหลัง prompt + ANSWER_PREFIX
+    -> softmax เฉพาะ token ของ label -> (rows, labels) probabilities
+    prefix_cache / prefix_len: prefill เฉพาะ suffix ต่อจาก KV ของ prefix ร่วม (pipeline.prefix_cache)
+    """
+    if not sequences:
+        return np.empty((0, len(labels)))
+    prefix = tokenizer(ANSWER_PREFIX, add_special_tokens=False)['input_ids']
+    out, _ = prefill(model, [list(s) + prefix for s in sequences], tokenizer.pad_token_id,
+                     prefix_cache, prefix_len, use_cache=False)
+    label_logits = out.logits[:, -1, label_token_ids(tokenizer, labels)].float()
+    return torch.softmax(label_logits, dim=-1).cpu().numpy()
+
+def expected_scores(probs: np.ndarray, labels=SENTIMENT_LABELS) -> np.ndarray:
+    return probs @ np.asarray(list(labels.values()), dtype=float)
+
+def label_responses(model, tokenizer, sequences: List[List[int]], labels=SENTIMENT_LABELS,
+                    prefix_cache: Optional[PrefixCache] = None, prefix_len: Optional[int] = None):
+    """
+    Drop-in แทน generate_batch สำหรับ sentiment: คืนคำตอบ JSON แบบเดียวกับที่โมเดล generate
+    ({"category", "score"} + "probs") -> parse_sentiment_json / cache / journal ใช้ได้เหมือนเดิม
+    Returns (texts, 0 generated tokens)
+    """
+    probs = label_probabilities(model, tokenizer, sequences, labels, prefix_cache, prefix_len)
+    names = list(labels)
+    scores = expected_scores(probs, labels)
+    texts = [json.dumps({'category': names[int(np.argmax(p))], 'score': round(float(s), 4),
+                         'probs': {n: round(float(v), 4) for n, v in zip(names, p)}})
+             for p, s in zip(probs, scores)]
+    return texts, 0
@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+import torch
+
+from pipeline.backend import InferenceBackend, get_backend
+from pipeline.inference import generate_batch, load_model, load_tokenizer, release_memory
+from pipeline.logit_scoring import label_responses
+from pipeline.prefix_cache import PrefixCache
+from pipeline.structured import generate_json
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+BUDGET_ENV = "MARKETMIND_POOL_GB"   # หน่วยความจำรวมของโมเดลที่โหลดค้างไว้ (GB)
+GPU_BUDGET_SHARE = 0.8              # ไม่ตั้ง budget: 80% ของ VRAM (เหลือที่ให้ KV cache / activations)
+CPU_BUDGET_SHARE = 0.5              # บน CPU: 50% ของ RAM
+
+# ฟังก์ชันที่ stage เรียกผ่าน pool / worker ได้ -> fn(model, tokenizer, sequences, *args, prefix_cache, prefix_len)
+POOL_FUNCTIONS = {fn.__name__: fn for fn in (generate_batch, generate_json, label_responses)}
+
+# ==========================================
+# 2. MEMORY ACCOUNTING
+# ==========================================
+def model_bytes(model) -> int:
+    """ขนาดของ weights ใน state_dict (รวม int8 packed weights ของ dynamic quantization)"""
+    total = 0
+    for value in model.state_dict().values():
+        tensors = value if isinstance(value, tuple) else (value,)
+        total += sum(t.nbytes for t in tensors if isinstance(t, torch.Tensor))
+    return total
+
+def default_budget(backend: InferenceBackend) -> int:
+    if os.environ.get(BUDGET_ENV):
+        return int(float(os.environ[BUDGET_ENV]) * 1024**3)
+    if backend.is_cuda and torch.cuda.is_available():
+        return int(torch.cuda.get_device_properties(torch.device(backend.device)).total_memory * GPU_BUDGET_SHARE)
+    return int(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') * CPU_BUDGET_SHARE)
+
+# ==========================================
+# 3. WARM MODEL POOL (LRU under a memory budget)
+# ==========================================
+class ModelPool:
+    """
+    โมเดลที่โหลดค้างไว้ข้าม stage / ข้ามรอบของ pipeline: โหลดครั้งแรกที่มีคนขอ แล้วเก็บไว้จนกว่าหน่วยความจำรวม
+    จะเกิน budget_bytes -> ไล่โมเดลที่ใช้ล่าสุดนานที่สุดออกก่อน (LRU)
+
+        pool = ModelPool()
+        texts, n_new = pool.call("Qwen/Qwen2.5-14B-Instruct", 'generate_json', sequences, 80, fmt, prefix_len=42)
+        pool.stats()   # resident models, loads / hits / evictions, load seconds
+
+    call() ใช้ฟังก์ชันใน POOL_FUNCTIONS กับ (model, tokenizer) ใน pool และ PrefixCache ของโมเดลนั้น;
+    interface เดียวกับ pipeline.worker.WorkerClient -> stage ส่ง models=pool หรือ models=worker client ได้เหมือนกัน
+    ขนาดของโมเดลรู้หลังโหลดครั้งแรก: โมเดลที่เคยโหลดแล้วถูกเว้นที่ให้ก่อนโหลด ครั้งแรกไล่ตัวอื่นออกหลังโหลด
+    call() / acquire() ใช้จาก thread เดียว (thread ของโมเดล); stats() อ่านจาก thread อื่นได้ระหว่าง generate
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, backend: Union[None, str, InferenceBackend] = None):
+        self.backend = get_backend(backend)
+        self.budget_bytes = budget_bytes if budget_bytes is not None else default_budget(self.backend)
+        self._entries = OrderedDict()   # model_name -> {'model', 'tokenizer', 'prefix_cache', 'bytes', ...}
+        self._sizes = {}                # model_name -> bytes ที่วัดได้ตอนโหลดครั้งก่อน
+        self._tokenizers = {}
+        self._lock = threading.RLock()
+        self.counters = {'loads': 0, 'hits': 0, 'evictions': 0, 'load_seconds': 0.0}
+
+    # --- residency ---
+    def used_bytes(self) -> int:
+        return sum(entry['bytes'] for entry in self._entries.values())
+
+    def _evict_until(self, free_bytes: int, keep: Optional[str] = None):
+        while self._entries and self.used_bytes() + free_bytes > self.budget_bytes:
+            name = next((n for n in self._entries if n != keep), None)
+            if name is None:
+                break
+            self.release(name)
+            self.counters['evictions'] += 1
+
+    def acquire(self, model_name: str) -> Dict:
+        """entry ของโมเดล (โหลดถ้ายังไม่อยู่ใน pool) และย้ายไปท้าย LRU"""
+        with self._lock:
+            entry = self._entries.get(model_name)
+            if entry is not None:
+                self._entries.move_to_end(model_name)
+                self.counters['hits'] += 1
+                return self._touch(entry)
+            self._evict_until(self._sizes.get(model_name, 0))
+
+        # โหลดนอก lock: stats() จาก thread อื่นยังตอบได้ระหว่างโหลด
+        print(f"🤖 [pool] Loading {model_name} ({self.backend.name})...")
+        start = time.perf_counter()
+        model, tokenizer = load_model(model_name, backend=self.backend)
+        seconds = time.perf_counter() - start
+        entry = {'model': model, 'tokenizer': tokenizer, 'prefix_cache': PrefixCache(model),
+                 'bytes': model_bytes(model), 'load_seconds': seconds, 'calls': 0}
+        with self._lock:
+            self._entries[model_name] = entry
+            self._sizes[model_name] = entry['bytes']
+            self._tokenizers[model_name] = tokenizer
+            self.counters['loads'] += 1
+            self.counters['load_seconds'] += seconds
+            self._evict_until(0, keep=model_name)
+        if entry['bytes'] > self.budget_bytes:
+            print(f"⚠️ [pool] {model_name} ({entry['bytes'] / 2**30:.1f} GB) is larger than the pool budget")
+        return self._touch(entry)
+
+    @staticmethod
+    def _touch(entry: Dict) -> Dict:
+        entry['calls'] += 1
+        entry['last_used'] = time.time()
+        return entry
+
+    def release(self, model_name: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(model_name, None)
+            if entry is None:
+                return False
+            print(f"🧹 [pool] Unloading {model_name}")
+            entry.clear()
+            release_memory()
+            return True
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._entries):
+                self.release(name)
+
+    # --- stage interface (same as WorkerClient) ---
+    def warm(self, model_name: str) -> Dict:
+        """โหลดโมเดลไว้ล่วงหน้า -> {'model', 'loaded': โหลดใหม่หรือไม่, 'load_seconds'}"""
+        loads = self.counters['loads']
+        entry = self.acquire(model_name)
+        return {'model': model_name, 'loaded': self.counters['loads'] > loads, 'load_seconds': entry['load_seconds']}
+
+    def tokenizer(self, model_name: str):
+        """tokenizer ของโมเดล (ไม่ต้องโหลด weights)"""
+        with self._lock:
+            if model_name not in self._tokenizers:
+                self._tokenizers[model_name] = load_tokenizer(model_name)
+            return self._tokenizers[model_name]
+
+    def call(self, model_name: str, fn_name: str, sequences, *args, prefix_len: Optional[int] = None, **kwargs):
+        """POOL_FUNCTIONS[fn_name](model, tokenizer, sequences, *args, ...) บนโมเดลใน pool"""
+        if fn_name not in POOL_FUNCTIONS:
+            raise ValueError(f"Unknown pool function {fn_name!r}; expected one of {sorted(POOL_FUNCTIONS)}")
+        entry = self.acquire(model_name)
+        prefix_cache = entry['prefix_cache'] if prefix_len else None
+        return POOL_FUNCTIONS[fn_name](entry['model'], entry['tokenizer'], sequences, *args,
+                                       prefix_cache=prefix_cache, prefix_len=prefix_len, **kwargs)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            resident = [{'model': name, 'mb': round(entry['bytes'] / 2**20, 1), 'calls': entry['calls'],
+                         'load_seconds': round(entry['load_seconds'], 3), 'last_used': entry['last_used']}
+                        for name, entry in self._entries.items()]
+            return {'backend': self.backend.name, 'budget_mb': round(self.budget_bytes / 2**20, 1),
+                    'used_mb': round(self.used_bytes() / 2**20, 1), 'resident': resident, **self.counters}
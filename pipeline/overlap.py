@@ -0,0 +1,153 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Sequence
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+QUEUE_DEPTH = 2   # batch ที่เตรียมไว้ล่วงหน้า / รอ post ได้สูงสุด (backpressure: thread ที่เร็วกว่าจะรอ); 0 = ไม่ซ้อน
+_DONE = object()
+
+# ==========================================
+# 2. PREP / GENERATE / POST OVERLAP
+# ==========================================
+class _Worker(threading.Thread):
+    """thread ที่เก็บ exception ไว้ให้ thread หลัก raise ต่อ"""
+
+    def __init__(self, target, name):
+        super().__init__(name=name, daemon=True)
+        self._work = target
+        self.error = None
+        self.busy = 0.0
+
+    def run(self):
+        try:
+            self._work(self)
+        except BaseException as exc:   # ส่งต่อให้ thread หลัก
+            self.error = exc
+
+def _put(q: queue.Queue, item, stop: threading.Event, *workers: '_Worker'):
+    """
+    put แบบ bounded ที่เลิกรอเมื่อ thread หลักหยุดหรือ worker ตัวใดล้ม (ไม่ค้างตลอดไป)
+    -> False ถ้าไม่ได้ put (ผู้เรียกดู worker.error ต่อ)
+    """
+    while not stop.is_set() and all(w.error is None for w in workers):
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _run_threaded(batches, prepare, generate, post, depth):
+    prepared, finished = queue.Queue(maxsize=depth), queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    results = [None] * len(batches)
+
+    def produce(worker):
+        for i, batch in enumerate(batches):
+            start = time.perf_counter()
+            inputs = prepare(batch)
+            worker.busy += time.perf_counter() - start
+            if not _put(prepared, (i, batch, inputs), stop):
+                return
+        _put(prepared, _DONE, stop)
+
+    def consume(worker):
+        while True:
+            item = finished.get()
+            if item is _DONE:
+                return
+            i, batch, inputs, outputs = item
+            start = time.perf_counter()
+            results[i] = post(batch, inputs, outputs)
+            worker.busy += time.perf_counter() - start
+
+    producer, consumer = _Worker(produce, 'overlap-prep'), _Worker(consume, 'overlap-post')
+    generate_s = 0.0
+    wall = time.perf_counter()
+    producer.start()
+    consumer.start()
+    try:
+        while True:
+            try:
+                item = prepared.get(timeout=0.1)
+            except queue.Empty:
+                if producer.error is not None: raise producer.error
+                if consumer.error is not None: raise consumer.error
+                continue
+            if item is _DONE:
+                break
+            i, batch, inputs = item
+            start = time.perf_counter()
+            outputs = generate(inputs)
+            generate_s += time.perf_counter() - start
+            # post ล้มขณะคิวเต็ม -> ไม่มีใครดึงคิวอีก: _put เลิกรอเมื่อเห็น error แล้ว raise ต่อ
+            if not _put(finished, (i, batch, inputs, outputs), stop, consumer):
+                raise consumer.error
+        if not _put(finished, _DONE, stop, consumer):
+            raise consumer.error
+        consumer.join()
+        if consumer.error is not None: raise consumer.error
+    finally:
+        stop.set()
+        producer.join()
+        if consumer.is_alive():
+            # generate ล้มกลางทาง: post ทำ batch ที่อยู่ในคิวให้จบ (journal ไม่หาย) แล้วหยุด
+            finished.put(_DONE)
+            consumer.join()
+    wall = time.perf_counter() - wall
+
+    return {'results': results, 'prep_s': producer.busy, 'generate_s': generate_s, 'post_s': consumer.busy,
+            'wall_s': wall, 'overlap_s': max(0.0, producer.busy + generate_s + consumer.busy - wall)}
+
+def _run_sequential(batches, prepare, generate, post):
+    stats = {'results': [], 'prep_s': 0.0, 'generate_s': 0.0, 'post_s': 0.0}
+    wall = time.perf_counter()
+    for batch in batches:
+        start = time.perf_counter()
+        inputs = prepare(batch)
+        stats['prep_s'] += time.perf_counter() - start
+        start = time.perf_counter()
+        outputs = generate(inputs)
+        stats['generate_s'] += time.perf_counter() - start
+        start = time.perf_counter()
+        stats['results'].append(post(batch, inputs, outputs))
+        stats['post_s'] += time.perf_counter() - start
+    stats['wall_s'] = time.perf_counter() - wall
+    stats['overlap_s'] = 0.0
+    return stats
+
+def run_pipelined(batches: Sequence, prepare: Callable, generate: Callable, post: Callable,
+                  depth: int = QUEUE_DEPTH, timer=None, **labels) -> Dict:
+    """
+    Runs prepare -> generate -> post over batches with the CPU work off the model's thread:
+
+        prepare(batch) -> inputs              worker thread: ประกอบ inputs ของ batch N+1
+        generate(inputs) -> outputs           thread ที่เรียก (โมเดล) : batch N
+        post(batch, inputs, outputs) -> any   worker thread: ผลของ batch N-1
+
+    ใน stage ของ repo batch ถูกวางแผนจากความยาวโดยประมาณ (estimate_lengths) -> prepare render chat template /
+    tokenize ข่าวของ batch นั้น (ไม่ tokenize ทั้งชุดก่อนเริ่ม); generate คืน token ids ใหม่ (generate_batch(decode=False));
+    post ทำ decode_batch / parse / cache.store / journal. generate_json / label_responses decode ระหว่าง generate
+    (ต้องเห็นข้อความเพื่อหยุดที่ JSON ครบ) -> post เหลือแค่ parse / store
+
+    คิวระหว่างขั้นมีขนาด depth -> prepare ไม่วิ่งนำเกิน depth batch และ generate รอถ้า post ตามไม่ทัน
+    depth=0: ทำทีละ batch ใน thread เดียวตามลำดับเดิม (ไว้เทียบ / debug)
+    post ทำตามลำดับ batch เสมอ (journal / callback เห็นลำดับเดิม); exception ของ worker ถูก raise ใน thread ที่เรียก
+
+    Returns {'results': ผลของ post ตามลำดับ batch, 'prep_s' / 'generate_s' / 'post_s': เวลาที่แต่ละขั้นทำงานจริง,
+    'wall_s', 'overlap_s': เวลาที่ซ้อนกัน (ผลรวมสามขั้น - wall)}. With a StageTimer the three busy times are added
+    as stages prep / generate / post (labels เดียวกัน) และ Wall_s / Overlap_s อยู่ใน record ของ generate
+    """
+    batches = list(batches)
+    stats = _run_sequential(batches, prepare, generate, post) if depth <= 0 else \
+        _run_threaded(batches, prepare, generate, post, depth)
+    if timer is not None:
+        timer.add('prep', stats['prep_s'], **labels)
+        record = timer.add('generate', stats['generate_s'], **labels)
+        timer.add('post', stats['post_s'], **labels)
+        record['Wall_s'] = record.get('Wall_s', 0.0) + stats['wall_s']
+        record['Overlap_s'] = record.get('Overlap_s', 0.0) + stats['overlap_s']
+    return stats
@@ -0,0 +1,143 @@
+import copy
+import os
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+import torch
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+MIN_PREFIX_TOKENS = 16   # prefix สั้นกว่านี้ไม่คุ้ม copy KV -> prefill ทั้ง prompt ตามปกติ
+MAX_PREFIXES = 8         # จำนวน prefix (template) ต่อโมเดลที่เก็บ KV ไว้ (LRU)
+
+# ==========================================
+# 2. STATIC PREFIX OF A BATCH
+# ==========================================
+def common_prefix_length(sequences: Sequence[Sequence[int]]) -> int:
+    """
+    จำนวน token ต้น prompt ที่ทุก sequence เหมือนกัน (เช่น chat head + คำสั่งของ template)
+    เหลืออย่างน้อย 1 token ท้ายของ sequence ที่สั้นที่สุดไว้เป็น suffix เสมอ (ต้องมี logits ของตำแหน่งสุดท้าย)
+    """
+    if not sequences:
+        return 0
+    first, limit = sequences[0], min(len(s) for s in sequences) - 1
+    length = 0
+    while length < limit and all(s[length] == first[length] for s in sequences):
+        length += 1
+    return max(length, 0)
+
+def template_prefix(tokenizer, head: str, texts: Sequence[str], **tokenize_kwargs) -> List[int]:
+    """
+    token ids ของ prefix ร่วมโดยไม่ต้อง tokenize ทุก prompt: chat head + ข้อความต้นที่ทุก text เหมือนกัน
+    token สุดท้ายถูกตัดทิ้ง (ใน prompt จริงอาจรวมกับตัวอักษรถัดไปเป็น token อื่น) -> ใช้กับ shared_prefix_length
+    ต่อ batch หลัง tokenize ใน prep thread
+    """
+    common = os.path.commonprefix(list(texts)) if len(texts) else ''
+    return list(tokenizer(head + common, **tokenize_kwargs)['input_ids'])[:-1]
+
+def shared_prefix_length(prefix: Sequence[int], sequences: Sequence[Sequence[int]]) -> int:
+    """จำนวน token แรกของ prefix ที่ทุก sequence มีตรงกัน (เหลือ suffix อย่างน้อย 1 token เหมือน common_prefix_length)"""
+    length = len(prefix)
+    for seq in sequences:
+        limit = min(length, len(seq) - 1)
+        length = 0
+        while length < limit and seq[length] == prefix[length]:
+            length += 1
+    return max(length, 0)
+
+# ==========================================
+# 3. PER-MODEL PREFIX KV CACHE
+# ==========================================
+class PrefixCache:
+    """
+    KV cache ของ static prefix ต่อโมเดล: prefill prefix ครั้งเดียว แล้ว fork (copy + ขยายเป็น rows แถว)
+    ให้แต่ละ batch ต่อด้วย suffix ของแต่ละแถวเอง
+
+        prefix_cache = PrefixCache(model)
+        out, attention_mask = prefill(model, sequences, pad_id, prefix_cache, prefix_len)
+        texts, n_new = generate_batch(model, tokenizer, sequences, 80, prefix_cache=prefix_cache)
+
+    Layout ของ batch: [prefix][padding][suffix] — padding อยู่ระหว่าง prefix กับ suffix (attention_mask = 0)
+    และ position_ids นับต่อจาก prefix -> ผลเท่ากับ prefill ทั้ง prompt แบบ left padding
+    """
+
+    def __init__(self, model, min_tokens: int = MIN_PREFIX_TOKENS, max_entries: int = MAX_PREFIXES):
+        self.model = model
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # tuple(prefix ids) -> past_key_values (batch 1)
+        self.stats = {'prefills': 0, 'forks': 0, 'rows': 0, 'tokens_saved': 0}
+
+    def _past(self, prefix: List[int]):
+        key = tuple(prefix)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        input_ids = torch.tensor([prefix], dtype=torch.long, device=self.model.device)
+        with torch.no_grad():
+            past = self.model(input_ids=input_ids, attention_mask=torch.ones_like(input_ids),
+                              use_cache=True, logits_to_keep=1).past_key_values
+        self._entries[key] = past
+        self.stats['prefills'] += 1
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return past
+
+    def fork(self, prefix: List[int], rows: int):
+        """สำเนา KV ของ prefix สำหรับ batch ขนาด rows (แก้ไขได้ ไม่กระทบตัวที่เก็บไว้)"""
+        past = copy.deepcopy(self._past(prefix))
+        if rows > 1:
+            past.batch_repeat_interleave(rows)
+        self.stats['forks'] += 1
+        self.stats['rows'] += rows
+        self.stats['tokens_saved'] += len(prefix) * rows
+        return past
+
+    def clear(self):
+        self._entries.clear()
+
+# ==========================================
+# 4. PREFILL WITH AN OPTIONAL SHARED PREFIX
+# ==========================================
+def shared_layout(sequences: List[List[int]], pad_id: int, device, prefix_cache: Optional[PrefixCache] = None,
+                  prefix_len: Optional[int] = None):
+    """
+    -> (input_ids, attention_mask, past_key_values หรือ None, prefix_len ที่ใช้จริง)
+
+    มี prefix_cache และ prefix ยาวพอ: input_ids = [prefix][padding][suffix] ครบทุก token, past = KV ของ prefix
+    ที่ fork แล้ว (model / generate ข้าม prefix_len token แรกเพราะมีใน past แล้ว)
+    ไม่มี: left padding ทั้ง prompt, past = None, prefix_len = 0
+
+    prefix_len: จำนวน token แรกที่ทุกแถวเหมือนกัน (None = หาเองด้วย common_prefix_length);
+    ผู้เรียกที่รู้ template ควรส่งค่าคงที่ต่อ template มา เพื่อให้ทุก batch ใช้ prefix ตัวเดียวกันใน cache
+    """
+    from pipeline.inference import left_pad   # pipeline.inference import module นี้ (ไม่ import ตอนโหลด)
+
+    if prefix_cache is not None and prefix_len is None:
+        prefix_len = common_prefix_length(sequences)
+    if prefix_cache is None or (prefix_len or 0) < prefix_cache.min_tokens:
+        input_ids, attention_mask = left_pad(sequences, pad_id, device)
+        return input_ids, attention_mask, None, 0
+
+    prefix = list(sequences[0][:prefix_len])
+    if any(len(s) <= prefix_len or list(s[:prefix_len]) != prefix for s in sequences):
+        raise ValueError(f"prefix_len={prefix_len} is not a shared prefix of every sequence (with a suffix left)")
+    suffix_ids, suffix_mask = left_pad([list(s[prefix_len:]) for s in sequences], pad_id, device)
+    rows = len(sequences)
+    input_ids = torch.cat([torch.tensor([prefix], dtype=torch.long, device=device).expand(rows, -1), suffix_ids], dim=1)
+    attention_mask = torch.cat([suffix_mask.new_ones((rows, prefix_len)), suffix_mask], dim=1)
+    return input_ids, attention_mask, prefix_cache.fork(prefix, rows), prefix_len
+
+def prefill(model, sequences: List[List[int]], pad_id: int, prefix_cache: Optional[PrefixCache] = None,
+            prefix_len: Optional[int] = None, use_cache: bool = True):
+    """
+    Forward ของ prompt ทั้ง batch (logits เฉพาะตำแหน่งสุดท้าย)
+    -> (model output, attention_mask เต็มความยาวสำหรับ decode step ถัดไป)
+    """
+    input_ids, attention_mask, past, skip = shared_layout(sequences, pad_id, model.device, prefix_cache, prefix_len)
+    position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)[:, skip:]
+    with torch.no_grad():
+        out = model(input_ids=input_ids[:, skip:], attention_mask=attention_mask, position_ids=position_ids,
+                    past_key_values=past, use_cache=use_cache or past is not None, logits_to_keep=1)
+    return out, attention_mask
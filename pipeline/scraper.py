@@ -0,0 +1,306 @@
+import random
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from pipeline.journal import normalize_link
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"          # C parser, ~5-10x เร็วกว่า html.parser
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+BASE_URL = "https://www.investing.com/news/stock-market-news"
+DOMAIN = "https://www.investing.com"
+BROWSER_CONFIG = {"browser": "chrome", "platform": "windows", "desktop": True}
+
+FETCH_WORKERS = 8            # จำนวน thread ที่ดึงบทความพร้อมกัน (= ขนาด connection pool)
+REQUESTS_PER_SECOND = 2.0    # ต่อ host (listing + article รวมกัน)
+RATE_JITTER = 0.5            # สุ่มเพิ่มช่วงห่างได้ถึง 50% (แทน random sleep เดิม)
+TIMEOUT = 20
+MIN_CONTENT_CHARS = 100
+
+IGNORE_PHRASES = [
+    "generated with the support of AI",
+    "reviewed by an editor",
+    "Join our investing challenges",
+    "InvestingPro",
+    "For more information see our T&C",
+    "Position:"
+]
+
+# ==========================================
+# 2. PARSING (no network)
+# ==========================================
+def extract_clean_text(raw_html, parser: str = HTML_PARSER):
+    """
+    Parses HTML content, removes unnecessary tags (scripts, styles, etc.),
+    and extracts clean paragraph text from the article body.
+    """
+    if not raw_html:
+        return ""
+
+    soup = BeautifulSoup(raw_html, parser)
+
+    # Remove non-content tags
+    for tag in soup(["script", "style", "noscript", "iframe", "header", "footer"]):
+        tag.decompose()
+
+    # Attempt to locate the main article body using common selectors
+    article_body = (
+        soup.find("div", class_="WYSIWYG articlePage") or
+        soup.find("div", class_="article_container") or
+        soup.find("div", id="articleContent") or
+        soup.find("div", class_="article-content") or
+        soup.body
+    )
+
+    paragraphs = []
+    if article_body:
+        for p in article_body.find_all("p"):
+            text = p.get_text(" ", strip=True)
+            # Filter out short texts or ignored phrases
+            if len(text) > 30 and not any(phrase in text for phrase in IGNORE_PHRASES):
+                paragraphs.append(text)
+
+    return "\n\n".join(paragraphs).strip()
+
+def parse_listing(raw_html, page: int, domain: str = DOMAIN, parser: str = HTML_PARSER) -> List[Dict]:
+    """
+    Article links of one listing page, in page order:
+    [{Page, Date, Source, Title, Link}, ...] (Link normalized; anchors without href are skipped)
+    """
+    soup = BeautifulSoup(raw_html, parser)
+    items = []
+    for a_tag in soup.find_all("a", attrs={"data-test": "article-title-link"}):
+        href = a_tag.get("href")
+        if not href: continue
+
+        # Extract metadata
+        container = (
+            a_tag.find_parent("article") or
+            a_tag.find_parent("li") or
+            a_tag.find_parent("div", class_=lambda x: x and "article" in x)
+        )
+
+        date_val, source_name = "Unknown", "Unknown"
+        if container:
+            t = container.find("time", attrs={"data-test": "article-publish-date"})
+            s = container.find("span", attrs={"data-test": "news-provider-name"})
+            if t: date_val = t.get("datetime") or t.get_text(strip=True)
+            if s: source_name = s.get_text(strip=True)
+
+        items.append({
+            "Page": page,
+            "Date": date_val,
+            "Source": source_name,
+            "Title": a_tag.get_text(strip=True),
+            "Link": normalize_link(href if href.startswith("http") else urljoin(domain, href))
+        })
+    return items
+
+# ==========================================
+# 3. SESSION / RATE LIMIT / FETCH POOL
+# ==========================================
+def mount_pool(session, pool_size: int = FETCH_WORKERS):
+    """keep-alive connection pool ขนาดเท่าจำนวน worker (default ของ requests = 10 ต่อ host)"""
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def create_session(pool_size: int = FETCH_WORKERS):
+    """cloudscraper session (requests.Session subclass) ที่ใช้ร่วมกันทุก thread"""
+    import cloudscraper
+    session = cloudscraper.create_scraper(browser=BROWSER_CONFIG)
+    session.headers.update({"Accept-Language": "en-US,en;q=0.9"})
+    return mount_pool(session, pool_size)
+
+class HostRateLimiter:
+    """
+    Thread-safe per-host request spacing.
+    แต่ละ request จองช่องเวลาถัดไปของ host นั้น (1/rate วินาที + jitter) แล้วค่อยรอนอก lock
+    """
+
+    def __init__(self, requests_per_second: float = REQUESTS_PER_SECOND, jitter: float = RATE_JITTER):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.jitter = jitter
+        self.waited = 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval * (1 + random.uniform(0, self.jitter))
+            self.waited += slot - now
+        if slot > now:
+            time.sleep(slot - now)
+
+class ArticleFetcher:
+    """
+    Fetches article pages on a bounded thread pool and parses them elsewhere.
+
+    - fetch threads ทำแค่ network I/O (session เดียว, connection pool ใช้ซ้ำ)
+    - parse: parse_processes=0 -> thread แยก 1 ตัว, >0 -> process pool (ไม่ติด GIL)
+    - submit(url) -> Future ของข้อความบทความ (extract_clean_text)
+    """
+
+    def __init__(self, session, workers: int = FETCH_WORKERS, limiter: Optional[HostRateLimiter] = None,
+                 timeout: float = TIMEOUT, referer: Optional[str] = BASE_URL,
+                 parse_processes: int = 0, parser: str = HTML_PARSER):
+        self.session = session
+        self.limiter = limiter or HostRateLimiter()
+        self.timeout = timeout
+        self.headers = {"Referer": referer} if referer else {}
+        self.parser = parser
+        self.stats = {'fetched': 0, 'failed': 0, 'bytes': 0, 'fetch_seconds': 0.0}
+        self._stats_lock = threading.Lock()
+        self._fetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+        self._parse_pool = (ProcessPoolExecutor(max_workers=parse_processes) if parse_processes
+                            else ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse"))
+
+    def get(self, url: str, **kwargs):
+        """rate-limited GET ผ่าน session เดียวกัน (ใช้กับ listing page ด้วย)"""
+        self.limiter.wait(url)
+        return self.session.get(url, timeout=self.timeout, **kwargs)
+
+    def _fetch(self, url: str) -> str:
+        start = time.perf_counter()
+        try:
+            text = self.get(url, headers=self.headers).text
+        except Exception:
+            with self._stats_lock:
+                self.stats['failed'] += 1
+            raise
+        with self._stats_lock:
+            self.stats['fetched'] += 1
+            self.stats['bytes'] += len(text)
+            self.stats['fetch_seconds'] += time.perf_counter() - start
+        return text
+
+    def submit(self, url: str) -> Future:
+        result = Future()
+
+        def on_parsed(parsed):
+            try:
+                result.set_result(parsed.result())
+            except Exception as e:
+                result.set_exception(e)
+
+        def on_fetched(fetched):
+            try:
+                raw_html = fetched.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            try:
+                self._parse_pool.submit(extract_clean_text, raw_html, self.parser).add_done_callback(on_parsed)
+            except Exception as e:
+                result.set_exception(e)
+
+        self._fetch_pool.submit(self._fetch, url).add_done_callback(on_fetched)
+        return result
+
+    def close(self):
+        self._fetch_pool.shutdown(wait=True)
+        self._parse_pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ==========================================
+# 4. INCREMENTAL SCRAPE
+# ==========================================
+def scrape_new_articles(fetcher: ArticleFetcher, existing_links: Set[str], max_pages: int = 50,
+                        base_url: str = BASE_URL, domain: str = DOMAIN) -> List[Dict]:
+    """
+    Scrapes listing pages from page 1 until an article already in existing_links is found.
+
+    Listing pages are read in order (the stop signal depends on them); article bodies of each
+    page are submitted to the fetcher straight away, so they download while later listing
+    pages are scanned. Returns [{Page, Date, Source, Title, Link, Content}, ...] in page order.
+    """
+    pending = []
+    seen_links_session = set()
+    stop_scraping = False
+
+    # Loop through pages (limited by max_pages to prevent infinite loops if something goes wrong)
+    for page in range(1, max_pages + 1):
+        if stop_scraping:
+            break
+
+        current_url = f"{base_url}/{page}"
+        print(f"\n[Page {page}] Scanning for new links -> {current_url}")
+
+        try:
+            response = fetcher.get(current_url)
+            if response.status_code != 200:
+                print(f"Error: Could not access page {page} (Status: {response.status_code})")
+                continue
+
+            listing = parse_listing(response.text, page, domain, fetcher.parser)
+            if not listing:
+                print("Info: No articles found on this page. Ending scrape.")
+                break
+
+            print(f"Info: Found {len(listing)} links on page {page}")
+
+            current_page_candidates = []
+
+            # --- STEP 1: Filter Links ---
+            for item in listing:
+                full_link = item["Link"]
+
+                # CHECK: If we find a link that is already in our file, we have reached old news.
+                if full_link in existing_links:
+                    print(f"Stop Signal: Found existing article '{item['Title'][:30]}...'. Stopping.")
+                    stop_scraping = True
+                    break # Break the link loop
+
+                # Check for session duplicates (e.g. pinned posts appearing on multiple pages)
+                if full_link in seen_links_session or "comment" in full_link:
+                    continue
+
+                current_page_candidates.append(item)
+                seen_links_session.add(full_link)
+
+            # --- STEP 2: Queue Content Fetches for New Links ---
+            if current_page_candidates:
+                print(f"Status: Found {len(current_page_candidates)} NEW articles on page {page}. Queued for extraction.")
+                pending += [(item, fetcher.submit(item["Link"])) for item in current_page_candidates]
+            else:
+                if not stop_scraping:
+                    print("Info: No valid new links found on this page (might be duplicates or ads).")
+
+        except Exception as e:
+            print(f"Critical Error processing page {page}: {e}")
+            continue
+
+    # --- STEP 3: Collect Contents (page order) ---
+    new_articles = []
+    for i, (item, future) in enumerate(pending, start=1):
+        try:
+            content = future.result()
+            if content and len(content) > MIN_CONTENT_CHARS:
+                item["Content"] = content
+                new_articles.append(item)
+            else:
+                print(f"    [{i}/{len(pending)}] Warning: Content too short/empty: {item['Title'][:50]}")
+        except Exception as e:
+            print(f"    [{i}/{len(pending)}] Error fetching article: {e}")
+    return new_articles
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from pipeline.checkpoint import CHECKPOINT_DIR
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+VECTORIZER_PATH = os.path.join(CHECKPOINT_DIR, 'models', 'sector_tfidf.joblib')
+THRESHOLD = 0.02
+MAX_LABELS = 3
+OTHER = 'Other'
+
+SECTOR_KEYWORDS = {
+    "Technology": (
+        "technology software semiconductor chip artificial intelligence ai cloud computing "
+        "cybersecurity hardware electronics data center server processor gpu cpu saas "
+        "it services digital platform quantum computing machine learning automation "
+        "network infrastructure operating system application developer tech"
+    ),
+    "Communication Services": (
+        "communication internet telecommunication telecom media entertainment streaming "
+        "social media advertising broadcasting broadband wireless network cable satellite "
+        "interactive media publishing movies gaming video content provider"
+    ),
+    "Consumer Cyclical": (
+        "consumer discretionary retail e-commerce automotive vehicle electric vehicle ev "
+        "car auto parts restaurant travel leisure hotel resort casino gambling apparel "
+        "luxury goods home improvement department store textile footwear consumer services"
+    ),
+    "Financials": (
+        "financial banking bank investment asset management insurance credit fintech "
+        "capital markets wealth management interest rate monetary policy federal reserve "
+        "fed loan mortgage equity trading brokerage payment system currency exchange "
+        "private equity hedge fund venture capital audit tax"
+    ),
+    "Healthcare": (
+        "healthcare health pharmaceutical biotech biotechnology medical device "
+        "drug vaccine clinical trial fda approval hospital health insurance "
+        "life sciences diagnosis therapy treatment genomics medical equipment "
+        "managed care pharmacy research development r&d"
+    ),
+    "Energy": (
+        "energy oil gas petroleum crude drilling exploration production pipeline "
+        "refining refinery renewable energy solar wind biofuel carbon capture "
+        "energy equipment services natural gas lng offshore onshore fuel power generation"
+    ),
+    "Industrials": (
+        "industrial aerospace defense machinery transportation logistics airline "
+        "freight railroad shipping trucking manufacturing construction engineering "
+        "building products electrical equipment commercial services waste management "
+        "infrastructure conglomerate supply chain"
+    ),
+    "Consumer Defensive": (
+        "consumer staples food beverage household products personal care tobacco "
+        "supermarket grocery hypermarket discount store agriculture products "
+        "packaged food hygiene cleaning products soft drink alcohol brewing"
+    ),
+    "Real Estate": (
+        "real estate reit property housing residential commercial industrial "
+        "leasing tenant development management brokerage mortgage reit "
+        "data center reit tower reit healthcare reit hotel reit office reit retail reit"
+    ),
+    "Utilities": (
+        "utilities electric power water gas utility renewable utility grid "
+        "transmission distribution energy infrastructure clean energy nuclear "
+        "independent power producer multi-utilities"
+    ),
+    "Basic Materials": (
+        "basic materials chemicals mining metals steel gold copper silver "
+        "agriculture fertilizer construction materials packaging container "
+        "paper forest products specialty chemicals industrial gases commodity "
+        "aluminum iron ore lithium rare earth"
+    )
+}
+
+def keywords_fingerprint(keywords: Dict[str, str]) -> str:
+    return hashlib.sha256(json.dumps(keywords, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+# ==========================================
+# 2. COLUMNAR RESULT
+# ==========================================
+class SectorScores:
+    """
+    Columnar classification result (no per-row Python objects).
+
+    sector_ids : (n, max_labels) int16 index into sector_names, -1 = ไม่มี label ในช่องนั้น
+    scores     : (n, max_labels) float64 similarity เรียงจากมากไปน้อย (0 ในช่องที่ไม่มี label)
+    primary_ids: (n,) sector ที่ score สูงสุด หรือ -1 (Other) ถ้าไม่ผ่าน threshold
+    confidence : (n,) score สูงสุดของแต่ละข่าว
+    counts     : (n,) จำนวน label ที่ผ่าน threshold
+    """
+
+    def __init__(self, sector_names: List[str], sector_ids: np.ndarray, scores: np.ndarray,
+                 primary_ids: np.ndarray, confidence: np.ndarray, counts: np.ndarray):
+        self.sector_names = sector_names
+        self.sector_ids = sector_ids
+        self.scores = scores
+        self.primary_ids = primary_ids
+        self.confidence = confidence
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.primary_ids)
+
+    def primary_sectors(self) -> pd.Categorical:
+        categories = list(self.sector_names) + [OTHER]
+        codes = np.where(self.primary_ids >= 0, self.primary_ids, len(self.sector_names))
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+    def sector_dicts(self) -> List[Dict[str, float]]:
+        """Legacy Sector_Dict column: {sector: round(score, 5)} หรือ {'Other': 0.0}"""
+        names = np.asarray(self.sector_names, dtype=object)
+        ids = self.sector_ids.tolist()
+        rounded = np.round(self.scores, 5).tolist()
+        dicts = []
+        for row_ids, row_scores, count in zip(ids, rounded, self.counts.tolist()):
+            if count == 0:
+                dicts.append({OTHER: 0.0})
+            else:
+                dicts.append({names[i]: s for i, s in zip(row_ids[:count], row_scores[:count])})
+        return dicts
+
+    def assign(self, df: pd.DataFrame, dict_column: bool = True) -> pd.DataFrame:
+        """เขียนคอลัมน์ Sector / Confidence / Sector_Dict / Sector_Count แบบเดิมลง df"""
+        df['Sector'] = np.asarray(self.primary_sectors(), dtype=object)
+        df['Confidence'] = self.confidence
+        if dict_column:
+            df['Sector_Dict'] = self.sector_dicts()
+        df['Sector_Count'] = self.counts.astype(np.int64)
+        return df
+
+def top_k_sectors(similarity: np.ndarray, threshold: float = THRESHOLD, max_labels: int = MAX_LABELS):
+    """
+    Vectorized top-k over the full (n_articles, n_sectors) similarity matrix.
+    Returns (sector_ids, scores, primary_ids, confidence, counts) — see SectorScores.
+    """
+    n, n_sectors = similarity.shape
+    k = min(max_labels, n_sectors)
+    if n == 0:
+        empty = np.empty((0, k))
+        return (empty.astype(np.int16), empty, np.empty(0, np.int16), np.empty(0), np.empty(0, np.int8))
+
+    # 1. top-k ต่อแถวโดยไม่ sort ทั้งแถว แล้วเรียงเฉพาะ k ตัว (มากไปน้อย)
+    if k < n_sectors:
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(n_sectors), (n, n_sectors)).copy()
+    top_scores = np.take_along_axis(similarity, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    # 2. threshold mask (แถวเรียงแล้ว -> ช่องที่ผ่านอยู่ต้นแถวเสมอ)
+    passed = top_scores > threshold
+    counts = passed.sum(axis=1).astype(np.int8)
+    sector_ids = np.where(passed, top, -1).astype(np.int16)
+    scores = np.where(passed, top_scores, 0.0)
+
+    confidence = top_scores[:, 0]
+    primary_ids = np.where(passed[:, 0], top[:, 0], -1).astype(np.int16)
+    return sector_ids, scores, primary_ids, confidence, counts
+
+# ==========================================
+# 3. CLASSIFIER
+# ==========================================
+class SectorClassifier:
+    """
+    TF-IDF keyword classifier: cosine similarity between each article and each sector's keyword doc.
+
+    - classify(df, text_col)          : เหมือนเดิม — fit vectorizer ใหม่บน sector docs + ข่าวทั้งหมด
+    - classify(df, text_col, refit=False): ใช้ vectorizer ที่ fit ไว้แล้ว (fit()/load()) แค่ transform ข่าว
+    - save(path) / SectorClassifier.load(path): เก็บ vectorizer + sector vectors ไว้ใช้รอบถัดไป
+    """
+
+    def __init__(self, keywords: Dict[str, str] = SECTOR_KEYWORDS):
+        self.keywords = keywords
+        self.sector_names = list(keywords.keys())
+        self.sector_docs = list(keywords.values())
+        self.vectorizer = TfidfVectorizer(stop_words='english')
+        self.sector_vectors = None
+        self.fitted_docs = 0
+
+    # --- fitting ---
+    @property
+    def is_fitted(self) -> bool:
+        return self.sector_vectors is not None
+
+    def fit(self, texts: List[str]):
+        """Fits IDF on sector docs + corpus (the original behaviour) and caches sector vectors."""
+        matrix = self.vectorizer.fit_transform(self.sector_docs + list(texts))
+        self.sector_vectors = matrix[:len(self.sector_names)]
+        self.fitted_docs = matrix.shape[0] - len(self.sector_names)
+        return matrix[len(self.sector_names):]
+
+    def transform(self, texts: List[str]):
+        if not self.is_fitted:
+            raise RuntimeError("SectorClassifier is not fitted; call fit() or load() first")
+        return self.vectorizer.transform(list(texts))
+
+    # --- persistence ---
+    def save(self, path: str = VECTORIZER_PATH) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        joblib.dump({
+            'keywords_fingerprint': keywords_fingerprint(self.keywords),
+            'vectorizer': self.vectorizer,
+            'sector_vectors': self.sector_vectors,
+            'fitted_docs': self.fitted_docs,
+        }, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = VECTORIZER_PATH, keywords: Dict[str, str] = SECTOR_KEYWORDS) -> Optional['SectorClassifier']:
+        """Fitted classifier from `path`, or None if missing or fitted on different keywords."""
+        if not os.path.exists(path):
+            return None
+        state = joblib.load(path)
+        if state.get('keywords_fingerprint') != keywords_fingerprint(keywords):
+            print("⚠️ Saved vectorizer was fitted on different SECTOR_KEYWORDS, ignoring it")
+            return None
+        clf = cls(keywords)
+        clf.vectorizer = state['vectorizer']
+        clf.sector_vectors = state['sector_vectors']
+        clf.fitted_docs = state.get('fitted_docs', 0)
+        return clf
+
+    # --- scoring ---
+    def similarity(self, news_vectors) -> np.ndarray:
+        """cosine similarity; TF-IDF rows are already L2-normalised so this is a sparse dot product"""
+        return (news_vectors @ self.sector_vectors.T).toarray()
+
+    def score(self, texts: List[str], threshold: float = THRESHOLD, max_labels: int = MAX_LABELS,
+              refit: bool = True) -> SectorScores:
+        news_vectors = self.fit(texts) if (refit or not self.is_fitted) else self.transform(texts)
+        result = top_k_sectors(self.similarity(news_vectors), threshold, max_labels)
+        return SectorScores(self.sector_names, *result)
+
+    def classify(self, df: pd.DataFrame, text_col: str, threshold: float = THRESHOLD,
+                 max_labels: int = MAX_LABELS, refit: bool = True) -> pd.DataFrame:
+        """
+        Performs TF-IDF vectorization and cosine similarity to assign sectors.
+        Adds Sector, Confidence, Sector_Dict and Sector_Count to df.
+        """
+        print("🧮 Vectorizing text and calculating similarity...")
+        result = self.score(df[text_col].tolist(), threshold, max_labels, refit=refit)
+        return result.assign(df)
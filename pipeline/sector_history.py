@@ -0,0 +1,433 @@
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pipeline.backend import get_backend
+from pipeline.batching import (CHARS_PER_TOKEN, DEFAULT_BATCH_TOKENS, estimate_lengths, padding_stats, plan_batches,
+                               prompt_lengths)
+from pipeline.inference import chat_parts, decode_batch, generate_batch, load_model, release_memory
+from pipeline.overlap import QUEUE_DEPTH, run_pipelined
+from pipeline.prefix_cache import PrefixCache, shared_prefix_length, template_prefix
+from pipeline.structured import Enum, JsonFormat, Number, String, generate_json
+from pipeline.timing import StageTimer
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+LOOKBACK_DAYS = 7
+ANALYSIS_RANGE = 3          # จำนวนวันที่วิเคราะห์ย้อนหลัง (รวมวันล่าสุด)
+MAX_NEW_TOKENS = 300
+TEMPERATURE = 0.35
+PROMPT_VERSION = 'sector-history-v2'   # เปลี่ยนเมื่อแก้ build_prompt -> ไม่ใช้คำตอบเก่าใน cache
+# News Feed ต่อ prompt: ไม่เกินเท่านี้ tokens ไม่ว่า sector จะมีข่าวกี่ข่าว (ส่วนอื่นของ prompt ~350 tokens)
+CONTEXT_TOKEN_BUDGET = 1200
+# คำตอบตาม Output ใน build_prompt: generate ด้วย schema นี้ -> parse ได้ทุกแถว, หยุดทันทีที่ object ปิด
+OUTLOOK_FORMAT = JsonFormat({'outlook': Enum(['Bearish', 'Bullish', 'Neutral']), 'score': Number(0.0, 10.0),
+                             'analysis': String()})
+_HEADLINE_SOURCE = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")   # "Headline - Reuters"
+_NON_WORD = re.compile(r"[\W_]+")
+
+# ==========================================
+# 2. DATA PREPARATION
+# ==========================================
+def prepare_news(df: pd.DataFrame):
+    """
+    news_summary -> (expanded_df 1 แถวต่อ (ข่าว, sector), target_dates เรียงเก่า -> ใหม่)
+    """
+    df = df.copy()
+    if 'Short_Ans' not in df.columns: df['Short_Ans'] = df['Content']
+    if 'Date' not in df.columns:
+        df['Date'] = [datetime.now() - timedelta(days=x % 12) for x in range(len(df))]
+    else:
+        df['Date'] = pd.to_datetime(df['Date'])
+
+    # Explode Sectors
+    df['Sector_List'] = df['Combined_Sector'].astype(str).str.split(',')
+    expanded_df = df.explode('Sector_List')
+    expanded_df['Target_Sector'] = expanded_df['Sector_List'].str.strip()
+
+    latest_db_date = df['Date'].max()
+    target_dates = [latest_db_date - timedelta(days=i) for i in range(ANALYSIS_RANGE)]
+    target_dates.reverse()
+    return expanded_df, target_dates
+
+def _consensus_score(df: pd.DataFrame) -> np.ndarray:
+    if 'Consensus_Score' in df.columns:
+        return pd.to_numeric(df['Consensus_Score'], errors='coerce').to_numpy(dtype=float)
+    score_cols = [c for c in df.columns if 'Score_' in c]
+    if not score_cols:
+        return np.zeros(len(df))
+    return df[score_cols].apply(pd.to_numeric, errors='coerce').mean(axis=1).to_numpy(dtype=float)
+
+def _context_lines(df: pd.DataFrame) -> np.ndarray:
+    """บรรทัด news context ของแต่ละแถว (สร้างครั้งเดียว แล้ว join ตาม window)"""
+    day = np.datetime_as_string(df['Date'].to_numpy(dtype='datetime64[D]'), unit='D').astype(object)
+    title = df['Title'].astype(str).to_numpy(dtype=object) if 'Title' in df.columns else 'N/A'
+    short = df['Short_Ans'].astype(str).str.slice(0, 150).to_numpy(dtype=object) if 'Short_Ans' in df.columns else ''
+    return "- " + day + ": " + title + " -> " + short + "...\n"
+
+def _headline_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    รหัสหัวข่าวที่ normalize แล้ว (ตัด " - Source" ท้าย, ตัวพิมพ์, เครื่องหมาย) -> หัวข่าวเดียวกันจากหลายสำนักได้รหัสเดียวกัน
+    แถวที่ไม่มีหัวข่าวได้รหัสไม่ซ้ำใคร
+    """
+    if 'Title' not in df.columns:
+        return np.arange(len(df))
+    key = (df['Title'].fillna('').astype(str).str.replace(_HEADLINE_SOURCE, '', regex=True)
+           .str.lower().str.replace(_NON_WORD, ' ', regex=True).str.strip())
+    codes, uniques = pd.factorize(key)
+    blank = (key == '').to_numpy()
+    return np.where(blank, len(uniques) + np.arange(len(df)), codes)
+
+def _line_tokens(lines: np.ndarray, tokenizer=None) -> np.ndarray:
+    if tokenizer is not None:
+        return np.asarray(prompt_lengths(tokenizer, list(lines)), dtype=np.int64)
+    chars = pd.Series(lines, dtype=object).str.len().to_numpy()
+    return np.ceil(chars / CHARS_PER_TOKEN).astype(np.int64)
+
+def sector_signals(expanded_df: pd.DataFrame, target_dates, context_tokens: Optional[int] = CONTEXT_TOKEN_BUDGET,
+                   tokenizer=None) -> pd.DataFrame:
+    """
+    ทุก (target_date, sector) ที่มีข่าวใน LOOKBACK_DAYS ย้อนหลัง
+    -> DataFrame[date, sector, news_volume, q_score, news_context, context_items, context_dropped]
+
+    - เรียง expanded_df ครั้งเดียวตาม (sector, Date) -> window ของแต่ละ sector หาได้ด้วย searchsorted
+    - Time_Weight / weighted average คำนวณบนคู่ (window, แถว) ทั้งหมดพร้อมกัน แล้ว sum ต่อ window
+    - q_score / news_volume ใช้ข่าวทั้งหมดใน window; เฉพาะ news_context ที่ถูกจำกัดด้วย context_tokens:
+      จัดอันดับด้วย Time_Weight x (1 + |Consensus_Score|) (ใหม่กว่ามาก่อนเมื่อเท่ากัน), หัวข่าวซ้ำเหลือตัวที่อันดับดีสุด,
+      แล้วเก็บตามอันดับจนเต็ม budget (อย่างน้อย 1 ข่าว) และเรียงใหม่ -> เก่าใน prompt
+    - tokens ต่อบรรทัดนับด้วย tokenizer ถ้าส่งมา ไม่งั้นประมาณจาก CHARS_PER_TOKEN
+    - context_tokens=None -> ทุกข่าวใน window (ไม่ตัดหัวข่าวซ้ำ)
+    """
+    columns = ['date', 'sector', 'news_volume', 'q_score', 'news_context', 'context_items', 'context_dropped']
+    if expanded_df.empty or not len(target_dates):
+        return pd.DataFrame(columns=columns)
+    targets = pd.to_datetime(pd.Series(target_dates)).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    lookback = pd.Timedelta(days=LOOKBACK_DAYS).value
+
+    # เฉพาะแถวที่อยู่ใน window ใดสักอัน และมี sector ที่ใช้ได้
+    date_ns = expanded_df['Date'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    in_range = (date_ns >= targets.min() - lookback) & (date_ns <= targets.max())
+    df = expanded_df[in_range & expanded_df['Target_Sector'].notna().to_numpy()]
+    df = df[df['Target_Sector'].astype(str).str.len() >= 2]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    # 1. Sector-grouped, date-sorted index (ข่าววันเดียวกัน: ลำดับเดิมมาก่อนเมื่อเรียงใหม่ -> เก่า)
+    codes, sectors = pd.factorize(df['Target_Sector'])
+    dates = df['Date'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    position = np.arange(len(df))
+    order = np.lexsort((-position, dates, codes))
+    codes, dates, position = codes[order], dates[order], position[order]
+    score = _consensus_score(df)[order]
+    lines = _context_lines(df)[order]
+    bounds = np.searchsorted(codes, np.arange(len(sectors) + 1))
+
+    # 2. Window bounds ต่อ (date, sector): [target - LOOKBACK_DAYS, target]
+    win_date, win_sector, win_lo, win_hi = [], [], [], []
+    for code in range(len(sectors)):
+        lo, hi = bounds[code], bounds[code + 1]
+        start = lo + np.searchsorted(dates[lo:hi], targets - lookback, side='left')
+        end = lo + np.searchsorted(dates[lo:hi], targets, side='right')
+        win_date.append(np.arange(len(targets)))
+        win_sector.append(np.full(len(targets), code))
+        win_lo.append(start)
+        win_hi.append(end)
+    win_date, win_sector = np.concatenate(win_date), np.concatenate(win_sector)
+    win_lo, win_hi = np.concatenate(win_lo), np.concatenate(win_hi)
+    keep = win_hi > win_lo
+    win_date, win_sector, win_lo, win_hi = win_date[keep], win_sector[keep], win_lo[keep], win_hi[keep]
+    sizes = win_hi - win_lo
+    win_start = np.cumsum(sizes) - sizes
+
+    # 3. Time weights + weighted average บนคู่ (window, แถว) ทั้งหมด
+    window_of = np.repeat(np.arange(len(sizes)), sizes)
+    rows = np.arange(sizes.sum()) - np.repeat(win_start, sizes) + np.repeat(win_lo, sizes)
+    days_ago = (targets[win_date][window_of] - dates[rows]) // np.int64(86_400 * 10**9)
+    weight = np.clip(1 - days_ago / (LOOKBACK_DAYS + 1), 0.1, None)
+    pair_score = np.nan_to_num(score[rows] * weight)
+    total_weight = np.bincount(window_of, weights=weight, minlength=len(sizes))
+    weighted = np.bincount(window_of, weights=pair_score, minlength=len(sizes))
+    q_score = np.divide(weighted, total_weight, out=np.zeros(len(sizes)), where=total_weight > 0)
+
+    # 4. Context selection ภายใต้ token budget (คู่ในแต่ละ window เรียงเก่า -> ใหม่อยู่แล้ว)
+    selected = np.ones(len(rows), dtype=bool)
+    if context_tokens is not None:
+        priority = weight * (1 + np.abs(np.nan_to_num(score[rows])))
+        ranked = np.lexsort((-rows, -priority, window_of))
+        headline = _headline_keys(df)[order]
+        pair_key = window_of[ranked].astype(np.int64) * (headline.max() + 1) + headline[rows[ranked]]
+        unique = np.zeros(len(ranked), dtype=bool)
+        unique[np.unique(pair_key, return_index=True)[1]] = True
+        cost = np.where(unique, _line_tokens(lines, tokenizer)[rows[ranked]], 0)
+        used = np.cumsum(cost)
+        used -= np.repeat(used[win_start] - cost[win_start], sizes)
+        top = np.arange(len(ranked)) == np.repeat(win_start, sizes)
+        selected[ranked] = unique & ((used <= context_tokens) | top)
+    items = np.bincount(window_of, weights=selected, minlength=len(sizes)).astype(np.int64)
+
+    # 5. Context strings (ใหม่ -> เก่า) + ลำดับ sector ตามที่พบครั้งแรกในวันนั้น (เหมือน loop เดิม)
+    kept_lines = lines[rows[selected]]
+    contexts = ["".join(kept_lines[o:o + n][::-1]) for o, n in zip(np.cumsum(items) - items, items)]
+    first_seen = np.minimum.reduceat(position[rows], win_start) if len(rows) else np.empty(0)
+    signals = pd.DataFrame({
+        'date': np.asarray(target_dates, dtype=object)[win_date],
+        'sector': np.asarray(sectors, dtype=object)[win_sector],
+        'news_volume': sizes,
+        'q_score': q_score,
+        'news_context': contexts,
+        'context_items': items,
+        'context_dropped': sizes - items,
+        '_date': win_date,
+        '_first_seen': first_seen,
+    })
+    return signals.sort_values(['_date', '_first_seen'], kind='stable')[columns].reset_index(drop=True)
+
+def build_prompt(sector, q_score, news_context) -> str:
+    """
+    ส่วนคงที่ (role, instructions, output format) อยู่ต้น prompt ส่วนที่เปลี่ยนตาม job (sector, score, news feed)
+    อยู่ท้าย -> ทุก job มี prefix เดียวกัน prefill ครั้งเดียวต่อโมเดล (pipeline.prefix_cache)
+    """
+    return f"""
+Role: Senior Financial Analyst.
+Task: Analyze the market sentiment for the sector below with a focus on REAL-TIME MOMENTUM.
+
+Instructions:
+1. **Recency Bias:** Give significantly more weight to news from the last 2-3 days (Top of the list). Old news (7-10 days ago) should be treated as "Context" but not drivers.
+2. **Outlook:** Determine 'Bullish', 'Bearish', or 'Neutral'.
+3. **Score:** Score: Assign a precise sentiment score (0.0 - 10.0), e.g., 7.5 or 4.2.
+4. **Analysis:** Write a short executive summary (Max 3 sentences). Explicitly mention if the sentiment has shifted recently (e.g., "Started week strong but ended weak").
+
+Output strictly in JSON format:
+{{
+  "outlook": "Bearish" or "Bullish" or "Neutral",
+  "score": <float 0-10>,
+  "analysis": "<Max 3 sentences>"
+}}
+
+Sector: '{sector}'
+
+Quantitative Signal:
+- Time-Weighted Sentiment Score: {q_score:.2f} (Scale: -1.0 to +1.0)
+ (This score prioritizes recent news over older news)
+
+News Feed (Sorted by Recency - Newest First):
+{news_context}
+"""
+
+# ==========================================
+# 3. JOB LIST
+# ==========================================
+def build_jobs(expanded_df: pd.DataFrame, target_dates, context_tokens: Optional[int] = CONTEXT_TOKEN_BUDGET,
+               tokenizer=None) -> List[Dict]:
+    """
+    One job per (date, sector) with news in the lookback window.
+    Prompts ไม่ขึ้นกับโมเดล -> สร้างครั้งเดียวแล้วใช้กับทุกโมเดล
+    News Feed ถูกจำกัดที่ context_tokens (ดู sector_signals); context_dropped = ข่าวใน window ที่ไม่ได้อยู่ใน prompt
+    """
+    signals = sector_signals(expanded_df, target_dates, context_tokens, tokenizer)
+    return [{
+        'date': target_date.strftime('%Y-%m-%d'),
+        'sector': sector,
+        'news_volume': int(news_count),
+        'context_items': int(items),
+        'context_dropped': int(dropped),
+        'prompt': build_prompt(sector, q_score, news_context),
+    } for target_date, sector, news_count, q_score, news_context, items, dropped in signals.itertuples(index=False)]
+
+def parse_llm_response(response_text):
+    """พยายามดึง JSON จากคำตอบ -> (score, analysis, outlook)"""
+    try:
+        match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if match:
+            data = json.loads(match.group())
+            return data.get('score', 5.0), data.get('analysis', 'No analysis'), data.get('outlook', 'Neutral')
+    except Exception:
+        pass
+    return 5.0, "Error parsing output", "Neutral"
+
+# ==========================================
+# 4. BATCHED GENERATION
+# ==========================================
+def encode_prompts(tokenizer, prompts: List[str]) -> List[List[int]]:
+    texts = []
+    for prompt in prompts:
+        messages = [{"role": "user", "content": prompt}]
+        try:
+            texts.append(tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True))
+        except Exception:
+            texts.append(f"User: {prompt}\n\nAssistant:")
+    return tokenizer(texts, add_special_tokens=False)['input_ids']
+
+def run_model_jobs(model_name: str, jobs: List[Dict], timer: StageTimer, short_name: str = None,
+                   device: Optional[str] = None, max_batch_tokens: int = DEFAULT_BATCH_TOKENS,
+                   max_batch_size: int = 32, max_new_tokens: int = MAX_NEW_TOKENS,
+                   temperature: float = TEMPERATURE, model=None, tokenizer=None, cache=None,
+                   json_format: Optional[JsonFormat] = OUTLOOK_FORMAT, constrain: bool = True,
+                   prefix_cache: bool = True, overlap_depth: int = QUEUE_DEPTH, backend=None,
+                   models=None) -> List[str]:
+    """
+    Runs every (date, sector) job on one model in length-bucketed batches.
+    Returns raw responses aligned with `jobs`. The model is released afterwards
+    unless it was passed in.
+
+    With json_format (default OUTLOOK_FORMAT) each row stops as soon as its JSON object is closed
+    and leaves the batch; constrain=True also restricts the answer to the schema (see
+    pipeline.structured.generate_json). json_format=None generates to max_new_tokens as before.
+
+    prefix_cache=True prefills the prompt part every job shares (chat head + role / instructions,
+    see build_prompt) once and forks its KV cache for each batch (pipeline.prefix_cache).
+
+    Batches run through pipeline.overlap.run_pipelined: the timer gets prep / generate / post
+    stages (generate also carries Wall_s / Overlap_s); overlap_depth=0 runs them in one thread.
+
+    With an InferenceCache, jobs whose prompt (news window) did not change since the last
+    run are answered from the cache and the model is only loaded if something is missing.
+
+    backend: cuda / cpu / cpu-int8 / InferenceBackend (pipeline.backend, default MARKETMIND_BACKEND).
+    models: ModelPool / WorkerClient (pipeline.model_pool, pipeline.worker) ที่ถือโมเดลอุ่นไว้ -> ไม่โหลด / release เอง
+    """
+    short_name = short_name or model_name.split('/')[-1]
+    backend = models.backend if models is not None else get_backend(backend, device)
+    cache_key = backend.cache_model_key(model_name)
+    params = {'max_new_tokens': max_new_tokens, 'temperature': temperature}
+    if json_format is not None:
+        params['json'] = json_format.signature() if constrain else 'balanced-brace'
+    prompts = [job['prompt'] for job in jobs]
+
+    keys, responses = [None] * len(jobs), [None] * len(jobs)
+    if cache is not None:
+        with timer.stage('cache_lookup', model=short_name) as record:
+            keys, responses = cache.lookup(cache_key, PROMPT_VERSION, params, prompts)
+            record['Jobs'] = len(jobs)
+            record['Cache_Hits'] = sum(r is not None for r in responses)
+    misses = [i for i, r in enumerate(responses) if r is None]
+    if not misses:
+        return responses
+
+    owns_model = model is None and models is None
+    if models is not None:
+        with timer.stage('load', model=short_name) as record:
+            tokenizer = models.tokenizer(model_name)
+            record['Warm'] = not models.warm(model_name)['loaded']
+    elif owns_model:
+        with timer.stage('load', model=short_name):
+            model, tokenizer = load_model(model_name, backend=backend)
+
+    try:
+        with timer.stage('plan', model=short_name):
+            # วางแผน batch จากความยาวโดยประมาณ: render chat template + tokenize ทำต่อ batch ใน prep thread
+            head, tail = chat_parts(tokenizer)
+            estimates = estimate_lengths([prompts[i] for i in misses])
+            overhead = -(-len(head + tail) // CHARS_PER_TOKEN)
+            batches = plan_batches([n + overhead for n in estimates], max_batch_tokens, max_batch_size, max_new_tokens)
+            lengths = [0] * len(misses)
+            # prefix ร่วมของทุก job จากข้อความ (chat head + ต้น prompt ที่เหมือนกัน) -> KV ของ prefix prefill
+            # ครั้งเดียว (ใน pool: ครั้งเดียวต่อโมเดล); แต่ละ batch ใช้ส่วนที่ตรงกับ token จริงของ batch นั้น
+            prefix = template_prefix(tokenizer, head, [prompts[i] for i in misses], add_special_tokens=False) \
+                if prefix_cache else []
+            local_prefix = PrefixCache(model) if prefix_cache and models is None else None
+
+        def call(fn, *args, prefix_len=None, **kwargs):
+            if models is not None:
+                return models.call(model_name, fn.__name__, *args, prefix_len=prefix_len, **kwargs)
+            return fn(model, tokenizer, *args, prefix_cache=local_prefix, prefix_len=prefix_len, **kwargs)
+
+        def prepare(batch):
+            batch_sequences = encode_prompts(tokenizer, [prompts[misses[b]] for b in batch])
+            for b, seq in zip(batch, batch_sequences):
+                lengths[b] = len(seq)
+            return batch_sequences, (shared_prefix_length(prefix, batch_sequences) if prefix_cache else None)
+
+        def generate(inputs):
+            batch_sequences, prefix_len = inputs
+            if json_format is not None:
+                return call(generate_json, batch_sequences, max_new_tokens, json_format if constrain else None,
+                            temperature=temperature if temperature > 0 else None, prefix_len=prefix_len)
+            return call(generate_batch, batch_sequences, max_new_tokens, decode=False, prefix_len=prefix_len,
+                        do_sample=temperature > 0, temperature=temperature if temperature > 0 else None)
+
+        def post(batch, inputs, generated):
+            decoded, n_new = generated
+            if json_format is None:   # generate_batch คืน token ids -> decode ที่นี่ ไม่ใช่ใน thread ของโมเดล
+                decoded = decode_batch(tokenizer, decoded)
+            positions = [misses[b] for b in batch]
+            for p, text in zip(positions, decoded):
+                responses[p] = text
+            if cache is not None:
+                cache.store(cache_key, PROMPT_VERSION, [keys[p] for p in positions], decoded)
+            return n_new
+
+        # decode / cache.store ของ batch ก่อนหน้าทำใน worker thread ระหว่างที่โมเดล generate batch นี้ (stage prep / generate / post)
+        stats = run_pipelined(batches, prepare, generate, post, overlap_depth, timer, model=short_name)
+        record = timer.add('generate', model=short_name)
+        record['Jobs'] = len(misses)
+        record['Batches'] = len(batches)
+        record['Padding_Ratio'] = round(padding_stats(lengths, batches)['padding_ratio'], 3)
+        record['New_Tokens'] = sum(stats['results'])
+        record['Prefix_Tokens'] = len(prefix)
+        return responses
+    finally:
+        if owns_model:
+            del model, tokenizer
+            release_memory()
+            print(f"🧹 Unloaded {short_name} to free VRAM.")
+
+def collect_results(history_results: Dict, jobs: List[Dict], responses: List[str], short_name: str):
+    """เติมผลลงโครงสร้าง history_results[date][sector][short_name] (+ news_volume)"""
+    for job, response in zip(jobs, responses):
+        if response is None: continue
+        score, analysis, outlook = parse_llm_response(response)
+        try:
+            score = float(score)
+        except (TypeError, ValueError):
+            continue
+        sector_data = history_results.setdefault(job['date'], {}).setdefault(job['sector'], {})
+        sector_data[short_name] = {"score": score, "analysis": analysis, "outlook": outlook}
+        sector_data['news_volume'] = job['news_volume']
+    return history_results
+
+# ==========================================
+# 5. AGGREGATION
+# ==========================================
+def aggregate_history(history_results: Dict, model_configs: List[Dict]) -> pd.DataFrame:
+    """history_results -> ตาราง sector_daily_history_7days (weighted consensus ของทุกโมเดล)"""
+    final_rows = []
+    for date_str, sectors_data in history_results.items():
+        for sector, models_data in sectors_data.items():
+            row_data = {
+                'Report_Date': date_str,
+                'Sector': sector,
+                'News_Volume': models_data.get('news_volume', 0),
+            }
+
+            total_weighted_score = 0
+            total_model_weight = 0
+            for config in model_configs:
+                s_name = config['short_name']
+                m_weight = config['weight']
+                res = models_data.get(s_name, {"score": 5.0, "analysis": "N/A", "outlook": "N/A"})
+
+                row_data[f'Score_{s_name}'] = res['score']
+                row_data[f'Reason_{s_name}'] = res['analysis']
+                total_weighted_score += res['score'] * m_weight
+                total_model_weight += m_weight
+
+            final_score = total_weighted_score / total_model_weight if total_model_weight > 0 else 5.0
+            row_data['Final_Daily_Score'] = round(final_score, 2)
+
+            if final_score >= 6.5: row_data['Final_Outlook'] = 'Bullish'
+            elif final_score <= 3.5: row_data['Final_Outlook'] = 'Bearish'
+            else: row_data['Final_Outlook'] = 'Neutral'
+            final_rows.append(row_data)
+
+    df_history = pd.DataFrame(final_rows)
+    if not df_history.empty:
+        first = ['Report_Date', 'Sector', 'News_Volume']
+        df_history = df_history[first + [c for c in df_history.columns if c not in first]]
+        df_history = df_history.sort_values(by=['Report_Date', 'Final_Daily_Score'], ascending=[True, False])
+    return df_history
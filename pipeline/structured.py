@@ -0,0 +1,389 @@
+import json
+import re
+import weakref
+from typing import Dict, List, Optional, Sequence
+
+import torch
+
+from pipeline.prefix_cache import PrefixCache, prefill
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+CANDIDATES = 64        # ต่อแถวต่อ step: ลองเฉพาะ token ที่ logit สูงสุดเท่านี้ตัว (หลัง mask) ก่อน fallback
+NUMBER_TOKENS = 8      # token สูงสุดของค่าตัวเลขหนึ่งค่า
+_NUMBER_PREFIX = re.compile(r"-?(\d+(\.\d*)?)?")
+_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+_NUMBER_TOKEN = re.compile(r"\s?[-0-9.]+")
+
+# ==========================================
+# 2. OUTPUT FORMATS
+# ==========================================
+class Enum:
+    """ค่าที่เป็นหนึ่งใน values (string)"""
+
+    def __init__(self, values: Sequence[str]):
+        self.values = list(values)
+
+    def spec(self):
+        return {'enum': self.values}
+
+class Number:
+    """ตัวเลขทศนิยมใน [minimum, maximum] (ช่วงต้องครอบ 0: prefix ที่ยาวขึ้นมีค่าสัมบูรณ์ไม่ลดลง)"""
+
+    def __init__(self, minimum: float, maximum: float, max_tokens: int = NUMBER_TOKENS):
+        if not minimum <= 0 <= maximum:
+            raise ValueError(f"Number range [{minimum}, {maximum}] must include 0")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_tokens = max_tokens
+
+    def spec(self):
+        return {'number': [self.minimum, self.maximum]}
+
+class String:
+    """ข้อความอิสระ (ไม่มี " / backslash / control chars); max_tokens = token ที่กันไว้ให้เมื่อ field อยู่ต่อท้าย"""
+
+    def __init__(self, max_tokens: int = 0):
+        self.max_tokens = max_tokens
+
+    def spec(self):
+        return {'string': self.max_tokens}
+
+class JsonFormat:
+    """
+    JSON object ที่มี key ตามลำดับใน fields และค่าตามชนิด (Enum / Number / String)
+
+    ใช้กับ generate_json: โครง ({"key": ", ", ...) ถูกป้อนให้โมเดลเอง โมเดลเลือกเฉพาะค่า
+    -> ผลลัพธ์ json.loads ได้เสมอ และทุกค่าอยู่ใน enum / ช่วงที่กำหนด
+    """
+
+    def __init__(self, fields: Dict[str, object]):
+        self.fields = dict(fields)
+        self.keys = list(self.fields)
+
+    def signature(self) -> str:
+        """ใช้เป็นส่วนหนึ่งของ cache key ของคำตอบ"""
+        return json.dumps({k: v.spec() for k, v in self.fields.items()}, sort_keys=False)
+
+    def literals(self) -> List[str]:
+        """
+        ข้อความคงที่ระหว่างค่า: literals[i] อยู่ก่อนค่าของ key i, literals[-1] ปิด object
+        ค่าที่เป็น string/enum มี " เปิดอยู่ท้าย literal ก่อนหน้า และ " ปิดอยู่ต้น literal ถัดไป
+        """
+        quoted = [not isinstance(self.fields[k], Number) for k in self.keys]
+        out = []
+        for i, key in enumerate(self.keys):
+            close = '"' if i and quoted[i - 1] else ''
+            sep = '{' if i == 0 else ', '
+            out.append(f'{close}{sep}"{key}": ' + ('"' if quoted[i] else ''))
+        out.append(('"' if quoted[-1] else '') + '}')
+        return out
+
+    def __repr__(self):
+        return f"JsonFormat({self.signature()})"
+
+# ==========================================
+# 3. TOKEN TABLES (ต่อ tokenizer, สร้างครั้งเดียว)
+# ==========================================
+_TABLES = weakref.WeakKeyDictionary()
+
+class _Vocab:
+    def __init__(self, tokenizer, size: int):
+        texts = tokenizer.batch_decode([[i] for i in range(len(tokenizer))], skip_special_tokens=False)
+        self.texts = texts + [''] * max(size - len(texts), 0)
+        special = set(tokenizer.all_special_ids)
+        eos = tokenizer.eos_token_id
+        self.eos = set(eos if isinstance(eos, (list, tuple)) else [eos])
+        plain = [i not in special and t != '' for i, t in enumerate(self.texts)]
+        self.number = torch.tensor([p and bool(_NUMBER_TOKEN.fullmatch(t)) for p, t in zip(plain, self.texts)])
+        self.string = torch.tensor([p and '\\' not in t and not any(ord(c) < 32 for c in t)
+                                    and ('"' not in t or t.startswith('"')) for p, t in zip(plain, self.texts)])
+        self.quote_end = torch.tensor([p and t.startswith('"') for p, t in zip(plain, self.texts)])
+        self._starts = {}
+        self._tries = {}
+        self.tokenizer = tokenizer
+
+    def starts_with(self, char: str) -> torch.Tensor:
+        """token ที่ (หลังตัดช่องว่างหน้า) ขึ้นต้นด้วย char: ใช้เป็นตัวจบค่าตัวเลข (, หรือ })"""
+        if char not in self._starts:
+            self._starts[char] = torch.tensor([t.lstrip().startswith(char) for t in self.texts])
+        return self._starts[char]
+
+    def encode(self, text: str) -> List[int]:
+        return self.tokenizer(text, add_special_tokens=False)['input_ids']
+
+    def trie(self, values: Sequence[str]) -> Dict:
+        """token trie ของค่า enum: node = {'children': {token: node}, 'value': ค่าที่จบที่ node นี้, 'first': ค่าแรกที่ไปถึงได้}"""
+        key = tuple(values)
+        if key not in self._tries:
+            root = {'children': {}, 'value': None, 'first': values[0]}
+            for value in values:
+                node = root
+                for token in self.encode(value):
+                    node = node['children'].setdefault(token, {'children': {}, 'value': None, 'first': value})
+                node['value'] = value
+            self._tries[key] = root
+        return self._tries[key]
+
+def _vocab(tokenizer, size: int) -> _Vocab:
+    vocab = _TABLES.get(tokenizer)
+    if vocab is None or len(vocab.texts) < size:
+        vocab = _TABLES[tokenizer] = _Vocab(tokenizer, size)
+    return vocab
+
+# ==========================================
+# 4. PER-ROW DECODING STATE
+# ==========================================
+class _BraceRow:
+    """หยุดเมื่อ { ตัวแรกถูกปิดครบ (นับเฉพาะวงเล็บนอก string) หรือเจอ eos"""
+
+    def __init__(self):
+        self.tokens = []
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escape = False
+        self.done = False
+
+    def push(self, token: int, text: str, eos) -> None:
+        self.tokens.append(token)
+        if token in eos:
+            self.done = True
+            return
+        for char in text:
+            if self.in_string:
+                if self.escape: self.escape = False
+                elif char == '\\': self.escape = True
+                elif char == '"': self.in_string = False
+            elif char == '"' and self.started:
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+                self.started = True
+            elif char == '}' and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.done = True
+                    return
+
+class _SchemaRow:
+    """
+    ตำแหน่งใน JsonFormat: field ปัจจุบัน, token ที่ต้องป้อนให้ (literal), ค่าที่สะสมอยู่
+    """
+
+    def __init__(self, fmt: JsonFormat):
+        self.fmt = fmt
+        self.field = 0
+        self.forced = []
+        self.values = {}
+        self.value_tokens = []
+        self.text = ''
+        self.node = None
+        self.used = 0
+        self.done = False
+
+    def finish_value(self, fields, literal_tokens, vocab) -> None:
+        """ปิดค่าของ field ปัจจุบัน (ใช้ค่าที่สะสมไว้ หรือ fallback ที่ valid) แล้วไป field ถัดไป"""
+        key = self.fmt.keys[self.field]
+        kind = fields[self.field]
+        if isinstance(kind, Enum):
+            node = self.node or vocab.trie(kind.values)
+            self.values[key] = node['value'] if node['value'] is not None else node['first']
+        elif isinstance(kind, Number):
+            text = self.text.rstrip('.') if _NUMBER.fullmatch(self.text.rstrip('.')) else '0'
+            self.values[key] = float(text)
+        else:
+            self.values[key] = vocab.tokenizer.decode(self.value_tokens, skip_special_tokens=True).strip()
+        self.field += 1
+        self.value_tokens, self.text, self.node = [], '', None
+        if self.field == len(fields):
+            self.done = True
+        else:
+            self.forced = list(literal_tokens[self.field])
+
+    def output(self) -> str:
+        return json.dumps(self.values, ensure_ascii=False)
+
+def _number_ok(kind: Number, text: str) -> bool:
+    if not _NUMBER_PREFIX.fullmatch(text):
+        return False
+    if text in ('', '-'):
+        return text == '' or kind.minimum < 0
+    value = float(text.rstrip('.'))
+    return kind.minimum <= value <= kind.maximum
+
+def _choose_value(row: _SchemaRow, kind, ranked: List[int], vocab: _Vocab, end_mask: torch.Tensor):
+    """
+    token ที่ rank ดีที่สุดที่ยังทำให้ค่า valid -> (token, ends_value)
+    token=None หมายถึงจบค่าโดยไม่ป้อน token นี้ (โมเดลเลือกตัวจบ -> ป้อน literal ถัดไปแทน)
+    """
+    if isinstance(kind, Enum):
+        children = row.node['children']
+        for token in ranked:
+            if token in children:
+                child = children[token]
+                return token, not child['children']
+            if row.node['value'] is not None and (bool(end_mask[token]) or token in vocab.eos):
+                return None, True
+        if children:   # ไม่มีตัวเลือกใน candidates: เดินกิ่งแรก (valid เสมอ)
+            token, child = next(iter(children.items()))
+            return token, not child['children']
+        return None, True
+
+    if isinstance(kind, Number):
+        complete = bool(_NUMBER.fullmatch(row.text))
+        for token in ranked:
+            text = vocab.texts[token]
+            if complete and (bool(end_mask[token]) or token in vocab.eos):
+                return None, True
+            if bool(vocab.number[token]):
+                candidate = row.text + (text.lstrip() if row.text == '' else text)
+                if ' ' not in candidate and _number_ok(kind, candidate):
+                    return token, len(row.value_tokens) + 1 >= kind.max_tokens
+        return None, True
+
+    for token in ranked:   # String
+        if bool(vocab.quote_end[token]) or token in vocab.eos:
+            return None, True
+        if bool(vocab.string[token]):
+            return token, False
+    return None, True
+
+# ==========================================
+# 5. GENERATION
+# ==========================================
+def _forward(model, input_ids, attention_mask, past):
+    position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)[:, -input_ids.shape[1]:]
+    with torch.no_grad():
+        out = model(input_ids=input_ids, attention_mask=attention_mask, position_ids=position_ids,
+                    past_key_values=past, use_cache=True)
+    return out.logits[:, -1, :].float(), out.past_key_values
+
+def _ranked(logits: torch.Tensor, temperature: Optional[float], k: int) -> List[List[int]]:
+    """candidates เรียงจากดีไปแย่ต่อแถว: greedy = logit, sampling = Gumbel top-k (สุ่มแบบไม่ซ้ำตามสัดส่วน softmax)"""
+    if temperature:
+        finite = torch.isfinite(logits)
+        noise = -torch.log(-torch.log(torch.rand_like(logits).clamp_(1e-10, 1.0)))
+        logits = torch.where(finite, logits / temperature + noise, logits)
+    return torch.topk(logits, min(k, logits.shape[-1]), dim=-1).indices.tolist()
+
+def generate_json(model, tokenizer, sequences: List[List[int]], max_new_tokens: int,
+                  json_format: Optional[JsonFormat] = None, temperature: Optional[float] = None,
+                  candidates: int = CANDIDATES, prefix_cache: Optional[PrefixCache] = None,
+                  prefix_len: Optional[int] = None):
+    """
+    Structured-output generation for prompts that ask for one JSON object.
+
+    - json_format=None: หยุดแต่ละแถวทันทีที่ { ตัวแรกถูกปิดครบ (balanced braces) หรือ eos
+    - json_format: schema-constrained — ป้อนโครง JSON ให้เอง, ค่า enum เลือกได้เฉพาะ token ใน trie ของค่าที่อนุญาต,
+      ตัวเลขต้องเป็น prefix ที่ valid และอยู่ในช่วง, string จบที่ " -> ผลลัพธ์ json.loads ได้ทุกแถว
+      (ถ้า token หมด ค่าที่ค้างอยู่ถูกปิดด้วยค่าที่ valid)
+
+    แถวที่จบแล้วถูกตัดออกจาก batch (และ KV cache) ทันที ไม่ต้องรอแถวอื่นจน max_new_tokens
+    prefix_cache / prefix_len: prefill เฉพาะ suffix ต่อจาก KV ของ prefix ร่วม (pipeline.prefix_cache)
+    Returns (texts, number of generated tokens) เหมือน generate_batch.
+    """
+    if not sequences:
+        return [], 0
+    device = model.device
+    if json_format is not None:
+        fields = [json_format.fields[k] for k in json_format.keys]
+        literals = json_format.literals()
+        literal_tokens = [tokenizer(text, add_special_tokens=False)['input_ids'] for text in literals]
+        sequences = [list(s) + literal_tokens[0] for s in sequences]
+
+    out, attention_mask = prefill(model, sequences, tokenizer.pad_token_id, prefix_cache, prefix_len)
+    logits, past = out.logits[:, -1, :].float(), out.past_key_values
+    vocab = _vocab(tokenizer, logits.shape[-1])
+    eos = torch.zeros(logits.shape[-1], dtype=torch.bool)
+    eos[[t for t in vocab.eos if t is not None and t < logits.shape[-1]]] = True
+
+    if json_format is None:
+        rows = [_BraceRow() for _ in sequences]
+    else:
+        # reserve[i] = token ที่ต้องเหลือไว้ให้ literal + ค่าของ field หลัง i; ends[i] = token ที่จบค่าของ field i
+        reserve = [0] * len(fields)
+        for i in range(len(fields) - 2, -1, -1):
+            kind = fields[i + 1]
+            size = max(len(vocab.encode(v)) for v in kind.values) if isinstance(kind, Enum) else kind.max_tokens
+            reserve[i] = reserve[i + 1] + len(literal_tokens[i + 1]) + size
+        ends, allowed = [], []
+        for i, kind in enumerate(fields):
+            end = vocab.starts_with(literals[i + 1].lstrip()[0]) if isinstance(kind, Number) else vocab.quote_end
+            ends.append(end)
+            value = vocab.number if isinstance(kind, Number) else vocab.string
+            allowed.append((value | end | eos).to(device) if not isinstance(kind, Enum) else None)
+        ends_device = [(end | eos).to(device) for end in ends]
+        rows = [_SchemaRow(json_format) for _ in sequences]
+        for row in rows:
+            row.node = vocab.trie(fields[0].values) if isinstance(fields[0], Enum) else None
+
+    active = list(range(len(rows)))
+    for step in range(max_new_tokens):
+        next_tokens = []
+        if json_format is None:
+            for row_id, choice in zip(active, _ranked(logits, temperature, 1)):
+                rows[row_id].push(choice[0], vocab.texts[choice[0]], vocab.eos)
+                next_tokens.append(choice[0])
+        else:
+            # mask ต่อแถวตาม field ปัจจุบัน (แถวที่กำลังป้อน literal ไม่ใช้ logits)
+            mask = torch.zeros_like(logits, dtype=torch.bool)
+            for r, row_id in enumerate(active):
+                row = rows[row_id]
+                if row.forced: continue
+                if allowed[row.field] is not None:
+                    mask[r] = allowed[row.field]
+                else:
+                    mask[r, list(row.node['children'])] = True
+                    if row.node['value'] is not None: mask[r] |= ends_device[row.field]
+            ranked = _ranked(logits.masked_fill(~mask, float('-inf')), temperature, candidates)
+
+            for r, row_id in enumerate(active):
+                row = rows[row_id]
+                token = row.forced.pop(0) if row.forced else None
+                if token is None:
+                    kind = fields[row.field]
+                    if row.used >= max_new_tokens - reserve[row.field]:
+                        ends_value = True
+                    else:
+                        token, ends_value = _choose_value(row, kind, ranked[r], vocab, ends[row.field])
+                    if token is not None:
+                        row.value_tokens.append(token)
+                        if isinstance(kind, Number):
+                            text = vocab.texts[token]
+                            row.text += text.lstrip() if row.text == '' else text
+                        elif isinstance(kind, Enum):
+                            row.node = row.node['children'][token]
+                    if ends_value:
+                        row.finish_value(fields, literal_tokens, vocab)
+                        if not row.done and isinstance(fields[row.field], Enum):
+                            row.node = vocab.trie(fields[row.field].values)
+                        if token is None and not row.done:   # โมเดลเลือกตัวจบ -> ป้อน literal ถัดไปแทน
+                            token = row.forced.pop(0)
+                if token is not None:
+                    row.used += 1
+                while row.used >= max_new_tokens and not row.done:
+                    row.finish_value(fields, literal_tokens, vocab)
+                next_tokens.append(tokenizer.pad_token_id if token is None else token)
+
+        keep = [r for r, row_id in enumerate(active) if not rows[row_id].done]
+        if not keep or step == max_new_tokens - 1:
+            break
+        if len(keep) < len(active):   # retire แถวที่จบแล้วออกจาก batch + KV cache
+            index = torch.tensor(keep, device=device)
+            past.batch_select_indices(index)
+            attention_mask = attention_mask[index]
+            next_tokens = [next_tokens[r] for r in keep]
+            active = [active[r] for r in keep]
+        step_ids = torch.tensor(next_tokens, device=device).unsqueeze(1)
+        attention_mask = torch.cat([attention_mask, attention_mask.new_ones((len(active), 1))], dim=1)
+        logits, past = _forward(model, step_ids, attention_mask, past)
+
+    if json_format is not None:
+        for row in rows:
+            while not row.done:
+                row.finish_value(fields, literal_tokens, vocab)
+        return [row.output() for row in rows], sum(row.used for row in rows)
+    texts = [tokenizer.decode([t for t in row.tokens if t not in vocab.eos], skip_special_tokens=True) for row in rows]
+    return texts, sum(len(row.tokens) for row in rows)
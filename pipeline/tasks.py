@@ -0,0 +1,178 @@
+import json
+from typing import Any, List
+
+import pandas as pd
+
+from pipeline.logit_scoring import LOGIT_PARAMS, SENTIMENT_LABELS
+from pipeline.structured import Enum, JsonFormat, Number
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+EXISTING_SECTORS = [
+    'Financials', 'Technology', 'Healthcare', 'Consumer Cyclical',
+    'Energy', 'Industrials', 'Basic Materials', 'Communication Services',
+    'Utilities', 'Consumer Defensive', 'Real Estate'
+]
+
+ARTICLE_CHARS = 3000   # ตัดเนื้อหาข่าวเท่ากับ Full_Text ของ Sentiment stage
+TASK_SEPARATOR = "\n\n"
+
+# ==========================================
+# 2. SHARED ARTICLE PREFIX
+# ==========================================
+def build_article(title: Any, content: Any) -> str:
+    """
+    ส่วนข่าวที่ทุก task ใช้ร่วมกัน (tokenize ครั้งเดียวต่อข่าว แล้วต่อหลังคำสั่งของแต่ละ task)
+    """
+    title = '' if pd.isna(title) else str(title)
+    content = '' if pd.isna(content) else str(content)
+    return f'News: "{title}"\n{content[:ARTICLE_CHARS]}'
+
+def task_prompt(title: Any, content: Any, task: 'InferenceTask') -> str:
+    """
+    ข้อความ user เต็มของ task (คำสั่ง + ข่าว) ก่อนใส่ chat template — ใช้เป็น key ของ cache
+    คำสั่งมาก่อนข่าว: chat head + คำสั่งเป็น prefix ที่ทุกแถวของ task เหมือนกัน -> KV ของ prefix ใช้ซ้ำได้
+    (pipeline.prefix_cache)
+    """
+    return task.instruction + TASK_SEPARATOR + build_article(title, content)
+
+# ==========================================
+# 3. PARSERS
+# ==========================================
+def _extract_json(response: str):
+    clean = response.replace("```json", "").replace("```", "").strip()
+    start, end = clean.find('{'), clean.rfind('}') + 1
+    if start == -1 or end == 0:
+        return None
+    try:
+        return json.loads(clean[start:end])
+    except json.JSONDecodeError:
+        return None
+
+def sanitize_sector_output(sector: Any) -> str:
+    if isinstance(sector, list): return ",".join([str(s) for s in sector])
+    elif isinstance(sector, dict): return str(sector)
+    return str(sector)
+
+def parse_sector(response: str) -> str:
+    """{"sector": ...} ในข้อความอิสระ -> ชื่อ sector (Other ถ้า parse ไม่ได้)"""
+    data = _extract_json(response)
+    if not isinstance(data, dict):
+        return "Other"
+    return sanitize_sector_output(data.get("sector", "Other"))
+
+def parse_sentiment_score(response: str) -> float:
+    """{"category": ..., "score": -1..1} ในข้อความอิสระ -> score (0.0 = Neutral ถ้า parse ไม่ได้)"""
+    data = _extract_json(response)
+    if isinstance(data, dict):
+        try:
+            return float(data.get("score", 0.0))
+        except (TypeError, ValueError):
+            return 0.0
+    # Fallback keyword matching
+    if "positive" in response.lower(): return 0.5
+    if "negative" in response.lower(): return -0.5
+    return 0.0
+
+def parse_sector_json(response: str) -> str:
+    """
+    คำตอบของ generate_json(sector_format) -> ชื่อ sector
+    schema บังคับให้ json.loads ได้และค่าอยู่ใน enum ทุกแถว -> ไม่มี fallback: parse ไม่ได้คือ bug ให้ raise
+    """
+    return sanitize_sector_output(json.loads(response)['sector'])
+
+def parse_sentiment_json(response: str) -> float:
+    """คำตอบของ generate_json(SENTIMENT_FORMAT) / label_responses -> score (ไม่มี fallback เหมือน parse_sector_json)"""
+    return float(json.loads(response)['score'])
+
+def clean_summary(response: str) -> str:
+    return response.strip().replace('\n', ' ')
+
+# ==========================================
+# 4. TASK DEFINITIONS
+# ==========================================
+class InferenceTask:
+    """
+    One generation task run by ModelTaskRunner over the shared tokenized articles.
+
+    instruction    : ข้อความก่อนข่าว (เหมือนกันทุกข่าว -> tokenize + prefill ครั้งเดียวต่อ task)
+    parse          : แปลงข้อความที่โมเดลตอบเป็นค่าที่จะบันทึก
+    select         : (optional) callable(df) -> bool mask ของแถวที่ต้องทำ task นี้
+    version        : prompt template version (เปลี่ยนเมื่อแก้ instruction -> cache เก่าไม่ถูกใช้)
+    json_format    : (optional) JsonFormat ของคำตอบ -> generate ด้วย pipeline.structured.generate_json
+    constrain      : True = schema-constrained decoding, False = แค่หยุดที่ } ที่ปิด object
+                     (คำตอบอาจไม่ใช่ JSON -> ใช้ parser แบบมี fallback เช่น parse_sentiment_score)
+    score_labels   : (optional) {label: value} -> ไม่ generate: prefill ครั้งเดียวแล้วอ่าน logits ของ label
+                     (pipeline.logit_scoring.label_responses)
+    """
+
+    def __init__(self, name: str, instruction: str, max_new_tokens: int, parse, select=None,
+                 version: str = 'v1', json_format: JsonFormat = None, constrain: bool = True,
+                 score_labels: dict = None):
+        self.name = name
+        self.instruction = instruction
+        self.max_new_tokens = max_new_tokens
+        self.parse = parse
+        self.select = select
+        self.version = version
+        self.json_format = json_format
+        self.constrain = constrain
+        self.score_labels = score_labels
+
+    def params(self) -> dict:
+        """generation params ที่เป็นส่วนหนึ่งของ cache key"""
+        if self.score_labels is not None:
+            return {**LOGIT_PARAMS, 'labels': self.score_labels}
+        params = {'max_new_tokens': self.max_new_tokens, 'do_sample': False}
+        if self.json_format is not None:
+            params['json'] = self.json_format.signature() if self.constrain else 'balanced-brace'
+        return params
+
+    def __repr__(self):
+        return f"InferenceTask({self.name!r}, max_new_tokens={self.max_new_tokens})"
+
+def _needs_llm_sector(df: pd.DataFrame) -> pd.Series:
+    if 'Sector' not in df.columns:
+        return pd.Series(True, index=df.index)
+    return (df['Sector'] == 'Other') | df['Sector'].isna()
+
+def sector_format(sectors: List[str] = EXISTING_SECTORS) -> JsonFormat:
+    """{"sector": หนึ่งใน sectors หรือ Other}"""
+    return JsonFormat({'sector': Enum(list(sectors) + ['Other'])})
+
+def sector_task(sectors: List[str] = EXISTING_SECTORS) -> InferenceTask:
+    """LLM fallback ของ TF-IDF: ทำเฉพาะข่าวที่ Sector เป็น Other / NaN"""
+    instruction = f"""Classify the news below into JSON.
+Sectors: {json.dumps(sectors)}
+If unrelated, use "Other".
+Format: {{"sector": "..."}}"""
+    return InferenceTask(
+        'sector', instruction, max_new_tokens=40, parse=parse_sector_json, select=_needs_llm_sector,
+        version='sector-v2', json_format=sector_format(sectors),
+    )
+
+SENTIMENT_FORMAT = JsonFormat({'category': Enum(['Positive', 'Negative', 'Neutral']), 'score': Number(-1.0, 1.0)})
+
+def sentiment_task(mode: str = 'generate') -> InferenceTask:
+    """mode='generate': ตอบ JSON (schema-constrained), mode='logits': score จาก logits ของ label ใน prefill เดียว"""
+    instruction = """Analyze the sentiment of the financial news below.
+Consider the impact on the company, sector, or economy mentioned.
+
+Return ONLY a JSON object with this format:
+{
+  "category": "Positive" or "Negative" or "Neutral",
+  "score": <float number between -1.0 to 1.0>
+}"""
+    if mode == 'logits':
+        return InferenceTask('sentiment', instruction, max_new_tokens=0, parse=parse_sentiment_json,
+                             version='sentiment-v2', score_labels=SENTIMENT_LABELS)
+    if mode != 'generate':
+        raise ValueError(f"Unknown sentiment mode: {mode!r} (expected 'generate' or 'logits')")
+    return InferenceTask('sentiment', instruction, max_new_tokens=80, parse=parse_sentiment_json,
+                         version='sentiment-v2', json_format=SENTIMENT_FORMAT)
+
+def summary_task() -> InferenceTask:
+    instruction = "Task: Summarize the financial news below into 1 sentence."
+    return InferenceTask('summary', instruction, max_new_tokens=60, parse=clean_summary,
+                         version='summary-v2')
@@ -0,0 +1,60 @@
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# ==========================================
+# STAGE TIMER
+# ==========================================
+class StageTimer:
+    """
+    Wall-clock time per pipeline stage.
+
+        timer = StageTimer()
+        with timer.stage('load', model='Qwen'):
+            ...
+        timer.report()   # DataFrame: Stage, <labels>, Seconds, <extra counters>
+
+    Repeated stages with the same labels are accumulated.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.labels = []
+
+    @contextmanager
+    def stage(self, name: str, **labels):
+        record = self._record(name, labels)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['Seconds'] += time.perf_counter() - start
+
+    def add(self, name: str, seconds: float = 0.0, **labels):
+        """บันทึกเวลาที่วัดมาเองจากที่อื่น (เช่น stats ของ runner) -> record (เติม counter เพิ่มได้)"""
+        record = self._record(name, labels)
+        record['Seconds'] += seconds
+        return record
+
+    def _record(self, name, labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.labels += [k for k in labels if k not in self.labels]
+        if key not in self.records:
+            self.records[key] = {'Stage': name, **labels, 'Seconds': 0.0}
+        return self.records[key]
+
+    def report(self) -> pd.DataFrame:
+        df = pd.DataFrame(list(self.records.values()))
+        if df.empty:
+            return df
+        first = ['Stage'] + self.labels + ['Seconds']
+        return df[first + [c for c in df.columns if c not in first]]
+
+    def print_report(self, title: str = "⏱️ Stage timings"):
+        df = self.report()
+        print(f"\n{title}")
+        if not df.empty:
+            total = df['Seconds'].sum()
+            print(df.round(3).to_string(index=False))
+            print(f"   Total: {total:.2f}s")
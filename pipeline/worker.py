@@ -0,0 +1,347 @@
+import argparse
+import os
+import pickle
+import queue
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Optional, Tuple, Union
+
+from pipeline.backend import get_backend
+from pipeline.checkpoint import CHECKPOINT_DIR
+from pipeline.inference import load_tokenizer
+from pipeline.model_pool import ModelPool
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+WORKER_ENV = "MARKETMIND_WORKER"          # off (default) | auto | host:port | /path/to/socket  (ดู model_service)
+AUTHKEY_ENV = "MARKETMIND_WORKER_KEY"     # override key ในไฟล์ (ไม่ตั้ง = key สุ่มของ user ใน KEY_PATH)
+# socket + key อยู่ใน directory 0700 ของ user นี้ -> user / process อื่นในเครื่องต่อ worker ไม่ได้
+WORKER_DIR = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or os.path.expanduser(os.path.join('~', '.config')),
+                          'marketmind')
+DEFAULT_ADDRESS = os.path.join(WORKER_DIR, 'worker.sock')   # AF_UNIX socket
+KEY_PATH = os.path.join(WORKER_DIR, 'worker.key')
+LOG_PATH = os.path.join(CHECKPOINT_DIR, 'inference_worker.log')
+START_TIMEOUT = 120                       # วินาทีที่รอ worker ที่เปิดใหม่ให้รับ connection
+MODEL_OPS = ('call', 'warm', 'release')   # op ที่แตะโมเดล -> เข้าคิวของ model thread ตามลำดับ
+
+Address = Union[str, Tuple[str, int]]     # path ของ AF_UNIX socket หรือ (host, port) แบบ TCP
+
+def _private_dir(path: str) -> str:
+    """directory ที่เปิดได้เฉพาะ user นี้ (0700); ของ user อื่น -> PermissionError"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+def _authkey() -> bytes:
+    """
+    key ของ handshake: MARKETMIND_WORKER_KEY หรือ key สุ่มต่อ user ใน KEY_PATH (0600, สร้างตอนใช้ครั้งแรก)
+    ไม่มี key คงที่ -> คนที่อ่านไฟล์ของ user นี้ไม่ได้ก็ส่ง pickle เข้า worker ไม่ได้
+    """
+    if os.environ.get(AUTHKEY_ENV):
+        return os.environ[AUTHKEY_ENV].encode()
+    directory = _private_dir(os.path.dirname(KEY_PATH))
+    if not os.path.exists(KEY_PATH):
+        fd, tmp_path = tempfile.mkstemp(dir=directory)   # mkstemp = 0600
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(secrets.token_hex(32))
+            os.link(tmp_path, KEY_PATH)                  # atomic: process แรกที่ link ได้เป็นคนกำหนด key
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp_path)
+    if os.stat(KEY_PATH).st_mode & 0o077:
+        raise PermissionError(f"{KEY_PATH} must be readable by its owner only (chmod 600)")
+    with open(KEY_PATH) as f:
+        return f.read().strip().encode()
+
+def _parse_address(text: str) -> Address:
+    """'host:port' -> TCP, อย่างอื่น -> path ของ AF_UNIX socket"""
+    host, sep, port = text.rpartition(':')
+    if sep and port.isdigit() and os.sep not in text:
+        return host or '127.0.0.1', int(port)
+    return text
+
+def _format_address(address: Address) -> str:
+    return address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+def _sendable(exc: BaseException) -> BaseException:
+    """exception ที่ pickle ไม่ได้ -> RuntimeError ที่มีข้อความเดิม"""
+    try:
+        pickle.dumps(exc)
+        return exc
+    except Exception:
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+# ==========================================
+# 2. WORKER PROCESS
+# ==========================================
+class InferenceWorker:
+    """
+    Long-lived inference process: ModelPool ของโมเดลที่โหลดค้างไว้ + AF_UNIX socket (multiprocessing.connection)
+
+        python -m pipeline.worker --backend cuda --budget-gb 60 --preload Qwen/Qwen2.5-14B-Instruct
+
+    socket อยู่ใน directory 0700 และ handshake ใช้ key ของ user (_authkey) -> รับงานเฉพาะ process ของ user นี้
+
+    แต่ละ connection มี thread ของตัวเอง; งานที่แตะโมเดล (call / warm / release) เข้าคิวเดียวและทำทีละงานใน
+    model thread (GPU ไม่ถูกแย่ง) -> queue_depth ใน stats() = งานที่รออยู่; stats / shutdown ตอบทันที
+    """
+
+    def __init__(self, pool: ModelPool, address: Address = DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+        self.pool = pool
+        self.address = address if isinstance(address, str) else tuple(address)
+        self.authkey = authkey or _authkey()
+        self._jobs = queue.Queue()
+        self._stop = threading.Event()
+        self._running = None
+        self.started = time.time()
+        self.counters = {'served': 0, 'errors': 0, 'busy_seconds': 0.0}
+
+    def serve_forever(self):
+        model_thread = threading.Thread(target=self._run_jobs, name='worker-model', daemon=True)
+        self._claim_socket()
+        model_thread.start()
+        with Listener(self.address, authkey=self.authkey) as listener:
+            if isinstance(self.address, str):
+                os.chmod(self.address, 0o600)
+            print(f"🔥 Inference worker on {_format_address(self.address)} "
+                  f"({self.pool.backend.name}, budget {self.pool.budget_bytes / 2**30:.1f} GB)", flush=True)
+            while not self._stop.is_set():
+                try:
+                    conn = listener.accept()
+                except Exception as exc:   # authkey ผิด / client หลุดระหว่าง handshake
+                    print(f"⚠️ Rejected connection: {exc}", flush=True)
+                    continue
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+        self._jobs.put(None)
+        model_thread.join()
+        self.pool.clear()
+        print("👋 Inference worker stopped", flush=True)
+
+    def _claim_socket(self):
+        """AF_UNIX: สร้าง directory 0700 และลบ socket ค้างของ worker ที่ตายไปแล้ว (worker ที่ยังรันอยู่ -> error)"""
+        if not isinstance(self.address, str):
+            return
+        _private_dir(os.path.dirname(os.path.abspath(self.address)))
+        if os.path.exists(self.address):
+            if connect_worker(self.address, self.authkey) is not None:
+                raise RuntimeError(f"An inference worker is already running on {self.address}")
+            os.unlink(self.address)
+
+    def _run_jobs(self):
+        """thread เดียวที่ใช้โมเดล: ทำงานในคิวตามลำดับที่เข้ามา"""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            op, args, kwargs, reply = job
+            self._running = {'op': op, 'model': args[0] if args else None, 'since': time.time()}
+            start = time.perf_counter()
+            try:
+                result = ('ok', getattr(self.pool, op)(*args, **kwargs))
+            except Exception as exc:
+                self.counters['errors'] += 1
+                result = ('error', _sendable(exc))
+            self.counters['busy_seconds'] += time.perf_counter() - start
+            self.counters['served'] += 1
+            self._running = None
+            reply.put(result)
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    op, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if op in MODEL_OPS:
+                    reply = queue.Queue(maxsize=1)
+                    self._jobs.put((op, args, kwargs, reply))
+                    result = reply.get()
+                elif op == 'stats':
+                    result = ('ok', self.stats())
+                elif op == 'shutdown':
+                    self._stop.set()
+                    conn.send(('ok', True))
+                    self._wake()
+                    return
+                else:
+                    result = ('error', ValueError(f"Unknown worker op {op!r}"))
+                conn.send(result)
+
+    def _wake(self):
+        """ปลุก listener.accept() ที่ค้างอยู่ให้เห็น stop"""
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict:
+        return {**self.pool.stats(), 'queue_depth': self._jobs.qsize(), 'running': self._running,
+                'uptime_seconds': round(time.time() - self.started, 1), **self.counters}
+
+# ==========================================
+# 3. CLIENT (same interface as ModelPool)
+# ==========================================
+class WorkerClient:
+    """
+    Connection ของ stage ไปยัง InferenceWorker: call / warm / release / stats / tokenizer เหมือน ModelPool
+    (ส่งเป็น models= ให้ ModelTaskRunner / run_model_jobs ได้เลย). ส่งแค่ token ids ไปและข้อความกลับ;
+    tokenizer โหลดฝั่ง client (ไม่ต้องโหลด weights)
+    """
+
+    def __init__(self, address: Address = DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+        self.address = address if isinstance(address, str) else tuple(address)
+        self._conn = Client(self.address, authkey=authkey or _authkey())
+        self._lock = threading.Lock()
+        self._tokenizers = {}
+        self.backend = get_backend(self.stats()['backend'])
+
+    def _request(self, op: str, *args, **kwargs):
+        with self._lock:
+            self._conn.send((op, args, kwargs))
+            status, value = self._conn.recv()
+        if status == 'error':
+            raise value
+        return value
+
+    def call(self, model_name: str, fn_name: str, sequences, *args, prefix_len: Optional[int] = None, **kwargs):
+        return self._request('call', model_name, fn_name, [list(s) for s in sequences], *args,
+                             prefix_len=prefix_len, **kwargs)
+
+    def warm(self, model_name: str) -> Dict:
+        return self._request('warm', model_name)
+
+    def release(self, model_name: str) -> bool:
+        return self._request('release', model_name)
+
+    def stats(self) -> Dict:
+        return self._request('stats')
+
+    def shutdown(self):
+        self._request('shutdown')
+        self.close()
+
+    def tokenizer(self, model_name: str):
+        if model_name not in self._tokenizers:
+            self._tokenizers[model_name] = load_tokenizer(model_name)
+        return self._tokenizers[model_name]
+
+    def alive(self) -> bool:
+        try:
+            self.stats()
+            return True
+        except (EOFError, OSError):
+            return False
+
+    def close(self):
+        self._conn.close()
+
+# ==========================================
+# 4. MODEL SERVICE FOR NOTEBOOK STAGES
+# ==========================================
+_CLIENTS = {}
+_LOCAL_POOL = None
+
+def connect_worker(address: Address = DEFAULT_ADDRESS, authkey: Optional[bytes] = None) -> Optional[WorkerClient]:
+    """WorkerClient ถ้ามี worker รันอยู่ที่ address ไม่งั้น None"""
+    try:
+        return WorkerClient(address, authkey)
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+
+def start_worker(address: Address = DEFAULT_ADDRESS, backend: Optional[str] = None, budget_gb: Optional[float] = None,
+                 timeout: float = START_TIMEOUT) -> WorkerClient:
+    """
+    เปิด `python -m pipeline.worker` เป็น process แยก (อยู่ต่อหลัง notebook / script จบ) แล้วรอจนต่อได้
+    หยุดด้วย WorkerClient.shutdown() หรือ `python -m pipeline.worker --stop`
+    """
+    cmd = [sys.executable, '-u', '-m', 'pipeline.worker', '--address', _format_address(address)]
+    if backend: cmd += ['--backend', backend]
+    if budget_gb: cmd += ['--budget-gb', str(budget_gb)]
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    with open(LOG_PATH, 'a') as log:
+        process = subprocess.Popen(cmd, cwd=os.path.dirname(CHECKPOINT_DIR), stdout=log, stderr=subprocess.STDOUT,
+                                   start_new_session=True)
+    print(f"🚀 Starting inference worker on {_format_address(address)} (pid {process.pid}, log {LOG_PATH})...")
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        client = connect_worker(address)
+        if client is not None:
+            return client
+        if process.poll() is not None:
+            raise RuntimeError(f"Inference worker exited with code {process.returncode}; see {LOG_PATH}")
+        time.sleep(0.2)
+    raise TimeoutError(f"Inference worker did not accept connections within {timeout}s; see {LOG_PATH}")
+
+def model_service(mode: Optional[str] = None):
+    """
+    models= ของ stage ตาม MARKETMIND_WORKER:
+        off (default)  : ModelPool ใน process นี้ (อุ่นอยู่ตลอดอายุ kernel เดียวกัน, หายไปพร้อม kernel)
+        auto           : worker ที่รันอยู่ที่ DEFAULT_ADDRESS หรือเปิดใหม่ -> โมเดลอุ่นอยู่ข้ามรอบของ pipeline
+                         (opt-in: worker อยู่ต่อหลัง kernel จบ จนกว่าจะสั่ง `python -m pipeline.worker --stop`)
+        host:port / path : worker ที่ address นั้น (TCP / AF_UNIX socket)
+    """
+    global _LOCAL_POOL
+    mode = mode or os.environ.get(WORKER_ENV, 'off')
+    if mode == 'off':
+        if _LOCAL_POOL is None:
+            _LOCAL_POOL = ModelPool()
+        return _LOCAL_POOL
+    address = DEFAULT_ADDRESS if mode == 'auto' else _parse_address(mode)
+    client = _CLIENTS.get(address)
+    if client is None or not client.alive():
+        client = connect_worker(address) or start_worker(address)
+        _CLIENTS[address] = client
+    return client
+
+def describe(stats: Dict) -> str:
+    """สรุป stats() ของ pool / worker เป็นบรรทัดเดียว"""
+    resident = ", ".join(f"{r['model'].split('/')[-1]} {r['mb'] / 1024:.1f}GB" for r in stats['resident']) or "none"
+    line = (f"🔥 Models [{stats['backend']}]: {resident} | {stats['used_mb'] / 1024:.1f}/{stats['budget_mb'] / 1024:.1f} GB"
+            f" | loads {stats['loads']} ({stats['load_seconds']:.1f}s), hits {stats['hits']}, evictions {stats['evictions']}")
+    if 'queue_depth' in stats:
+        line += f" | queue {stats['queue_depth']}"
+    return line
+
+# ==========================================
+# 5. CLI
+# ==========================================
+def main():
+    parser = argparse.ArgumentParser(description="Persistent MarketMind inference worker (warm LRU model pool).")
+    parser.add_argument('--address', default=DEFAULT_ADDRESS, help='AF_UNIX socket path or host:port')
+    parser.add_argument('--stop', action='store_true', help='shut down the worker running on --address')
+    parser.add_argument('--backend', default=None, help='cuda | cpu | cpu-int8 (default: MARKETMIND_BACKEND / auto)')
+    parser.add_argument('--budget-gb', type=float, default=None, help='pool memory budget (default: MARKETMIND_POOL_GB)')
+    parser.add_argument('--preload', nargs='*', default=[], help='models to load before serving')
+    args = parser.parse_args()
+    address = _parse_address(args.address)
+
+    if args.stop:
+        client = connect_worker(address)
+        if client is None:
+            print(f"No inference worker on {_format_address(address)}")
+        else:
+            client.shutdown()
+            print(f"👋 Stopped inference worker on {_format_address(address)}")
+        return
+
+    pool = ModelPool(int(args.budget_gb * 1024**3) if args.budget_gb else None, backend=args.backend)
+    for model_name in args.preload:
+        pool.warm(model_name)
+    InferenceWorker(pool, address).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
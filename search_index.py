@@ -0,0 +1,178 @@
+import re
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+SEARCH_FIELDS = ['Title', 'Content', 'Short_Ans']
+TITLE_BOOST = 3             # คำในหัวข่าวนับ tf เป็น 3 เท่า (BM25F แบบง่าย)
+BM25_K1 = 1.2
+BM25_B = 0.75
+RECENCY_WEIGHT = 0.3        # สัดส่วนคะแนนความใหม่ใน ranking (ที่เหลือคือ BM25 ที่ normalize แล้ว)
+RECENCY_HALF_LIFE_DAYS = 7  # ข่าวเก่าลง 7 วัน -> คะแนนความใหม่เหลือครึ่ง
+
+TOKEN_PATTERN = r"(?u)\b\w+\b"
+_TOKEN = re.compile(TOKEN_PATTERN)
+_PHRASE = re.compile(r'"([^"]*)"')
+
+# ==========================================
+# 2. QUERY PARSING
+# ==========================================
+def parse_query(query: str):
+    """
+    'fed "interest rate" semi*' -> (terms, phrases, prefixes)
+    - คำธรรมดา: ต้องมีทุกคำ (AND)
+    - "..."   : ต้องมีวลีนี้เรียงติดกัน
+    - คำ*     : prefix (เช่น semi* -> semiconductor, semis)
+    """
+    query = str(query or '').lower()
+    phrases = [_TOKEN.findall(p) for p in _PHRASE.findall(query)]
+    phrases = [p for p in phrases if p]
+    rest = _PHRASE.sub(' ', query)
+    prefixes = [t for t in re.findall(r"(\w+)\*", rest)]
+    terms = _TOKEN.findall(re.sub(r"\w+\*", ' ', rest))
+    return terms, phrases, prefixes
+
+# ==========================================
+# 3. INDEX
+# ==========================================
+class SearchIndex:
+    """
+    Inverted index over Title / Content / Short_Ans of the news frame, built once per data version.
+
+    - postings: CSC matrix (term -> row ids เรียงแล้ว + tf) จาก CountVectorizer
+    - search(query) -> row positions (iloc) ของ frame ที่ใช้สร้าง เรียงตาม BM25 + ความใหม่
+    - AND ทุกคำ / "phrase" (หา candidate จาก postings แล้วตรวจวลีเฉพาะ candidate) / prefix*
+    - texts: field ที่ไม่อยู่ใน frame (เช่น {'Content': ArticleBodies}) ต้องมี take(rows) และ iterate ได้
+    """
+
+    def __init__(self, df: pd.DataFrame, fields=SEARCH_FIELDS, date_col: str = 'Date', texts=None):
+        self.df = df                     # shared read-only frame (ใช้ตรวจ phrase เท่านั้น)
+        self.texts = texts or {}
+        self.fields = [f for f in fields if f in df.columns or f in self.texts]
+        self.n_docs = len(df)
+
+        vectorizer = CountVectorizer(token_pattern=TOKEN_PATTERN, lowercase=True, dtype=np.int32)
+        postings = vectorizer.fit_transform(self._documents(df)).tocsc()
+        postings.sort_indices()
+        self.postings = postings
+        self.vocabulary = vectorizer.vocabulary_
+        self.terms = sorted(self.vocabulary)                           # สำหรับ prefix (bisect)
+        self.term_ids = np.array([self.vocabulary[t] for t in self.terms], dtype=np.int64)
+
+        doc_freq = np.diff(postings.indptr)
+        self.idf = np.log1p((self.n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        self.doc_len = np.bincount(postings.indices, weights=postings.data, minlength=self.n_docs)
+        self.avg_len = self.doc_len.mean() if self.n_docs else 0.0
+
+        dates = pd.to_datetime(df[date_col], errors='coerce') if date_col in df.columns else pd.Series(pd.NaT, index=df.index)
+        age_days = (dates.max() - dates).dt.total_seconds().to_numpy() / 86400
+        self.recency = np.nan_to_num(0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS), nan=0.0)
+
+    def _field(self, field, rows=None):
+        """ข้อความของ field (ทั้ง frame หรือเฉพาะ rows) เป็น Series ของ str"""
+        if field in self.texts:
+            source = self.texts[field]
+            return pd.Series(list(source) if rows is None else source.take(rows), dtype=object)
+        values = self.df[field] if rows is None else self.df[field].iloc[rows]
+        return values.fillna('').astype(str).reset_index(drop=True)
+
+    def _documents(self, df):
+        parts = []
+        for field in self.fields:
+            text = self._field(field)
+            parts.append((text + ' ') * TITLE_BOOST if field == 'Title' else text)
+        docs = parts[0]
+        for part in parts[1:]:
+            docs = docs + ' ' + part
+        return docs.tolist()
+
+    # --- postings ---
+    def _posting(self, term_id):
+        start, end = self.postings.indptr[term_id], self.postings.indptr[term_id + 1]
+        return self.postings.indices[start:end], self.postings.data[start:end]
+
+    def _prefix_ids(self, prefix):
+        lo = bisect_left(self.terms, prefix)
+        hi = bisect_left(self.terms, prefix + '\U0010ffff')
+        return self.term_ids[lo:hi].tolist()
+
+    def _union(self, term_ids):
+        if len(term_ids) == 1:
+            return self._posting(term_ids[0])[0]
+        return np.unique(np.concatenate([self._posting(t)[0] for t in term_ids]))
+
+    def _tf(self, term_id, rows):
+        docs, tf = self._posting(term_id)
+        if not len(docs):
+            return np.zeros(len(rows))
+        pos = np.minimum(np.searchsorted(docs, rows), len(docs) - 1)
+        return np.where(docs[pos] == rows, tf[pos], 0)
+
+    # --- query ---
+    def _phrase_mask(self, rows, phrase):
+        pattern = re.compile(r"\b" + r"\W+".join(map(re.escape, phrase)) + r"\b", re.IGNORECASE)
+        mask = np.zeros(len(rows), dtype=bool)
+        for field in self.fields:
+            values = self._field(field, rows[~mask])
+            mask[~mask] = values.str.contains(pattern, na=False).to_numpy(dtype=bool)
+        return mask
+
+    def match(self, query: str):
+        """-> (row ids ที่ตรงทุกเงื่อนไข (ยังไม่เรียง), term ids ที่ใช้ให้คะแนน) หรือ None ถ้า query ว่าง"""
+        terms, phrases, prefixes = parse_query(query)
+        groups = [[self.vocabulary.get(t)] for t in terms + [w for p in phrases for w in p]]
+        groups += [self._prefix_ids(p) for p in prefixes]
+        if not groups:
+            return None
+        if any(g == [None] or not g for g in groups):
+            return np.empty(0, dtype=np.int64), []
+
+        # AND: เริ่มจาก posting ที่สั้นที่สุด
+        postings = sorted((self._union(g) for g in groups), key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        for phrase in phrases:
+            if len(rows):
+                rows = rows[self._phrase_mask(rows, phrase)]
+        scoring_terms = list(dict.fromkeys(t for g in groups for t in g))
+        return rows.astype(np.int64), scoring_terms
+
+    def score(self, rows, term_ids):
+        """BM25 (normalize เป็น 0-1) ผสมกับความใหม่ของข่าว"""
+        if not len(rows):
+            return np.empty(0)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[rows] / max(self.avg_len, 1e-9))
+        bm25 = np.zeros(len(rows))
+        for term_id in term_ids:
+            tf = self._tf(term_id, rows)
+            bm25 += self.idf[term_id] * tf * (BM25_K1 + 1) / (tf + norm)
+        top = bm25.max()
+        relevance = bm25 / top if top > 0 else bm25
+        return (1 - RECENCY_WEIGHT) * relevance + RECENCY_WEIGHT * self.recency[rows]
+
+    def search(self, query: str, limit: int = None):
+        """
+        Row positions (iloc) matching every term/phrase of `query`, best first.
+        Returns None for an empty query (= no filter).
+        """
+        matched = self.match(query)
+        if matched is None:
+            return None
+        rows, term_ids = matched
+        order = np.argsort(-self.score(rows, term_ids), kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return rows[order]
+
+    def memory_bytes(self) -> int:
+        arrays = [self.postings.data, self.postings.indices, self.postings.indptr, self.idf,
+                  self.doc_len, self.recency, self.term_ids]
+        return int(sum(a.nbytes for a in arrays))
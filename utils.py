@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
 
 def navbar():
@@ -79,4 +81,18 @@ def get_sentiment_color(score):
         g = interpolate(YELLOW[1], GREEN[1], factor)
         b = interpolate(YELLOW[2], GREEN[2], factor)
         
-    return f"#{r:02x}{g:02x}{b:02x}"
\ No newline at end of file
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+# ตารางสีสำเร็จรูป: คะแนน -10..10 ทีละ 0.1 (201 ช่อง) แทนการคำนวณ gradient ทีละแถว
+SENTIMENT_COLOR_STEPS = 10
+SENTIMENT_COLOR_TABLE = np.array([get_sentiment_color(i / SENTIMENT_COLOR_STEPS - 10)
+                                  for i in range(20 * SENTIMENT_COLOR_STEPS + 1)], dtype=object)
+
+def sentiment_colors(scores):
+    """
+    get_sentiment_color ของทั้ง column ผ่าน lookup table (ค่าว่างถือเป็นกลาง = 5)
+    คืน numpy array ของรหัสสี Hex เรียงตาม scores
+    """
+    score = pd.to_numeric(pd.Series(scores), errors='coerce').fillna(5.0).to_numpy(dtype=float)
+    slot = np.rint((np.clip(score, -10, 10) + 10) * SENTIMENT_COLOR_STEPS).astype(int)
+    return SENTIMENT_COLOR_TABLE[slot]